@@ -420,7 +420,7 @@ class BayesianGraphicalLasso(GraphicalLasso):
         If False, data are centered before computation.
 
     update_rho_options : dict, default None
-        Options for the update of rho. See `update_rho` function for details.
+        Options for the update of rho. See `rho_strategy` function for details.
 
     compute_objective : boolean, default True
         Choose if compute the objective function during iterations
@@ -44,6 +44,7 @@ from regain.bayesian.gaussian_process_ import sample as sample_gp
 from regain.bayesian.sampling import (GWP_construct, elliptical_slice,
                                       sample_ell, sample_hyper_kernel)
 from regain.bayesian.stats import lognstat, t_mvn_logpdf
+from regain.covariance.empirical_covariance_ import group_split
 from regain.covariance.time_graphical_lasso_ import TimeGraphicalLasso
 
 
@@ -200,6 +201,8 @@ def _periodic_kernel(X, Y=None, inverse_width=1):
 
 
 class WishartProcess(TimeGraphicalLasso):
+    _warm_start_fit = False
+
     def __init__(
             self, theta=100, var_prop=1, mu_prior=1, var_prior=10,
             var_Lprop=10, mu_Lprior=1, var_Lprior=1, n_iter=500, burn_in=None,
@@ -242,21 +245,18 @@ class WishartProcess(TimeGraphicalLasso):
             ensure_min_features=2, estimator=self)
 
         n_dimensions = X.shape[1]
-        self.classes_, n_samples = np.unique(y, return_counts=True)
+        self.classes_ = np.unique(y)
         n_times = self.classes_.size
 
-        # n_samples = np.array([x.shape[0] for x in X])
+        # samples of each time, grouped with a single sort
+        X_groups = group_split(X, y, self.classes_)
         if self.assume_centered:
             self.location_ = np.zeros((n_times, n_dimensions))
         else:
-            self.location_ = np.array(
-                [X[y == cl].mean(0) for cl in self.classes_])
+            self.location_ = np.array([x.mean(0) for x in X_groups])
 
         # X = (X - self.location_).transpose(1, 2, 0)  # put time last
-        X_center = [
-            X[y == cl] - self.location_[i]
-            for i, cl in enumerate(self.classes_)
-        ]
+        X_center = [x - loc for x, loc in zip(X_groups, self.location_)]
         if self.kernel is None or self.kernel.lower() == 'rbf':
             kern = partial(_rbf_kernel, var=1)
         else:
@@ -338,8 +338,8 @@ class WishartProcess(TimeGraphicalLasso):
 
         X_center = np.array(
             [
-                X[y == cl] - self.location_[i]
-                for i, cl in enumerate(self.classes_)
+                x - loc for x, loc in zip(
+                    group_split(X, y, self.classes_), self.location_)
             ])
         logp = t_mvn_logpdf(X_center, self.D_map)
         return logp
@@ -27,7 +27,7 @@
 # CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
 # OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
-from .graphical_lasso_ import GraphicalLasso
+from .graphical_lasso_ import GraphicalLasso, GraphicalLassoCV
 from .latent_graphical_lasso_ import LatentGraphicalLasso
-from .time_graphical_lasso_ import TimeGraphicalLasso
+from .time_graphical_lasso_ import TimeGraphicalLasso, TimeGraphicalLassoCV
 from .latent_time_graphical_lasso_ import LatentTimeGraphicalLasso
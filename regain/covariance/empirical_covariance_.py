@@ -0,0 +1,297 @@
+# BSD 3-Clause License
+
+# Copyright (c) 2017, Federico T.
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+
+# * Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+
+# * Neither the name of the copyright holder nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""Empirical covariances of groups of samples, also out of core.
+
+The statistics of each group (time) are computed after sorting the samples
+by group once. Data that do not fit in memory, as memory-mapped arrays,
+.npy files or iterators of chunks of rows, are processed one chunk at a
+time, merging the statistics of the chunks with the pairwise update of
+Chan et al., which is numerically stable.
+"""
+from __future__ import division
+
+import numpy as np
+import six
+from scipy import sparse
+from six.moves import range, zip
+
+
+def _group_samples(X, y, classes=None):
+    """Sort the samples by group, once.
+
+    Returns
+    -------
+    classes : ndarray, shape (n_times,)
+        Groups, sorted.
+    X : ndarray
+        Samples sorted by group (not copied if they were already sorted).
+    offsets : ndarray, shape (n_times + 1,)
+        The samples of the i-th group are X[offsets[i]:offsets[i + 1]].
+
+    """
+    y = np.asarray(y)
+    if classes is not None:
+        # discard the samples of other groups
+        keep = np.in1d(y, classes)
+        if not np.all(keep):
+            X, y = X[keep], y[keep]
+    if y.size > 1 and np.any(y[1:] < y[:-1]):
+        order = np.argsort(y, kind='mergesort')
+        X, y = X[order], y[order]
+    if classes is None:
+        classes = np.unique(y)
+    offsets = np.append(np.searchsorted(y, classes), y.size)
+    return classes, X, offsets
+
+
+def group_split(X, y, classes=None):
+    """Split the samples by group, with a single sort.
+
+    Parameters
+    ----------
+    X : ndarray, shape (n_samples, n_features)
+        Data matrix.
+    y : ndarray, shape (n_samples,)
+        Group (time) of each sample.
+    classes : ndarray, optional
+        Groups to consider, sorted. If None, all the groups in `y`.
+
+    Returns
+    -------
+    groups : list of ndarray
+        Samples of each group, in the order of `classes`.
+
+    """
+    _, X, offsets = _group_samples(X, y, classes)
+    return [X[a:b] for a, b in zip(offsets[:-1], offsets[1:])]
+
+
+def group_statistics(
+        X, y, classes=None, location=None, assume_centered=False,
+        dtype=None):
+    """Sufficient statistics of the samples of each group, in one pass.
+
+    The samples are sorted by group once, then counts and means are
+    computed with a single reduction over the group offsets, and the
+    scatter matrix of each group on its contiguous block of samples.
+
+    Parameters
+    ----------
+    X : ndarray, shape (n_samples, n_features)
+        Data matrix.
+    y : ndarray, shape (n_samples,)
+        Group (time) of each sample.
+    classes : ndarray, optional
+        Groups to consider, sorted. If None, all the groups in `y`.
+    location : ndarray, shape (n_times, n_features), optional
+        Mean of each group, used to center the data. If None, it is
+        computed (or zero, if `assume_centered`).
+    assume_centered : bool, default False
+        If True, data are not centered before computation.
+    dtype : data-type, optional
+        Data type of the empirical covariances.
+
+    Returns
+    -------
+    classes : ndarray, shape (n_times,)
+        Groups.
+    n_samples : ndarray, shape (n_times,)
+        Number of samples of each group.
+    location : ndarray, shape (n_times, n_features)
+        Mean of each group.
+    emp_cov : ndarray, shape (n_times, n_features, n_features)
+        Empirical covariance of each group.
+
+    """
+    is_sparse = sparse.issparse(X)
+    if is_sparse:
+        # rows of the groups are sliced, never densified
+        X = sparse.csr_matrix(X)
+    classes, X, offsets = _group_samples(X, y, classes)
+    n_samples = np.diff(offsets)
+    nonempty = n_samples > 0
+    n_features = X.shape[1]
+
+    if is_sparse:
+        sums = np.array([
+            np.asarray(X[a:b].sum(axis=0)).ravel()
+            for a, b in zip(offsets[:-1], offsets[1:])]).reshape(
+                classes.size, n_features)
+    if location is None:
+        location = np.zeros((classes.size, n_features))
+        if is_sparse and not assume_centered:
+            location[nonempty] = sums[nonempty]
+            location[nonempty] /= n_samples[nonempty, None]
+        elif not assume_centered:
+            location[nonempty] = np.add.reduceat(
+                X, offsets[:-1][nonempty], axis=0)
+            location[nonempty] /= n_samples[nonempty, None]
+    location = np.asarray(location)
+
+    if dtype is None:
+        dtype = np.result_type(X.dtype, np.float32)
+    emp_cov = np.empty((classes.size, n_features, n_features), dtype=dtype)
+    for i, (a, b) in enumerate(zip(offsets[:-1], offsets[1:])):
+        if is_sparse:
+            # sum (x - l)(x - l)^T = X^T X - s l^T - l s^T + n l l^T
+            x, loc = X[a:b], location[i]
+            scatter = x.T.dot(x).toarray()
+            scatter -= np.outer(sums[i], loc)
+            scatter -= np.outer(loc, sums[i])
+            scatter += (b - a) * np.outer(loc, loc)
+        else:
+            x = X[a:b] - location[i]
+            scatter = np.dot(x.T, x)
+        emp_cov[i] = scatter / max(b - a, 1)
+    return classes, n_samples, location, emp_cov
+
+
+def covariance_statistics(
+        X, location=None, assume_centered=False, dtype=None):
+    """Mean and empirical covariance of X, which can be sparse.
+
+    For a scipy.sparse X, the covariance is computed as X^T X / n - mu mu^T
+    with sparse products, without densifying X.
+
+    Returns
+    -------
+    location : ndarray, shape (n_features,)
+        Mean of the samples (zero if `assume_centered`), or the one given.
+    emp_cov : ndarray, shape (n_features, n_features)
+        Empirical covariance.
+
+    """
+    _, _, location, emp_cov = group_statistics(
+        X, np.zeros(X.shape[0], dtype=int),
+        location=None if location is None else location[None],
+        assume_centered=assume_centered, dtype=dtype)
+    return location[0], emp_cov[0]
+
+
+def is_out_of_core(X):
+    """Check if X is data to be read in chunks.
+
+    That is the path of a .npy file, a memory-mapped array or an iterator
+    of chunks of rows.
+    """
+    return isinstance(X, (six.string_types, np.memmap)) or (
+        hasattr(X, '__next__') or hasattr(X, 'next'))
+
+
+def _iter_chunks(X, y=None, chunk_size=100000):
+    """Yield the chunks (X_c, y_c) of out-of-core data."""
+    if isinstance(X, six.string_types):
+        X = np.load(X, mmap_mode='r')
+    if isinstance(y, six.string_types):
+        y = np.load(y, mmap_mode='r')
+    if isinstance(X, np.ndarray):
+        for start in range(0, X.shape[0], chunk_size):
+            yield (
+                np.asarray(X[start:start + chunk_size], dtype=np.float64),
+                None if y is None else np.asarray(
+                    y[start:start + chunk_size]))
+        return
+    for chunk in X:
+        if isinstance(chunk, tuple):
+            X_c, y_c = chunk
+        else:
+            X_c, y_c = chunk, None
+        if not sparse.issparse(X_c):
+            X_c = np.asarray(X_c, dtype=np.float64)
+        yield X_c, y_c
+
+
+def streaming_statistics(
+        X, y=None, chunk_size=100000, assume_centered=False, dtype=None):
+    """Sufficient statistics of each group of data read in chunks.
+
+    Parameters
+    ----------
+    X : str, ndarray or iterator
+        Path of a .npy file (which is memory-mapped), array (such as a
+        np.memmap) read `chunk_size` rows at a time, or iterator of chunks
+        of rows. Each chunk is either an array (also scipy.sparse) or a
+        tuple (X_c, y_c) with the group of each of its samples.
+    y : str or ndarray, optional
+        Group of each sample, if X is a path or an array. If None, and the
+        chunks have no groups, all the samples are in a single group 0.
+    chunk_size : int, default 100000
+        Number of rows of each chunk, if X is a path or an array.
+    assume_centered : bool, default False
+        If True, data are not centered before computation.
+    dtype : data-type, optional
+        Data type of the empirical covariances.
+
+    Returns
+    -------
+    classes : ndarray, shape (n_groups,)
+        Groups, sorted.
+    n_samples : ndarray, shape (n_groups,)
+        Number of samples of each group.
+    location : ndarray, shape (n_groups, n_features)
+        Mean of each group.
+    emp_cov : ndarray, shape (n_groups, n_features, n_features)
+        Empirical covariance of each group.
+
+    """
+    index = {}
+    n_samples, location, scatter = [], [], []
+    for X_c, y_c in _iter_chunks(X, y, chunk_size=chunk_size):
+        if y_c is None:
+            y_c = np.zeros(X_c.shape[0], dtype=int)
+        for cl, n_b, mean_b, cov_b in zip(*group_statistics(
+                X_c, y_c, assume_centered=assume_centered)):
+            if cl not in index:
+                index[cl] = len(n_samples)
+                n_samples.append(n_b)
+                location.append(mean_b)
+                scatter.append(cov_b * n_b)
+                continue
+
+            # merge the statistics of the group with the ones of the chunk
+            i = index[cl]
+            n_a = n_samples[i]
+            n = n_a + n_b
+            delta = mean_b - location[i]
+            location[i] = location[i] + delta * (n_b / n)
+            scatter[i] += cov_b * n_b
+            scatter[i] += np.outer(delta, delta) * (n_a * n_b / n)
+            n_samples[i] = n
+
+    if not index:
+        raise ValueError("No samples found in the data.")
+    classes = np.array(list(index))
+    order = np.argsort(classes, kind='mergesort')
+    idx = [index[cl] for cl in classes[order]]
+    n_samples = np.array(n_samples)[idx]
+    emp_cov = np.array(scatter)[idx] / n_samples[:, None, None]
+    return (
+        classes[order], n_samples, np.array(location)[idx],
+        emp_cov if dtype is None else emp_cov.astype(dtype, copy=False))
@@ -37,16 +37,20 @@ from __future__ import division
 import warnings
 
 import numpy as np
-from scipy import linalg
+from scipy import linalg, sparse
+from scipy.sparse.csgraph import connected_components
 from six.moves import range
-from sklearn.covariance import empirical_covariance
+from sklearn.model_selection import check_cv
+from sklearn.utils._joblib import Parallel, delayed
 from sklearn.utils.extmath import fast_logdet
 from sklearn.utils.validation import check_array
 
+from regain.covariance.empirical_covariance_ import (
+    covariance_statistics, is_out_of_core, streaming_statistics)
 from regain.norm import l1_od_norm
 from regain.prox import prox_logdet, soft_thresholding_od
-from regain.update_rules import update_rho
-from regain.utils import convergence
+from regain.update_rules import accelerator, rho_strategy
+from regain.utils import admm_state, convergence, to_csr
 
 try:
     # sklean >= 0.20
@@ -56,18 +60,37 @@ except ImportError:
     from sklearn.covariance import GraphLasso
 
 
-def logl(emp_cov, precision):
-    """Gaussian log-likelihood without constant term."""
-    return fast_logdet(precision) - np.sum(emp_cov * precision)
+def logl(emp_cov, precision, logdet=None):
+    """Gaussian log-likelihood without constant term.
 
+    The log-determinant of the precision can be provided, if known.
+    The precision can also be a scipy.sparse matrix.
+    """
+    if sparse.issparse(precision):
+        if logdet is None:
+            logdet = fast_logdet(precision.toarray())
+        return logdet - precision.multiply(emp_cov).sum(dtype=np.float64)
+    if logdet is None:
+        logdet = fast_logdet(precision)
+    return logdet - np.sum(emp_cov * precision, dtype=np.float64)
+
+
+def log_likelihood(emp_cov, precision):
+    """Gaussian log-likelihood, as in sklearn, also for sparse precisions."""
+    n_features = precision.shape[0]
+    return (logl(emp_cov, precision) - n_features * np.log(2 * np.pi)) / 2.
 
-def objective(emp_cov, x, z, alpha):
-    return -logl(emp_cov, x) + l1_od_norm(alpha * z)
+
+def objective(emp_cov, x, z, alpha, logdet=None):
+    return -logl(emp_cov, x, logdet=logdet) + l1_od_norm(alpha * z)
 
 
 def init_precision(emp_cov, mode='empirical'):
     """Initialize the precision matrix given the empirical covariance."""
-    if mode == 'empirical':
+    if isinstance(mode, np.ndarray):
+        # solvers update the precision in-place
+        K = mode.copy()
+    elif mode == 'empirical':
         covariance_ = emp_cov.copy()
         covariance_ *= 0.95
         n_features = emp_cov.shape[-1]
@@ -79,18 +102,85 @@ def init_precision(emp_cov, mode='empirical'):
             for i, (c, e) in enumerate(zip(covariance_, emp_cov)):
                 c.flat[::n_features + 1] = e.flat[::n_features + 1]
                 K[i] = linalg.pinvh(c)
-    elif isinstance(mode, np.ndarray):
-        K = mode
     else:
         K = np.zeros_like(emp_cov)
 
     return K
 
 
+def screen_components(emp_cov, alpha):
+    """Connected components of the thresholded empirical covariance.
+
+    The graph with an edge (i, j) for each |S_ij| > alpha has the same
+    connected components of the support of the graphical lasso solution
+    (Witten et al., 2011; Mazumder and Hastie, 2012). Hence, the problem
+    can be solved separately on each of them.
+
+    Parameters
+    ----------
+    emp_cov : ndarray, shape ([n_times,] n_features, n_features)
+        Empirical covariance matrix. For a stack of matrices, the graph is
+        the union of the graphs of each of them.
+    alpha : float or ndarray
+        Regularisation parameter, broadcastable to `emp_cov`.
+
+    Returns
+    -------
+    blocks : list of ndarray
+        Indices of the features in each component, sorted by decreasing
+        size.
+
+    """
+    graph = np.abs(emp_cov) > alpha
+    if graph.ndim > 2:
+        graph = graph.any(axis=0)
+    graph = sparse.csr_matrix(graph)
+    n_components, labels = connected_components(graph, directed=False)
+    blocks = [np.flatnonzero(labels == i) for i in range(n_components)]
+    return sorted(blocks, key=len, reverse=True)
+
+
+class GraphicalLassoWorkspace(object):
+    """Preallocated buffers for the iterations of `graphical_lasso`.
+
+    The same workspace can be passed to subsequent calls of
+    `graphical_lasso` with problems of the same size (for example, along a
+    regularisation path or in a grid search), to avoid to allocate the
+    iteration variables each time.
+
+    Parameters
+    ----------
+    n_features : int
+        Dimension of the problem.
+    dtype : data-type, default np.float64
+        Data type of the buffers.
+
+    """
+
+    def __init__(self, n_features, dtype=np.float64):
+        shape = (n_features, n_features)
+        self.Z = np.empty(shape, dtype=dtype)
+        self.Z_old = np.empty(shape, dtype=dtype)
+        self.U = np.empty(shape, dtype=dtype)
+        self.K = np.empty(shape, dtype=dtype)
+        self.A = np.empty(shape, dtype=dtype)
+
+    def check(self, emp_cov):
+        """Validate the workspace against the empirical covariance."""
+        if self.Z.shape != emp_cov.shape:
+            raise ValueError(
+                "Workspace of shape %s cannot be used for a problem with "
+                "empirical covariance of shape %s" %
+                (self.Z.shape, emp_cov.shape))
+        return self
+
+
 def graphical_lasso(
         emp_cov, alpha=0.01, rho=1, over_relax=1, max_iter=100, verbose=False,
         tol=1e-4, rtol=1e-4, return_history=False, return_n_iter=True,
-        update_rho_options=None, compute_objective=True, init='empirical'):
+        update_rho_options=None, compute_objective=True, init='empirical',
+        workspace=None, screening=False, n_jobs=None, warm_start=None,
+        return_state=False, acceleration='none', acceleration_options=None):
     r"""Graphical lasso solver via ADMM.
 
     Solves the following problem:
@@ -123,56 +213,125 @@ def graphical_lasso(
         Print info at each iteration.
     update_rho_options : dict, optional
         Arguments for the rho update.
-        See regain.update_rules.update_rho function for more information.
+        See regain.update_rules.rho_strategy function for more information.
     compute_objective : bool, default True
         Choose to compute the objective value.
     init : {'empirical', 'zeros', ndarray}, default 'empirical'
         How to initialise the inverse covariance matrix. Default is take
         the empirical covariance and inverting it.
+    workspace : GraphicalLassoWorkspace, optional
+        Buffers used for the iterations. If None, they are allocated for
+        this call only. All updates are performed in-place on its buffers.
+    screening : bool, default False
+        Split the problem in the connected components of the thresholded
+        empirical covariance (see `screen_components`) and solve them
+        independently. Isolated variables have the closed-form solution
+        1 / S_ii. The workspace is ignored if more than one component
+        is found.
+    n_jobs : int or None, optional
+        Number of jobs used to solve the components in parallel, if
+        screening. ``None`` means 1 unless in a :obj:`joblib.parallel_backend`
+        context. ``-1`` means using all processors.
+    warm_start : admm_state, optional
+        Primal and dual variables and rho of a previous run (see
+        `return_state`), used to initialise the iterations. If given,
+        `init` and `rho` are ignored.
+    return_state : bool, default False
+        Return also the final primal and dual variables and rho, which can
+        be used to warm start another run.
+    acceleration : {'none', 'nesterov', 'anderson'}, default 'none'
+        Acceleration of the ADMM iterations. It is restarted when rho
+        changes or when the residuals increase.
+    acceleration_options : dict, optional
+        Arguments for the acceleration, such as `depth` for 'anderson'.
+        See regain.update_rules.accelerator function for more information.
 
     Returns
     -------
     precision_ : numpy.array, 2-dimensional
         Solution to the problem.
     covariance_ : np.array, 2 dimensional
-        Empirical covariance matrix.
+        Inverse of the solution.
     n_iter_ : int
         If return_n_iter, returns the number of iterations before convergence.
     history_ : list
         If return_history, then also a structure that contains the
         objective value, the primal and dual residual norms, and tolerances
         for the primal and dual residual norms at each iteration.
+        If screening, a list with the history of each component.
+    state : admm_state
+        If return_state, the final Z, U and rho.
 
     """
-    Z = init_precision(emp_cov, mode=init)
-    U = np.zeros_like(emp_cov)
-    Z_old = np.zeros_like(Z)
+    if screening and (warm_start is not None or return_state):
+        raise ValueError(
+            "Screening cannot be used together with warm starts.")
+    if screening:
+        blocks = screen_components(emp_cov, alpha)
+        if len(blocks) > 1:
+            return _graphical_lasso_blocks(
+                emp_cov, blocks, alpha=alpha, rho=rho, over_relax=over_relax,
+                max_iter=max_iter, verbose=verbose, tol=tol, rtol=rtol,
+                return_history=return_history, return_n_iter=return_n_iter,
+                update_rho_options=update_rho_options,
+                compute_objective=compute_objective, init=init,
+                n_jobs=n_jobs, acceleration=acceleration,
+                acceleration_options=acceleration_options)
+
+    if workspace is None:
+        ws = GraphicalLassoWorkspace(emp_cov.shape[0], dtype=emp_cov.dtype)
+    else:
+        ws = workspace.check(emp_cov)
+    Z, Z_old, U, K, A = ws.Z, ws.Z_old, ws.U, ws.K, ws.A
 
+    if warm_start is None:
+        np.copyto(Z, init_precision(emp_cov, mode=init))
+        U.fill(0)
+        Z_old.fill(0)
+    else:
+        np.copyto(Z, warm_start.Z)
+        np.copyto(U, warm_start.U)
+        np.copyto(Z_old, Z)
+        rho = warm_start.rho
+
+    accelerate = accelerator(acceleration, **(acceleration_options or {}))
+    rho_rule = rho_strategy(**(update_rho_options or {}))
     checks = []
     for iteration_ in range(max_iter):
         # x-update
-        A = Z - U
+        np.subtract(Z, U, out=A)
         A += A.T
         A /= 2.
-        K = prox_logdet(emp_cov - rho * A, lamda=1. / rho)
+        A *= -rho
+        A += emp_cov
+        K, k_eig, k_vec = prox_logdet(
+            A, lamda=1. / rho, out=K, return_eig=True)
 
         # z-update with relaxation
-        K_hat = over_relax * K - (1 - over_relax) * Z
-        Z = soft_thresholding_od(K_hat + U, lamda=alpha / rho)
+        if over_relax == 1:
+            K_hat = K
+        else:
+            K_hat = np.multiply(K, over_relax, out=A)
+            Z *= 1 - over_relax
+            K_hat -= Z
+        np.add(K_hat, U, out=Z)
+        Z = soft_thresholding_od(Z, lamda=alpha / rho, out=Z)
 
         # update residuals
-        U += K_hat - Z
+        U += np.subtract(K_hat, Z, out=A)
 
         # diagnostics, reporting, termination checks
-        obj = objective(emp_cov, K, Z, alpha) if compute_objective else np.nan
-        rnorm = np.linalg.norm(K - Z, 'fro')
-        snorm = rho * np.linalg.norm(Z - Z_old, 'fro')
+        obj = objective(
+            emp_cov, K, Z, alpha, logdet=np.sum(np.log(k_eig))) \
+            if compute_objective else np.nan
+        rnorm = np.linalg.norm(np.subtract(K, Z, out=A), 'fro')
+        snorm = rho * np.linalg.norm(np.subtract(Z, Z_old, out=A), 'fro')
         check = convergence(
             obj=obj, rnorm=rnorm, snorm=snorm, e_pri=np.sqrt(K.size) * tol +
             rtol * max(np.linalg.norm(K, 'fro'), np.linalg.norm(Z, 'fro')),
             e_dual=np.sqrt(K.size) * tol + rtol * rho * np.linalg.norm(U))
 
-        Z_old = Z.copy()
+        np.copyto(Z_old, Z)
         if verbose:
             print(
                 "obj: %.4f, rnorm: %.4f, snorm: %.4f,"
@@ -182,16 +341,235 @@ def graphical_lasso(
         if check.rnorm <= check.e_pri and check.snorm <= check.e_dual:
             break
 
-        rho_new = update_rho(
-            rho, rnorm, snorm, iteration=iteration_,
-            **(update_rho_options or {}))
-        # scaled dual variables should be also rescaled
-        U *= rho / rho_new
+        rho_new = rho_rule(
+            rho, rnorm, snorm, iteration=iteration_, check=check,
+            duals=[U], Ax=[K], Bz=[Z])
+        accelerate([Z, U], restart=rho_new != rho)
         rho = rho_new
     else:
         warnings.warn("Objective did not converge.")
 
-    return_list = [Z, emp_cov]
+    # inverse of the last K, from its eigendecomposition
+    covariance_ = np.dot(k_vec / k_eig, k_vec.T)
+    # buffers of a user-provided workspace are overwritten by later calls
+    return_list = [Z if workspace is None else Z.copy(), covariance_]
+    if return_history:
+        return_list.append(checks)
+    if return_n_iter:
+        return_list.append(iteration_)
+    if return_state:
+        return_list.append(admm_state(Z=Z.copy(), U=U.copy(), rho=rho))
+    return return_list
+
+
+def graphical_lasso_path(emp_cov, alphas, init='empirical', **params):
+    """Graphical lasso along a path of regularisation parameters.
+
+    Each problem is warm started with the primal and dual variables and
+    rho of the previous one, and all of them share the same buffers.
+    For the warm starts to be effective, alphas should be decreasing.
+
+    Parameters
+    ----------
+    emp_cov : ndarray, shape (n_features, n_features)
+        Empirical covariance matrix.
+    alphas : list of float
+        Regularisation parameters.
+    init : {'empirical', 'zeros', ndarray}, default 'empirical'
+        Initialisation of the precision for the first problem.
+    params : dict
+        Other parameters for `graphical_lasso`.
+
+    Returns
+    -------
+    precisions : ndarray, shape (n_alphas, n_features, n_features)
+        Solution for each alpha.
+    covariances : ndarray, shape (n_alphas, n_features, n_features)
+        Inverse of the solution for each alpha.
+    n_iters : list of int
+        Number of iterations for each alpha.
+
+    """
+    params.pop('return_history', None)
+    workspace = GraphicalLassoWorkspace(emp_cov.shape[0], dtype=emp_cov.dtype)
+    precisions, covariances, n_iters = [], [], []
+    state = None
+    for alpha in alphas:
+        precision, covariance, n_iter, state = graphical_lasso(
+            emp_cov, alpha=alpha, init=init, workspace=workspace,
+            warm_start=state, return_history=False, return_n_iter=True,
+            return_state=True, **params)
+        precisions.append(precision)
+        covariances.append(covariance)
+        n_iters.append(n_iter)
+    return np.array(precisions), np.array(covariances), n_iters
+
+
+def _quic_objective(emp_cov, precision, alpha):
+    """Objective value and Cholesky factor of the precision.
+
+    If the precision is not positive definite, the objective is inf and the
+    factor is None.
+    """
+    try:
+        L = linalg.cholesky(precision, lower=True)
+    except linalg.LinAlgError:
+        return np.inf, None
+    logdet = 2. * np.sum(np.log(np.diag(L)))
+    return objective(
+        emp_cov, precision, precision, alpha, logdet=logdet), L
+
+
+def _cholesky_inverse(L):
+    """Inverse of L L^T, given the lower Cholesky factor L."""
+    potri, = linalg.get_lapack_funcs(('potri', ), (L, ))
+    inverse, info = potri(L, lower=True)
+    if info != 0:
+        raise linalg.LinAlgError("potri failed with info %d" % info)
+    # only the lower triangle is computed
+    return np.tril(inverse) + np.tril(inverse, -1).T
+
+
+def quic_graphical_lasso(
+        emp_cov, alpha=0.01, max_iter=100, tol=1e-4, verbose=False,
+        return_history=False, return_n_iter=True, init='empirical',
+        max_sweeps=None, sigma=1e-3, beta=.5):
+    r"""Graphical lasso solver via a second-order method (QUIC).
+
+    Solves the same problem of `graphical_lasso` with a proximal Newton
+    method (Hsieh et al., 2014). The Newton direction is computed by
+    coordinate descent on the free set, the entries which are non-zero or
+    which violate the optimality conditions, so that each inner sweep costs
+    O(n_features) for each free entry instead of a full eigendecomposition.
+    The step is chosen with an Armijo line search which also ensures the
+    positive definiteness of the iterate (checked with a Cholesky
+    factorization, which is then reused to compute its inverse).
+
+    The coordinate descent is a Python loop over the free entries, and
+    each Newton iteration also computes the dense inverse of the iterate,
+    which is needed for the gradient on all the entries. Each iteration thus
+    costs O(n_features^3) plus O(n_features) interpreted steps for each free
+    entry: this implementation is not meant for large problems, where ADMM
+    with screening is preferable. It is mostly useful to reach high
+    accuracy in few iterations on small problems with sparse solutions.
+
+    Parameters
+    ----------
+    emp_cov : array-like
+        Empirical covariance matrix.
+    alpha : float, optional
+        Regularisation parameter.
+    max_iter : int, optional
+        Maximum number of Newton iterations.
+    tol : float, optional
+        Tolerance on the norm of the minimum-norm subgradient, relative to
+        the l1 norm of the precision.
+    verbose : bool, default False
+        Print info at each iteration.
+    return_history : bool, optional
+        Return the history of computed values.
+    return_n_iter : bool, optional
+        Return the number of iteration before convergence.
+    init : {'empirical', 'zeros', ndarray}, default 'empirical'
+        If an ndarray, the initial precision, which must be positive
+        definite. Otherwise, the inverse of the diagonal of the empirical
+        covariance, so that the iterates stay sparse.
+    max_sweeps : int, optional
+        Maximum number of coordinate descent sweeps for each Newton
+        direction. If None, it grows with the iterations as 1 + iter / 3.
+    sigma, beta : float, optional
+        Parameters of the Armijo line search.
+
+    Returns
+    -------
+    precision_ : numpy.array, 2-dimensional
+        Solution to the problem.
+    covariance_ : np.array, 2 dimensional
+        Inverse of the solution.
+    n_iter_ : int
+        If return_n_iter, returns the number of iterations before convergence.
+    history_ : list
+        If return_history, then also a structure that contains the
+        objective value and the norm of the minimum-norm subgradient.
+
+    """
+    n_features = emp_cov.shape[0]
+    penalty = np.full_like(emp_cov, alpha)
+    penalty.flat[::n_features + 1] = 0
+
+    if isinstance(init, np.ndarray):
+        X = init.copy()
+    else:
+        X = np.diag(1. / np.diag(emp_cov))
+    obj, L = _quic_objective(emp_cov, X, alpha)
+    if L is None:
+        raise ValueError("The initial precision must be positive definite.")
+    W = _cholesky_inverse(L)
+
+    checks = []
+    for iteration_ in range(max_iter):
+        G = emp_cov - W
+
+        # minimum-norm subgradient, for termination
+        subgrad = np.where(
+            X != 0, G + penalty * np.sign(X),
+            np.sign(G) * np.maximum(np.abs(G) - penalty, 0))
+        subgrad_norm = np.abs(subgrad).sum()
+        check = convergence(
+            obj=obj, rnorm=subgrad_norm, e_pri=tol * np.abs(X).sum())
+        if verbose:
+            print("obj: %.4f, subgrad: %.4f" % (obj, subgrad_norm))
+        checks.append(check)
+        if check.rnorm <= check.e_pri:
+            break
+
+        # free set, upper triangular part
+        rows, cols = np.nonzero(
+            np.triu((X != 0) | (np.abs(G) > penalty)))
+
+        # Newton direction by coordinate descent, U = D W
+        D = np.zeros_like(X)
+        U = np.zeros_like(X)
+        n_sweeps = max_sweeps or 1 + iteration_ // 3
+        for _ in range(n_sweeps):
+            for i, j in zip(rows, cols):
+                b = G[i, j] + np.dot(W[i], U[:, j])
+                c = X[i, j] + D[i, j]
+                if i == j:
+                    mu = -b / W[i, i] ** 2
+                else:
+                    a = W[i, j] ** 2 + W[i, i] * W[j, j]
+                    z = c - b / a
+                    mu = -c + np.sign(z) * max(
+                        abs(z) - penalty[i, j] / a, 0)
+                if mu == 0:
+                    continue
+                D[i, j] += mu
+                U[i] += mu * W[j]
+                if i != j:
+                    D[j, i] += mu
+                    U[j] += mu * W[i]
+
+        # Armijo line search, also ensuring positive definiteness
+        l1_X = np.abs(penalty * X).sum()
+        delta = np.sum(G * D) + np.abs(penalty * (X + D)).sum() - l1_X
+        step = 1.
+        while True:
+            X_new = X + step * D
+            obj_new, L = _quic_objective(emp_cov, X_new, alpha)
+            if obj_new <= obj + sigma * step * delta or step < 1e-10:
+                break
+            step *= beta
+
+        if not np.isfinite(obj_new):
+            warnings.warn("Line search failed.")
+            break
+        X, obj = X_new, obj_new
+        W = _cholesky_inverse(L)
+    else:
+        warnings.warn("Objective did not converge.")
+
+    return_list = [X, W]
     if return_history:
         return_list.append(checks)
     if return_n_iter:
@@ -199,6 +577,36 @@ def graphical_lasso(
     return return_list
 
 
+def _graphical_lasso_blocks(
+        emp_cov, blocks, init='empirical', n_jobs=None, return_history=False,
+        return_n_iter=True, **params):
+    """Solve the graphical lasso separately on each block of features."""
+    precision = np.zeros_like(emp_cov)
+    covariance = np.zeros_like(emp_cov)
+    singletons = np.array([b[0] for b in blocks if b.size == 1], dtype=int)
+    precision[singletons, singletons] = 1. / emp_cov[singletons, singletons]
+    covariance[singletons, singletons] = emp_cov[singletons, singletons]
+
+    blocks = [b for b in blocks if b.size > 1]
+    results = Parallel(n_jobs=n_jobs, prefer='threads')(
+        delayed(graphical_lasso)(
+            emp_cov[np.ix_(b, b)],
+            init=init[np.ix_(b, b)] if isinstance(init, np.ndarray) else init,
+            return_history=True, return_n_iter=True, **params)
+        for b in blocks)
+
+    for b, res in zip(blocks, results):
+        precision[np.ix_(b, b)] = res[0]
+        covariance[np.ix_(b, b)] = res[1]
+
+    return_list = [precision, covariance]
+    if return_history:
+        return_list.append([res[2] for res in results])
+    if return_n_iter:
+        return_list.append(max([res[3] for res in results] or [0]))
+    return return_list
+
+
 class GraphicalLasso(GraphLasso):
     """Sparse inverse covariance estimation with an l1-penalized estimator.
 
@@ -234,22 +642,57 @@ class GraphicalLasso(GraphLasso):
         If False, data are centered before computation.
 
     update_rho_options : dict, default None
-        Options for the update of rho. See `update_rho` function for details.
+        Options for the update of rho. See `rho_strategy` function for details.
+
+    acceleration : {'none', 'nesterov', 'anderson'}, default 'none'
+        Acceleration of the ADMM iterations. It is restarted when rho
+        changes or when the residuals increase.
+
+    acceleration_options : dict, default None
+        Options for the acceleration, such as `depth` for 'anderson'.
+        See `accelerator` function for details.
 
     compute_objective : boolean, default True
         Choose if compute the objective function during iterations
         (only useful if `verbose=True`).
 
-    mode : {'admm'}, default 'admm'
-        Minimisation algorithm. At the moment, only 'admm' is available,
-        so this is ignored.
+    mode : {'admm', 'quic'}, default 'admm'
+        Minimisation algorithm. 'quic' is a second-order method which
+        converges in few iterations on small problems with sparse
+        solutions, but does not scale to many features
+        (see `quic_graphical_lasso`).
+        With 'quic', rho, over_relax, rtol, update_rho_options,
+        acceleration and screening options of ADMM are ignored.
+
+    init : {'empirical', 'zeros', ndarray}, default 'empirical'
+        How to initialise the inverse covariance matrix. Default is take
+        the empirical covariance and inverting it.
+
+    dtype : {np.float64, np.float32}, default np.float64
+        Floating point precision of the solver. With np.float32 the
+        empirical covariance and all the iteration variables are stored in
+        single precision, halving the memory and speeding up the linear
+        algebra. Consider a looser `tol` and `rtol` in this case.
+
+    screening : boolean, default False
+        If True, solve the problem independently on each connected
+        component of the thresholded empirical covariance |S_ij| > alpha.
+        The solution is the same, but much faster for sparse problems.
+
+    n_jobs : int or None, default None
+        Number of jobs used to solve the components in parallel, if
+        `screening=True`.
+
+    output : {'dense', 'sparse'}, default 'dense'
+        Storage of `precision_`. With 'sparse', it is a scipy.sparse CSR
+        matrix holding only the non-zero entries of the solution.
 
     Attributes
     ----------
     covariance_ : array-like, shape (n_features, n_features)
         Estimated covariance matrix
 
-    precision_ : array-like, shape (n_features, n_features)
+    precision_ : array-like or CSR matrix, shape (n_features, n_features)
         Estimated pseudo inverse matrix.
 
     n_iter_ : int
@@ -260,7 +703,9 @@ class GraphicalLasso(GraphLasso):
     def __init__(
             self, alpha=0.01, rho=1., over_relax=1., max_iter=100, mode='admm',
             tol=1e-4, rtol=1e-4, verbose=False, assume_centered=False,
-            update_rho_options=None, compute_objective=True, init='empirical'):
+            update_rho_options=None, compute_objective=True, init='empirical',
+            dtype=np.float64, screening=False, n_jobs=None, output='dense',
+            acceleration='none', acceleration_options=None):
         super(GraphicalLasso, self).__init__(
             alpha=alpha, tol=tol, max_iter=max_iter, verbose=verbose,
             assume_centered=assume_centered, mode=mode)
@@ -270,6 +715,21 @@ class GraphicalLasso(GraphLasso):
         self.update_rho_options = update_rho_options
         self.compute_objective = compute_objective
         self.init = init
+        self.dtype = dtype
+        self.screening = screening
+        self.n_jobs = n_jobs
+        self.output = output
+        self.acceleration = acceleration
+        self.acceleration_options = acceleration_options
+
+    def _format_output(self):
+        """Convert the precision to the chosen output storage."""
+        if self.output == 'sparse':
+            self.precision_ = to_csr(self.precision_)
+        elif self.output != 'dense':
+            raise ValueError(
+                "output must be 'dense' or 'sparse', got %r" % self.output)
+        return self
 
     def _fit(self, emp_cov):
         """Fit the GraphicalLasso model to X.
@@ -280,13 +740,27 @@ class GraphicalLasso(GraphLasso):
             Empirical covariance of data.
 
         """
+        if self.mode == 'quic':
+            self.precision_, self.covariance_, self.n_iter_ = \
+                quic_graphical_lasso(
+                    emp_cov, alpha=self.alpha, tol=self.tol,
+                    max_iter=self.max_iter, verbose=self.verbose,
+                    return_n_iter=True, return_history=False, init=self.init)
+            return self._format_output()
+        elif self.mode != 'admm':
+            raise ValueError(
+                "mode must be 'admm' or 'quic', got %r" % self.mode)
+
         self.precision_, self.covariance_, self.n_iter_ = graphical_lasso(
             emp_cov, alpha=self.alpha, tol=self.tol, rtol=self.rtol,
             max_iter=self.max_iter, over_relax=self.over_relax, rho=self.rho,
             verbose=self.verbose, return_n_iter=True, return_history=False,
             update_rho_options=self.update_rho_options,
-            compute_objective=self.compute_objective, init=self.init)
-        return self
+            compute_objective=self.compute_objective, init=self.init,
+            screening=self.screening, n_jobs=self.n_jobs,
+            acceleration=self.acceleration,
+            acceleration_options=self.acceleration_options)
+        return self._format_output()
 
     def fit(self, X, y=None):
         """Fit the GraphicalLasso model to X.
@@ -294,17 +768,176 @@ class GraphicalLasso(GraphLasso):
         Parameters
         ----------
         X : ndarray, shape (n_samples, n_features)
-            Data from which to compute the covariance estimate
+            Data from which to compute the covariance estimate. It can also
+            be data not fitting in memory, that is the path of a .npy file,
+            a np.memmap or an iterator of chunks of rows, see
+            `streaming_statistics`.
         y : (ignored)
 
         """
+        if is_out_of_core(X):
+            _, _, location, emp_cov = streaming_statistics(
+                X, assume_centered=self.assume_centered, dtype=self.dtype)
+            self.location_ = location[0]
+            return self._fit(emp_cov[0])
+
         # Covariance does not make sense for a single feature
         X = check_array(
-            X, ensure_min_features=2, ensure_min_samples=2, estimator=self)
-        if self.assume_centered:
-            self.location_ = np.zeros(X.shape[1])
-        else:
-            self.location_ = X.mean(0)
-
-        emp_cov = empirical_covariance(X, assume_centered=self.assume_centered)
+            X, accept_sparse=['csr', 'csc'], ensure_min_features=2,
+            ensure_min_samples=2, estimator=self)
+        self.location_, emp_cov = covariance_statistics(
+            X, assume_centered=self.assume_centered, dtype=self.dtype)
         return self._fit(emp_cov)
+
+    def score(self, X_test, y=None):
+        """Computes the log-likelihood of a Gaussian data set with
+        `self.covariance_` as an estimator of its covariance matrix.
+
+        Parameters
+        ----------
+        X_test : array-like, shape = (n_samples, n_features)
+            Test data of which we compute the likelihood.
+        y : (ignored)
+
+        Returns
+        -------
+        res : float
+            The likelihood of the data set with `self.precision_`, dense or
+            sparse, as an estimator of its precision matrix.
+
+        """
+        test_cov = covariance_statistics(X_test, location=self.location_)[1]
+        return log_likelihood(test_cov, self.get_precision())
+
+
+def alpha_grid(emp_cov, n_alphas=10, eps=1e-2):
+    """Decreasing grid of regularisation parameters.
+
+    The grid is log-spaced from the smallest alpha giving a diagonal
+    solution, that is the largest off-diagonal |S_ij|, to `eps` times it.
+    """
+    n_features = emp_cov.shape[-1]
+    off_diagonal = ~np.eye(n_features, dtype=bool)
+    alpha_max = np.abs(emp_cov[..., off_diagonal]).max()
+    return np.logspace(
+        np.log10(alpha_max), np.log10(eps * alpha_max), n_alphas)
+
+
+class GraphicalLassoCV(GraphicalLasso):
+    """Sparse inverse covariance with cross-validated choice of alpha.
+
+    For each fold, the empirical covariance is computed once and the
+    problem is solved along the grid of alphas, warm starting each problem
+    with the solution of the previous one (see `graphical_lasso_path`).
+
+    Parameters
+    ----------
+    alphas : integer, or list positive float, default 10
+        If an integer is given, it fixes the number of points on the grid of
+        alpha to be used (see `alpha_grid`). If a list is given, it gives
+        the grid to be used, sorted in decreasing order.
+
+    cv : int, cross-validation generator or an iterable, optional
+        Determines the cross-validation splitting strategy, as in
+        scikit-learn.
+
+    n_jobs : int or None, default None
+        Number of jobs to run the folds in parallel.
+
+    rho, over_relax, tol, rtol, max_iter, verbose, assume_centered,
+    update_rho_options, compute_objective, init, dtype, output :
+        See `GraphicalLasso`.
+
+    Attributes
+    ----------
+    covariance_ : array-like, shape (n_features, n_features)
+        Estimated covariance matrix
+
+    precision_ : array-like, shape (n_features, n_features)
+        Estimated precision matrix.
+
+    alpha_ : float
+        Regularisation parameter selected.
+
+    cv_alphas_ : ndarray, shape (n_alphas,)
+        All the alphas explored.
+
+    grid_scores_ : ndarray, shape (n_alphas, n_folds)
+        Log-likelihood score on left-out data across folds.
+
+    n_iter_ : int
+        Number of iterations run for the last alpha on the whole data.
+
+    """
+
+    def __init__(
+            self, alphas=10, cv=None, n_jobs=None, rho=1., over_relax=1.,
+            max_iter=100, mode='admm', tol=1e-4, rtol=1e-4, verbose=False,
+            assume_centered=False, update_rho_options=None,
+            compute_objective=True, init='empirical', dtype=np.float64,
+            output='dense'):
+        super(GraphicalLassoCV, self).__init__(
+            rho=rho, over_relax=over_relax, max_iter=max_iter, mode=mode,
+            tol=tol, rtol=rtol, verbose=verbose,
+            assume_centered=assume_centered,
+            update_rho_options=update_rho_options,
+            compute_objective=compute_objective, init=init, dtype=dtype,
+            output=output)
+        self.alphas = alphas
+        self.cv = cv
+        self.n_jobs = n_jobs
+
+    def _path(self, emp_cov, alphas):
+        return graphical_lasso_path(
+            emp_cov, alphas, rho=self.rho, over_relax=self.over_relax,
+            max_iter=self.max_iter, tol=self.tol, rtol=self.rtol,
+            verbose=self.verbose, update_rho_options=self.update_rho_options,
+            compute_objective=self.compute_objective, init=self.init)
+
+    def _fold_scores(self, X, train, test, alphas):
+        emp_cov = covariance_statistics(
+            X[train], assume_centered=self.assume_centered,
+            dtype=self.dtype)[1]
+        test_cov = covariance_statistics(
+            X[test], assume_centered=self.assume_centered)[1]
+        precisions = self._path(emp_cov, alphas)[0]
+        return [log_likelihood(test_cov, p) for p in precisions]
+
+    def fit(self, X, y=None):
+        """Fit the GraphicalLassoCV model to X.
+
+        Parameters
+        ----------
+        X : ndarray, shape (n_samples, n_features)
+            Data from which to compute the covariance estimate
+        y : (ignored)
+
+        """
+        X = check_array(
+            X, accept_sparse=['csr', 'csc'], ensure_min_features=2,
+            ensure_min_samples=2, estimator=self)
+        self.location_, emp_cov = covariance_statistics(
+            X, assume_centered=self.assume_centered, dtype=self.dtype)
+
+        if isinstance(self.alphas, int):
+            alphas = alpha_grid(emp_cov, n_alphas=self.alphas)
+        else:
+            alphas = np.sort(self.alphas)[::-1]
+
+        cv = check_cv(self.cv, y, classifier=False)
+        scores = Parallel(n_jobs=self.n_jobs, prefer='threads')(
+            delayed(self._fold_scores)(X, train, test, alphas)
+            for train, test in cv.split(X, y))
+
+        self.cv_alphas_ = alphas
+        self.grid_scores_ = np.array(scores).T
+        best = np.argmax(self.grid_scores_.mean(axis=1))
+        self.alpha_ = alphas[best]
+
+        # refit along the path up to the best alpha, to warm start it
+        precisions, covariances, n_iters = self._path(
+            emp_cov, alphas[:best + 1])
+        self.precision_ = precisions[-1]
+        self.covariance_ = covariances[-1]
+        self.n_iter_ = n_iters[-1]
+        return self._format_output()
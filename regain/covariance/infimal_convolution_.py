@@ -39,7 +39,7 @@ from sklearn.utils.extmath import squared_norm
 
 from regain.norm import l1_od_norm
 from regain.prox import prox_laplacian, prox_trace_indicator, soft_thresholding
-from regain.update_rules import update_rho
+from regain.update_rules import rho_strategy
 from regain.utils import convergence
 
 
@@ -103,6 +103,7 @@ def infimal_convolution(
     U = np.zeros_like(S)
     R_old = np.zeros_like(S)
 
+    rho_rule = rho_strategy(**(update_rho_options or {}))
     checks = []
     for iteration_ in range(max_iter):
         # update R
@@ -144,10 +145,8 @@ def infimal_convolution(
             break
         if check.obj == np.inf:
             break
-        rho_new = update_rho(rho, rnorm, snorm, iteration=iteration_,
-                             **(update_rho_options or {}))
-        # scaled dual variables should be also rescaled
-        U *= rho / rho_new
+        rho_new = rho_rule(
+            rho, rnorm, snorm, iteration=iteration_, check=check, duals=[U])
         rho = rho_new
     else:
         warnings.warn("Objective did not converge.")
@@ -46,13 +46,13 @@ from sklearn.utils.extmath import squared_norm
 from sklearn.utils.validation import check_is_fitted
 
 from regain.covariance.kernel_time_graphical_lasso_ import (
-    KernelTimeGraphicalLasso, init_precision)
+    KernelTimeGraphicalLasso, _update_lags, init_precision)
 from regain.covariance.kernel_time_graphical_lasso_ import \
     objective as obj_ktgl
 from regain.covariance.kernel_time_graphical_lasso_ import precision_similarity
 from regain.prox import prox_logdet, prox_trace_indicator, soft_thresholding
-from regain.update_rules import update_rho
-from regain.utils import convergence
+from regain.update_rules import rho_strategy
+from regain.utils import LagStack, convergence
 from regain.validation import check_norm_prox
 
 
@@ -80,7 +80,8 @@ def kernel_latent_time_graphical_lasso(
         max_iter=100, verbose=False, psi='laplacian', phi='laplacian',
         mode='admm', tol=1e-4, rtol=1e-4, assume_centered=False,
         n_samples=None, return_history=False, return_n_iter=True,
-        update_rho_options=None, compute_objective=True, init="empirical"):
+        update_rho_options=None, compute_objective=True, init="empirical",
+        n_jobs=None):
     r"""Time-varying latent variable graphical lasso solver.
 
     Solves the following problem via ADMM:
@@ -108,6 +109,9 @@ def kernel_latent_time_graphical_lasso(
         Relative tolerance for convergence.
     return_history : bool, optional
         Return the history of computed values.
+    n_jobs : int or None, optional
+        Number of jobs used to compute the proximal operators of the
+        different times in parallel.
 
     Returns
     -------
@@ -133,134 +137,107 @@ def kernel_latent_time_graphical_lasso(
     X_0 = np.zeros_like(Z_0)
     R_old = np.zeros_like(Z_0)
 
-    Z_M, Z_M_old = {}, {}
-    Y_M = {}
-    W_M, W_M_old = {}, {}
-    U_M = {}
-    for m in range(1, n_times):
-        Z_L = Z_0.copy()[:-m]
-        Z_R = Z_0.copy()[m:]
-        Z_M[m] = (Z_L, Z_R)
-
-        W_L = np.zeros_like(Z_L)
-        W_R = np.zeros_like(Z_R)
-        W_M[m] = (W_L, W_R)
-
-        Y_L = np.zeros_like(Z_L)
-        Y_R = np.zeros_like(Z_R)
-        Y_M[m] = (Y_L, Y_R)
-
-        U_L = np.zeros_like(W_L)
-        U_R = np.zeros_like(W_R)
-        U_M[m] = (U_L, U_R)
-
-        Z_L_old = np.zeros_like(Z_L)
-        Z_R_old = np.zeros_like(Z_R)
-        Z_M_old[m] = (Z_L_old, Z_R_old)
-
-        W_L_old = np.zeros_like(W_L)
-        W_R_old = np.zeros_like(W_R)
-        W_M_old[m] = (W_L_old, W_R_old)
+    # buffers, reused across iterations
+    R = np.zeros_like(Z_0)
+    A = np.empty_like(Z_0)
+
+    # consensus variables of all possible markovians jumps, stored
+    # contiguously for all the lags
+    lags = range(1, n_times)
+    Z_M = LagStack(lags, Z_0.shape, dtype=Z_0.dtype)
+    Y_M = LagStack(lags, Z_0.shape, dtype=Z_0.dtype)
+    W_M = LagStack(lags, Z_0.shape, dtype=Z_0.dtype)
+    U_M = LagStack(lags, Z_0.shape, dtype=Z_0.dtype)
+    Z_M.gather(Z_0, out=Z_M.data)
+    # buffer of the lags, swapped with Z_M and W_M at their update
+    A_M = LagStack(lags, Z_0.shape, dtype=Z_0.dtype)
 
     if n_samples is None:
         n_samples = np.ones(n_times)
 
+    rho_rule = rho_strategy(**(update_rho_options or {}))
+    # inner states of the node penalty prox, to warm start it
+    node_states_psi, node_states_phi = {}, {}
     checks = []
     for iteration_ in range(max_iter):
-        # update R
-        A = Z_0 - W_0 - X_0
+        # update R, the previous one is kept by swapping the buffers
+        R, R_old = R_old, R
+        np.subtract(Z_0, W_0, out=A)
+        A -= X_0
         A += A.transpose(0, 2, 1)
         A /= 2.
         A *= -rho / n_samples[:, None, None]
         A += emp_cov
         # A = emp_cov / rho - A
 
-        R = np.array(
-            [prox_logdet(a, lamda=ni / rho) for a, ni in zip(A, n_samples)])
+        R = prox_logdet(A, lamda=n_samples / rho, out=R, n_jobs=n_jobs)
 
         # update Z_0
-        A = R + W_0 + X_0
-        for m in range(1, n_times):
-            A[:-m] += Z_M[m][0] - Y_M[m][0]
-            A[m:] += Z_M[m][1] - Y_M[m][1]
+        np.add(R, W_0, out=A)
+        A += X_0
+        np.subtract(Z_M.data, Y_M.data, out=A_M.data)
+        Z_M.scatter_add(A_M.data, out=A)
 
         A /= n_times
-        Z_0 = soft_thresholding(A, lamda=alpha / (rho * n_times))
+        Z_0 = soft_thresholding(A, lamda=alpha / (rho * n_times), out=Z_0)
 
         # update W_0
-        A = Z_0 - R - X_0
-        for m in range(1, n_times):
-            A[:-m] += W_M[m][0] - U_M[m][0]
-            A[m:] += W_M[m][1] - U_M[m][1]
+        np.subtract(Z_0, R, out=A)
+        A -= X_0
+        np.subtract(W_M.data, U_M.data, out=A_M.data)
+        W_M.scatter_add(A_M.data, out=A)
 
         A /= n_times
         A += A.transpose(0, 2, 1)
         A /= 2.
 
-        W_0 = np.array(
-            [prox_trace_indicator(a, lamda=tau / (rho * n_times)) for a in A])
+        W_0 = prox_trace_indicator(
+            A, lamda=tau / (rho * n_times), out=W_0, n_jobs=n_jobs)
 
         # update residuals
         X_0 += R - Z_0 + W_0
 
-        for m in range(1, n_times):
-            # other Zs
-            Y_L, Y_R = Y_M[m]
-            A_L = Z_0[:-m] + Y_L
-            A_R = Z_0[m:] + Y_R
-            if not psi_node_penalty:
-                prox_e = prox_psi(
-                    A_R - A_L,
-                    lamda=2. * np.diag(kernel_psi, m)[:, None, None] / rho)
-                Z_L = .5 * (A_L + A_R - prox_e)
-                Z_R = .5 * (A_L + A_R + prox_e)
-            else:
-                Z_L, Z_R = prox_psi(
-                    np.concatenate((A_L, A_R), axis=1),
-                    lamda=.5 * np.diag(kernel_psi, m)[:, None, None] / rho,
-                    rho=rho, tol=tol, rtol=rtol, max_iter=max_iter)
-            Z_M[m] = (Z_L, Z_R)
-
-            # update other residuals
-            Y_L += Z_0[:-m] - Z_L
-            Y_R += Z_0[m:] - Z_R
-
-            # other Ws
-            U_L, U_R = U_M[m]
-            A_L = W_0[:-m] + U_L
-            A_R = W_0[m:] + U_R
-            if not phi_node_penalty:
-                prox_e = prox_phi(
-                    A_R - A_L,
-                    lamda=2. * np.diag(kernel_phi, m)[:, None, None] / rho)
-                W_L = .5 * (A_L + A_R - prox_e)
-                W_R = .5 * (A_L + A_R + prox_e)
-            else:
-                W_L, W_R = prox_phi(
-                    np.concatenate((A_L, A_R), axis=1),
-                    lamda=.5 * np.diag(kernel_phi, m)[:, None, None] / rho,
-                    rho=rho, tol=tol, rtol=rtol, max_iter=max_iter)
-            W_M[m] = (W_L, W_R)
-
-            # update other residuals
-            U_L += W_0[:-m] - W_L
-            U_R += W_0[m:] - W_R
+        # other Zs, computed in A_M and swapped with the previous ones
+        Z_M.gather(Z_0, out=A_M.data)
+        A_M.data += Y_M.data
+        _update_lags(
+            A_M, prox_psi, psi_node_penalty, kernel_psi, rho,
+            node_states=node_states_psi, tol=tol, rtol=rtol,
+            max_iter=max_iter, update_rho_options=update_rho_options)
+        Z_M.data -= A_M.data
+        snorm_Z_M = squared_norm(Z_M.data)
+        Z_M, A_M = A_M, Z_M
+
+        # update other residuals, with Z_0_M in A_M
+        Z_0_M = Z_M.gather(Z_0, out=A_M.data)
+        norm_Z_0_M = squared_norm(Z_0_M)
+        Z_0_M -= Z_M.data
+        Y_M.data += Z_0_M
+        rnorm_Z_M = squared_norm(Z_0_M)
+
+        # other Ws
+        W_M.gather(W_0, out=A_M.data)
+        A_M.data += U_M.data
+        _update_lags(
+            A_M, prox_phi, phi_node_penalty, kernel_phi, rho,
+            node_states=node_states_phi, tol=tol, rtol=rtol,
+            max_iter=max_iter, update_rho_options=update_rho_options)
+        W_M.data -= A_M.data
+        snorm_W_M = squared_norm(W_M.data)
+        W_M, A_M = A_M, W_M
+
+        # update other residuals, with W_0_M in A_M
+        W_0_M = W_M.gather(W_0, out=A_M.data)
+        norm_W_0_M = squared_norm(W_0_M)
+        W_0_M -= W_M.data
+        U_M.data += W_0_M
+        rnorm_W_M = squared_norm(W_0_M)
 
         # diagnostics, reporting, termination checks
-        rnorm = np.sqrt(
-            squared_norm(R - Z_0 + W_0) + sum(
-                squared_norm(Z_0[:-m] - Z_M[m][0]) +
-                squared_norm(Z_0[m:] - Z_M[m][1]) +
-                squared_norm(W_0[:-m] - W_M[m][0]) +
-                squared_norm(W_0[m:] - W_M[m][1]) for m in range(1, n_times)))
+        rnorm = np.sqrt(squared_norm(R - Z_0 + W_0) + rnorm_Z_M + rnorm_W_M)
 
         snorm = rho * np.sqrt(
-            squared_norm(R - R_old) + sum(
-                squared_norm(Z_M[m][0] - Z_M_old[m][0]) +
-                squared_norm(Z_M[m][1] - Z_M_old[m][1]) +
-                squared_norm(W_M[m][0] - W_M_old[m][0]) +
-                squared_norm(W_M[m][1] - W_M_old[m][1])
-                for m in range(1, n_times)))
+            squared_norm(R - R_old) + snorm_Z_M + snorm_W_M)
 
         obj = objective(emp_cov, n_samples, R, Z_0, Z_M, W_0, W_M,
                         alpha, tau, kernel_psi, kernel_phi, psi, phi) \
@@ -271,26 +248,14 @@ def kernel_latent_time_graphical_lasso(
             e_pri=n_features * np.sqrt(n_times * (2 * n_times - 1)) * tol +
             rtol * max(
                 np.sqrt(
-                    squared_norm(R) + sum(
-                        squared_norm(Z_M[m][0]) + squared_norm(Z_M[m][1]) +
-                        squared_norm(W_M[m][0]) + squared_norm(W_M[m][1])
-                        for m in range(1, n_times))),
+                    squared_norm(R) + squared_norm(Z_M.data) +
+                    squared_norm(W_M.data)),
                 np.sqrt(
-                    squared_norm(Z_0 - W_0) + sum(
-                        squared_norm(Z_0[:-m]) + squared_norm(Z_0[m:]) +
-                        squared_norm(W_0[:-m]) + squared_norm(W_0[m:])
-                        for m in range(1, n_times)))),
+                    squared_norm(Z_0 - W_0) + norm_Z_0_M + norm_W_0_M)),
             e_dual=n_features * np.sqrt(n_times * (2 * n_times - 1)) * tol +
             rtol * rho * np.sqrt(
-                squared_norm(X_0) + sum(
-                    squared_norm(Y_M[m][0]) + squared_norm(Y_M[m][1]) +
-                    squared_norm(U_M[m][0]) + squared_norm(U_M[m][1])
-                    for m in range(1, n_times))))
-
-        R_old = R.copy()
-        for m in range(1, n_times):
-            Z_M_old[m] = (Z_M[m][0].copy(), Z_M[m][1].copy())
-            W_M_old[m] = (W_M[m][0].copy(), W_M[m][1].copy())
+                squared_norm(X_0) + squared_norm(Y_M.data) +
+                squared_norm(U_M.data)))
 
         if verbose:
             print(
@@ -301,19 +266,9 @@ def kernel_latent_time_graphical_lasso(
         if check.rnorm <= check.e_pri and check.snorm <= check.e_dual:
             break
 
-        rho_new = update_rho(
-            rho, rnorm, snorm, iteration=iteration_,
-            **(update_rho_options or {}))
-        # scaled dual variables should be also rescaled
-        X_0 *= rho / rho_new
-        for m in range(1, n_times):
-            Y_L, Y_R = Y_M[m]
-            Y_L *= rho / rho_new
-            Y_R *= rho / rho_new
-
-            U_L, U_R = U_M[m]
-            U_L *= rho / rho_new
-            U_R *= rho / rho_new
+        rho_new = rho_rule(
+            rho, rnorm, snorm, iteration=iteration_, check=check,
+            duals=[X_0, Y_M.data, U_M.data])
         rho = rho_new
     else:
         warnings.warn("Objective did not converge.")
@@ -373,7 +328,7 @@ class KernelLatentTimeGraphicalLasso(KernelTimeGraphicalLasso):
         If False, data are centered before computation.
 
     update_rho_options : dict, default None
-        Options for the update of rho. See `update_rho` function for details.
+        Options for the update of rho. See `rho_strategy` function for details.
 
     compute_objective : boolean, default True
         Choose if compute the objective function during iterations
@@ -383,6 +338,12 @@ class KernelLatentTimeGraphicalLasso(KernelTimeGraphicalLasso):
         How to initialise the inverse covariance matrix. Default is take
         the empirical covariance and inverting it.
 
+    dtype : {np.float64, np.float32}, default np.float64
+        Floating point precision of the solver. See `GraphicalLasso`.
+
+    n_jobs : int or None, default None
+        Number of jobs used to update the different times in parallel.
+
     Attributes
     ----------
     covariance_ : array-like, shape (n_times, n_features, n_features)
@@ -405,13 +366,13 @@ class KernelLatentTimeGraphicalLasso(KernelTimeGraphicalLasso):
             max_iter=100, verbose=False, assume_centered=False,
             return_history=False, update_rho_options=None,
             compute_objective=True, ker_psi_param=1, ker_phi_param=1,
-            init='empirical'):
+            init='empirical', dtype=np.float64, n_jobs=None):
         super(KernelLatentTimeGraphicalLasso, self).__init__(
             alpha=alpha, rho=rho, tol=tol, rtol=rtol, max_iter=max_iter,
             verbose=verbose, assume_centered=assume_centered,
             update_rho_options=update_rho_options,
             compute_objective=compute_objective, return_history=return_history,
-            psi=psi, init=init)
+            psi=psi, init=init, dtype=dtype, n_jobs=n_jobs)
         self.kernel_psi = kernel_psi
         self.kernel_phi = kernel_phi
         self.tau = tau
@@ -474,7 +435,8 @@ class KernelLatentTimeGraphicalLasso(KernelTimeGraphicalLasso):
             verbose=self.verbose, return_n_iter=True,
             return_history=self.return_history,
             update_rho_options=self.update_rho_options,
-            compute_objective=self.compute_objective, init=self.init)
+            compute_objective=self.compute_objective, init=self.init,
+            n_jobs=self.n_jobs)
         if self.return_history:
             self.precision_, self.latent_, self.covariance_, self.history_, \
                 self.n_iter_ = out
@@ -530,7 +492,7 @@ class SimilarityLatentTimeGraphicalLasso(KernelLatentTimeGraphicalLasso):
         If False, data are centered before computation.
 
     update_rho_options : dict, default None
-        Options for the update of rho. See `update_rho` function for details.
+        Options for the update of rho. See `rho_strategy` function for details.
 
     compute_objective : boolean, default True
         Choose if compute the objective function during iterations
@@ -540,6 +502,9 @@ class SimilarityLatentTimeGraphicalLasso(KernelLatentTimeGraphicalLasso):
         How to initialise the inverse covariance matrix. Default is take
         the empirical covariance and inverting it.
 
+    dtype : {np.float64, np.float32}, default np.float64
+        Floating point precision of the solver. See `GraphicalLasso`.
+
     Attributes
     ----------
     covariance_ : array-like, shape (n_times, n_features, n_features)
@@ -563,7 +528,7 @@ class SimilarityLatentTimeGraphicalLasso(KernelLatentTimeGraphicalLasso):
             assume_centered=False, return_history=False,
             update_rho_options=None, compute_objective=True, ker_psi_param=1,
             ker_phi_param=1, max_iter_ext=100, init='empirical', eps=1e-6,
-            n_clusters=None):
+            n_clusters=None, dtype=np.float64):
         super(SimilarityLatentTimeGraphicalLasso, self).__init__(
             alpha=alpha, tau=tau, phi=phi, psi=psi, rho=rho, tol=tol,
             rtol=rtol, max_iter=max_iter, verbose=verbose,
@@ -572,7 +537,7 @@ class SimilarityLatentTimeGraphicalLasso(KernelLatentTimeGraphicalLasso):
             compute_objective=compute_objective, return_history=return_history,
             kernel_psi=kernel_psi, kernel_phi=kernel_phi,
             ker_psi_param=ker_psi_param, ker_phi_param=ker_phi_param,
-            init=init)
+            init=init, dtype=dtype)
         self.beta = beta
         self.eta = eta
         self.max_iter_ext = max_iter_ext
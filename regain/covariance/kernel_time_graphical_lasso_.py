@@ -37,46 +37,297 @@ from __future__ import division
 import warnings
 
 import numpy as np
-from scipy import linalg
-from six.moves import map, range, zip
+from scipy.fftpack import next_fast_len
+from six.moves import map, range
 from sklearn.cluster import AgglomerativeClustering
 from sklearn.gaussian_process import kernels
 from sklearn.utils.extmath import squared_norm
 from sklearn.utils.validation import check_is_fitted
 
 from regain.covariance.time_graphical_lasso_ import (
-    TimeGraphicalLasso, init_precision, loss)
-from regain.norm import l1_od_norm
+    TimeGraphicalLasso, _l1_od_penalty, _time_graphical_lasso_laplacian,
+    init_precision, loss)
 from regain.prox import prox_logdet, soft_thresholding
-from regain.update_rules import update_rho
-from regain.utils import convergence
+from regain.update_rules import rho_strategy
+from regain.utils import LagStack, convergence
 from regain.validation import check_norm_prox
 
 # from regain.clustering import graph_k_means
 
 
-def objective(n_samples, S, K, Z_0, Z_M, alpha, kernel, psi):
+def objective(n_samples, S, K, Z_0, Z_M, alpha, kernel, psi, logdet=None):
     """Objective function for time-varying graphical lasso."""
-    obj = loss(S, K, n_samples=n_samples)
-    if isinstance(alpha, np.ndarray):
-        obj += sum(l1_od_norm(a * z) for a, z in zip(alpha, Z_0))
-    else:
-        obj += alpha * sum(map(l1_od_norm, Z_0))
+    obj = loss(S, K, n_samples=n_samples, logdet=logdet)
+    obj += _l1_od_penalty(alpha, Z_0)
 
-    for m in range(1, Z_0.shape[0]):
-        # all possible markovians jumps
-        Z_L, Z_R = Z_M[m]
+    for m, (Z_L, Z_R) in Z_M.items():
+        # markovians jumps with a non-negligible kernel
         obj += np.sum(np.array(list(map(psi, Z_R - Z_L))) * np.diag(kernel, m))
 
     return obj
 
 
+def _update_lags(
+        A_M, prox, node_penalty, kernel, rho, node_states=None, **kwargs):
+    """Update in-place the consensus variables of all the lags.
+
+    Parameters
+    ----------
+    A_M : LagStack
+        Points where to compute the prox of the consensus variables, i.e.,
+        the variables they are in consensus with plus the duals.
+        It is overwritten with the updated consensus variables.
+    prox : callable
+        Prox of the penalty on the difference of the variables of a lag.
+    node_penalty : bool
+        If the penalty is the node penalty, solved lag by lag with `kwargs`.
+    kernel : ndarray, shape (n_times, n_times)
+        Temporal kernel.
+    rho : float
+        Augmented Lagrangian parameter.
+    node_states : dict, optional
+        Inner state of the node penalty prox of each lag, updated in-place
+        to warm start it at the next call.
+
+    """
+    if not node_penalty:
+        # A_M.R holds the differences of the pairs, A_M.L their sums
+        A_M.R -= A_M.L
+        A_M.L *= 2.
+        A_M.L += A_M.R
+        # lag by lag, to bound the size of the temporaries of the prox
+        for m, (_, E) in A_M.items():
+            E[...] = prox(
+                E, lamda=2. * np.diag(kernel, m)[:, None, None] / rho)
+        A_M.L -= A_M.R
+        A_M.R *= 2.
+        A_M.R += A_M.L
+        A_M.data *= .5
+    else:
+        if node_states is None:
+            node_states = {}
+        for m, (A_L, A_R) in A_M.items():
+            A_L[...], A_R[...], node_states[m] = prox(
+                np.concatenate((A_L, A_R), axis=1),
+                lamda=.5 * np.diag(kernel, m)[:, None, None] / rho, rho=rho,
+                warm_start=node_states.get(m), return_state=True, **kwargs)
+
+
+def kernel_lags(kernel, max_lag=None, kernel_tol=0.):
+    """Lags between times on which the kernel is not negligible.
+
+    Parameters
+    ----------
+    kernel : ndarray, shape (n_times, n_times)
+        Temporal kernel.
+    max_lag : int, optional
+        Maximum lag to consider, i.e., the bandwidth of the kernel.
+        If None, all lags up to n_times - 1 are considered.
+    kernel_tol : float, default 0
+        Lags whose kernel diagonal is not greater than `kernel_tol` (in
+        absolute value) are discarded.
+
+    Returns
+    -------
+    lags : list
+        Lags m such that the m-th diagonal of the kernel is kept.
+
+    """
+    n_times = kernel.shape[0]
+    if max_lag is None:
+        max_lag = n_times - 1
+    return [
+        m for m in range(1, min(max_lag, n_times - 1) + 1)
+        if np.max(np.abs(np.diag(kernel, m))) > kernel_tol
+    ]
+
+
+def kernel_laplacian(kernel, max_lag=None, kernel_tol=0.):
+    """Laplacian of the graph of times weighted by the kernel.
+
+    Only the lags returned by `kernel_lags` are considered, so that
+    sum_{s>t} k(s,t) ||K_s - K_t||^2 is the quadratic form of the Laplacian
+    on the flattened stack of matrices.
+
+    Returns
+    -------
+    laplacian : ndarray, shape (n_times, n_times)
+        Laplacian of the kernel.
+
+    """
+    n_times = kernel.shape[0]
+    lags = np.abs(np.subtract.outer(np.arange(n_times), np.arange(n_times)))
+    coupled = np.isin(
+        lags, kernel_lags(kernel, max_lag=max_lag, kernel_tol=kernel_tol))
+    adjacency = np.where(coupled, kernel, 0.)
+    return np.diag(adjacency.sum(axis=1)) - adjacency
+
+
+def stationary_weights(kernel, max_lag=None, kernel_tol=0.):
+    """Weight of each lag of a stationary kernel on a uniform time grid.
+
+    The kernel of a stationary function (such as RBF or ExpSineSquared) of
+    equally spaced times is Toeplitz, i.e., constant along each diagonal.
+
+    Returns
+    -------
+    weights : ndarray, shape (n_times,) or None
+        Kernel at each lag returned by `kernel_lags` (zero elsewhere), or
+        None if the kernel is not constant along the diagonals of the lags.
+
+    """
+    weights = np.zeros(kernel.shape[0])
+    for m in kernel_lags(kernel, max_lag=max_lag, kernel_tol=kernel_tol):
+        diagonal = np.diag(kernel, m)
+        if not np.allclose(diagonal, diagonal[0], rtol=1e-10, atol=0):
+            return None
+        weights[m] = diagonal[0]
+    return weights
+
+
+# number of times from which the FFT is faster than the dense operator
+_MIN_TIMES_FFT = 1000
+
+
+class _DenseLaplacian(object):
+    """Laplacian of the kernel, solved through its eigendecomposition."""
+
+    def __init__(self, laplacian):
+        self.laplacian = laplacian
+        eig, self.vec = np.linalg.eigh(laplacian)
+        self.eig = np.maximum(eig, 0)
+
+    def dot(self, Z):
+        return self.laplacian.dot(Z.reshape(Z.shape[0], -1)).reshape(Z.shape)
+
+    def solve(self, B, lamda, out=None, x0=None):
+        """Solve (I + lamda L) X = B."""
+        C = self.vec.T.dot(B.reshape(B.shape[0], -1))
+        C /= (1. + lamda * self.eig)[:, None]
+        if out is None:
+            return self.vec.dot(C).reshape(B.shape)
+        out[...] = self.vec.dot(C).reshape(B.shape)
+        return out
+
+
+class _ToeplitzLaplacian(object):
+    """Laplacian of a stationary kernel on a uniform time grid.
+
+    The product with the kernel is a convolution along time, computed by
+    FFT in O(T log T) for each entry of the matrices. Systems are solved by
+    conjugate gradient, preconditioned by the circulant approximation of
+    the Laplacian (which is also diagonalised by the FFT).
+    """
+
+    def __init__(self, weights, tol=1e-10, max_iter=None):
+        n_times = weights.size
+        self.n_times = n_times
+        self.tol = tol
+        self.max_iter = n_times if max_iter is None else max_iter
+
+        # symmetric filter, wrapped to avoid aliasing of the convolution
+        self.n_fft = next_fast_len(2 * n_times - 1)
+        kernel_filter = np.zeros(self.n_fft)
+        kernel_filter[:n_times] = weights
+        kernel_filter[self.n_fft - n_times + 1:] = weights[:0:-1]
+        self.kernel_fft = np.fft.rfft(kernel_filter).real
+        self.degree = self._convolve(np.ones(n_times))
+
+        # eigenvalues of the circulant Laplacian of the central lags
+        lags = np.arange(n_times)
+        circulant = weights[np.minimum(lags, n_times - lags)]
+        self.circulant_eig = circulant.sum() - np.fft.rfft(circulant).real
+
+    def _convolve(self, Z):
+        # time is the last axis, to have contiguous transforms
+        Z_fft = np.fft.rfft(Z, n=self.n_fft)
+        Z_fft *= self.kernel_fft
+        return np.fft.irfft(Z_fft, n=self.n_fft)[..., :self.n_times]
+
+    def _dot(self, Z):
+        return self.degree * Z - self._convolve(Z)
+
+    def dot(self, Z):
+        return self._dot(Z.reshape(Z.shape[0], -1).T).T.reshape(Z.shape)
+
+    def solve(self, B, lamda, out=None, x0=None):
+        """Solve (I + lamda L) X = B, starting from x0."""
+        precond = 1. + lamda * self.circulant_eig
+
+        def apply_precond(R):
+            R_fft = np.fft.rfft(R)
+            R_fft /= precond
+            return np.fft.irfft(R_fft, n=self.n_times)
+
+        shape = B.shape
+        B = np.ascontiguousarray(B.reshape(shape[0], -1).T)
+        X = np.zeros_like(B) if x0 is None else np.array(
+            x0.reshape(shape[0], -1).T, order='C')
+        R = B - X - lamda * self._dot(X)
+        Z = apply_precond(R)
+        P = Z.copy()
+        rz = np.einsum('ij,ij->i', R, Z)
+        threshold = self.tol * np.linalg.norm(B, axis=1)
+        for _ in range(self.max_iter):
+            if np.all(np.linalg.norm(R, axis=1) <= threshold):
+                break
+            Q = P + lamda * self._dot(P)
+            alpha = np.zeros_like(rz)
+            pq = np.einsum('ij,ij->i', P, Q)
+            np.divide(rz, pq, out=alpha, where=pq > 0)
+            X += alpha[:, None] * P
+            R -= alpha[:, None] * Q
+            Z = apply_precond(R)
+            rz_new = np.einsum('ij,ij->i', R, Z)
+            beta = np.zeros_like(rz)
+            np.divide(rz_new, rz, out=beta, where=rz > 0)
+            P *= beta[:, None]
+            P += Z
+            rz = rz_new
+
+        if out is None:
+            return X.T.reshape(shape)
+        out[...] = X.T.reshape(shape)
+        return out
+
+
+def _kernel_time_graphical_lasso_laplacian(
+        emp_cov, kernel=None, max_lag=None, kernel_tol=0., stationary='auto',
+        **params):
+    """Kernel time-varying graphical lasso solver for psi='laplacian'.
+
+    The penalty is the quadratic form of the Laplacian of the kernel, so a
+    single consensus variable Z_L replaces the ones of all the pairs of
+    times. Its update is a linear operator along time, applied through the
+    eigendecomposition of the Laplacian computed once, or through FFT
+    convolutions if the kernel is stationary. The ADMM iterations are the
+    ones of `_time_graphical_lasso_laplacian`, with other `params`.
+    """
+    n_times = emp_cov.shape[0]
+    weights = None
+    if stationary:
+        weights = stationary_weights(
+            kernel, max_lag=max_lag, kernel_tol=kernel_tol)
+        if weights is None and stationary != 'auto':
+            raise ValueError(
+                "The kernel is not constant along its diagonals, hence it "
+                "is not a stationary kernel on equally spaced times.")
+    if weights is not None and (
+            stationary != 'auto' or n_times >= _MIN_TIMES_FFT):
+        laplacian = _ToeplitzLaplacian(weights)
+    else:
+        laplacian = _DenseLaplacian(
+            kernel_laplacian(kernel, max_lag=max_lag, kernel_tol=kernel_tol))
+    return _time_graphical_lasso_laplacian(emp_cov, laplacian, **params)
+
+
 def kernel_time_graphical_lasso(
         emp_cov, alpha=0.01, rho=1, kernel=None, max_iter=100, n_samples=None,
         verbose=False, psi='laplacian', tol=1e-4, rtol=1e-4,
         return_history=False, return_n_iter=True, mode='admm',
         update_rho_options=None, compute_objective=True, stop_at=None,
-        stop_when=1e-4, init="empirical"):
+        stop_when=1e-4, init="empirical", n_jobs=None, max_lag=None,
+        kernel_tol=0., stationary='auto'):
     """Time-varying graphical lasso solver.
 
     Solves the following problem via ADMM:
@@ -105,6 +356,23 @@ def kernel_time_graphical_lasso(
     init : {'empirical', 'zeros', ndarray}, default 'empirical'
         How to initialise the inverse covariance matrix. Default is take
         the empirical covariance and inverting it.
+    n_jobs : int or None, optional
+        Number of jobs used to compute the proximal operator of the
+        log-likelihood of the different times in parallel.
+    max_lag : int, optional
+        Bandwidth of the kernel. Only the times at most `max_lag` apart are
+        coupled. If None, all pairs of times are considered.
+    kernel_tol : float, default 0
+        Lags where the kernel is not greater than `kernel_tol` are ignored,
+        hence the consensus variables are allocated and updated only for
+        the remaining ones. The default discards the lags where the kernel
+        is zero, which do not change the solution.
+    stationary : {'auto', True, False}, default 'auto'
+        Whether the kernel is stationary on equally spaced times, i.e.,
+        constant along its diagonals (see `stationary_weights`). In this
+        case, with psi='laplacian', the products with the kernel are
+        computed as FFT convolutions along time. If 'auto', this is
+        detected, and used for long series only.
 
     Returns
     -------
@@ -115,128 +383,130 @@ def kernel_time_graphical_lasso(
         objective value, the primal and dual residual norms, and tolerances
         for the primal and dual residual norms at each iteration.
 
+    Notes
+    -----
+    With psi='laplacian' the penalty is the quadratic form of the Laplacian
+    of the kernel (see `kernel_laplacian`). Hence, instead of a consensus
+    variable for each pair of times, a single one is updated by a linear
+    operator along time, from the eigendecomposition of the Laplacian,
+    using O(T d^2 + T^2) memory. For stationary kernels, the linear systems
+    are instead solved by conjugate gradient with FFT convolutions, in
+    O(T log T d^2) for each of its iterations and O(T d^2) memory.
+
     """
-    psi, prox_psi, psi_node_penalty = check_norm_prox(psi)
     n_times, _, n_features = emp_cov.shape
-
     if kernel is None:
         kernel = np.eye(n_times)
 
+    if psi == 'laplacian':
+        return _kernel_time_graphical_lasso_laplacian(
+            emp_cov, alpha=alpha, rho=rho, kernel=kernel, max_iter=max_iter,
+            n_samples=n_samples, verbose=verbose, tol=tol, rtol=rtol,
+            return_history=return_history, return_n_iter=return_n_iter,
+            update_rho_options=update_rho_options,
+            compute_objective=compute_objective, stop_at=stop_at,
+            stop_when=stop_when, init=init, n_jobs=n_jobs, max_lag=max_lag,
+            kernel_tol=kernel_tol, stationary=stationary)
+
+    psi, prox_psi, psi_node_penalty = check_norm_prox(psi)
+
     Z_0 = init_precision(emp_cov, mode=init)
     U_0 = np.zeros_like(Z_0)
     Z_0_old = np.zeros_like(Z_0)
 
-    Z_M, Z_M_old = {}, {}
-    U_M = {}
-    for m in range(1, n_times):
-        # all possible markovians jumps
-        Z_L = Z_0.copy()[:-m]
-        Z_R = Z_0.copy()[m:]
-        Z_M[m] = (Z_L, Z_R)
+    # buffers, reused across iterations
+    K = np.empty_like(Z_0)
+    A = np.empty_like(Z_0)
 
-        U_L = np.zeros_like(Z_L)
-        U_R = np.zeros_like(Z_R)
-        U_M[m] = (U_L, U_R)
+    # consensus variables of the markovians jumps with a non-negligible
+    # kernel, stored contiguously for all the lags
+    lags = kernel_lags(kernel, max_lag=max_lag, kernel_tol=kernel_tol)
+    Z_M = LagStack(lags, Z_0.shape, dtype=Z_0.dtype)
+    U_M = LagStack(lags, Z_0.shape, dtype=Z_0.dtype)
+    Z_M.gather(Z_0, out=Z_M.data)
+    # buffer of the lags, swapped with Z_M at its update
+    A_M = LagStack(lags, Z_0.shape, dtype=Z_0.dtype)
 
-        Z_L_old = np.zeros_like(Z_L)
-        Z_R_old = np.zeros_like(Z_R)
-        Z_M_old[m] = (Z_L_old, Z_R_old)
+    # number of variables each K_i is in consensus with
+    divisor = 1. + Z_M.counts()
 
     if n_samples is None:
         n_samples = np.ones(n_times)
 
+    rho_rule = rho_strategy(**(update_rho_options or {}))
+    # inner states of the node penalty prox, to warm start it
+    node_states = {}
     checks = [
         convergence(
             obj=objective(
-                n_samples, emp_cov, Z_0, Z_0, Z_M, alpha, kernel, psi))
+                n_samples, emp_cov, Z_0, Z_0, Z_M, alpha, kernel, psi)
+            if compute_objective else np.nan)
     ]
     for iteration_ in range(max_iter):
         # update K
-        A = Z_0 - U_0
-        for m in range(1, n_times):
-            A[:-m] += Z_M[m][0] - U_M[m][0]
-            A[m:] += Z_M[m][1] - U_M[m][1]
+        np.subtract(Z_0, U_0, out=A)
+        np.subtract(Z_M.data, U_M.data, out=A_M.data)
+        Z_M.scatter_add(A_M.data, out=A)
 
-        A /= n_times
+        A /= divisor[:, None, None]
         # soft_thresholding_ = partial(soft_thresholding, lamda=alpha / rho)
         # K = np.array(map(soft_thresholding_, A))
         A += A.transpose(0, 2, 1)
         A /= 2.
 
-        A *= -rho * n_times / n_samples[:, None, None]
+        A *= -rho * divisor[:, None, None] / n_samples[:, None, None]
         A += emp_cov
 
-        K = np.array(
-            [
-                prox_logdet(a, lamda=ni / (rho * n_times))
-                for a, ni in zip(A, n_samples)
-            ])
+        K, k_eig, k_vec = prox_logdet(
+            A, lamda=n_samples / (rho * divisor), out=K, return_eig=True,
+            n_jobs=n_jobs)
 
-        # update Z_0
-        A = K + U_0
+        # update Z_0, the previous one is kept by swapping the buffers
+        Z_0, Z_0_old = Z_0_old, Z_0
+        np.add(K, U_0, out=A)
         A += A.transpose(0, 2, 1)
         A /= 2.
-        Z_0 = soft_thresholding(A, lamda=alpha / rho)
+        Z_0 = soft_thresholding(A, lamda=alpha / rho, out=Z_0)
 
         # update residuals
         U_0 += K - Z_0
 
-        # other Zs
-        for m in range(1, n_times):
-            U_L, U_R = U_M[m]
-            A_L = K[:-m] + U_L
-            A_R = K[m:] + U_R
-            if not psi_node_penalty:
-                prox_e = prox_psi(
-                    A_R - A_L,
-                    lamda=2. * np.diag(kernel, m)[:, None, None] / rho)
-                Z_L = .5 * (A_L + A_R - prox_e)
-                Z_R = .5 * (A_L + A_R + prox_e)
-            else:
-                Z_L, Z_R = prox_psi(
-                    np.concatenate((A_L, A_R), axis=1),
-                    lamda=.5 * np.diag(kernel, m)[:, None, None] / rho,
-                    rho=rho, tol=tol, rtol=rtol, max_iter=max_iter)
-            Z_M[m] = (Z_L, Z_R)
-
-            # update other residuals
-            U_L += K[:-m] - Z_L
-            U_R += K[m:] - Z_R
+        # other Zs, computed in A_M and swapped with the previous ones
+        Z_M.gather(K, out=A_M.data)
+        A_M.data += U_M.data
+        _update_lags(
+            A_M, prox_psi, psi_node_penalty, kernel, rho,
+            node_states=node_states, tol=tol, rtol=rtol, max_iter=max_iter,
+            update_rho_options=update_rho_options)
+        Z_M.data -= A_M.data
+        snorm_M = squared_norm(Z_M.data)
+        Z_M, A_M = A_M, Z_M
+
+        # update other residuals, with K_M in A_M
+        K_M = Z_M.gather(K, out=A_M.data)
+        norm_K_M = squared_norm(K_M)
+        K_M -= Z_M.data
+        U_M.data += K_M
+        rnorm_M = squared_norm(K_M)
+        K_M += Z_M.data
 
         # diagnostics, reporting, termination checks
-        rnorm = np.sqrt(
-            squared_norm(K - Z_0) + sum(
-                squared_norm(K[:-m] - Z_M[m][0]) +
-                squared_norm(K[m:] - Z_M[m][1]) for m in range(1, n_times)))
+        rnorm = np.sqrt(squared_norm(K - Z_0) + rnorm_M)
 
-        snorm = rho * np.sqrt(
-            squared_norm(Z_0 - Z_0_old) + sum(
-                squared_norm(Z_M[m][0] - Z_M_old[m][0]) +
-                squared_norm(Z_M[m][1] - Z_M_old[m][1])
-                for m in range(1, n_times)))
+        snorm = rho * np.sqrt(squared_norm(Z_0 - Z_0_old) + snorm_M)
 
         obj = objective(
-            n_samples, emp_cov, Z_0, K, Z_M, alpha, kernel, psi) \
+            n_samples, emp_cov, Z_0, K, Z_M, alpha, kernel, psi,
+            logdet=np.log(k_eig).sum(axis=1)) \
             if compute_objective else np.nan
 
         check = convergence(
             obj=obj, rnorm=rnorm, snorm=snorm,
             e_pri=n_features * n_times * tol + rtol * max(
-                np.sqrt(
-                    squared_norm(Z_0) + sum(
-                        squared_norm(Z_M[m][0]) + squared_norm(Z_M[m][1])
-                        for m in range(1, n_times))),
-                np.sqrt(
-                    squared_norm(K) + sum(
-                        squared_norm(K[:-m]) + squared_norm(K[m:])
-                        for m in range(1, n_times)))),
+                np.sqrt(squared_norm(Z_0) + squared_norm(Z_M.data)),
+                np.sqrt(squared_norm(K) + norm_K_M)),
             e_dual=n_features * n_times * tol + rtol * rho * np.sqrt(
-                squared_norm(U_0) + sum(
-                    squared_norm(U_M[m][0]) + squared_norm(U_M[m][1])
-                    for m in range(1, n_times))))
-        Z_0_old = Z_0.copy()
-        for m in range(1, n_times):
-            Z_M_old[m] = (Z_M[m][0].copy(), Z_M[m][1].copy())
+                squared_norm(U_0) + squared_norm(U_M.data)))
 
         if verbose:
             print(
@@ -251,20 +521,16 @@ def kernel_time_graphical_lasso(
         if check.rnorm <= check.e_pri and check.snorm <= check.e_dual:
             break
 
-        rho_new = update_rho(
-            rho, rnorm, snorm, iteration=iteration_,
-            **(update_rho_options or {}))
-        # scaled dual variables should be also rescaled
-        U_0 *= rho / rho_new
-        for m in range(1, n_times):
-            U_L, U_R = U_M[m]
-            U_L *= rho / rho_new
-            U_R *= rho / rho_new
+        rho_new = rho_rule(
+            rho, rnorm, snorm, iteration=iteration_, check=check,
+            duals=[U_0, U_M.data], Ax=[K, K_M], Bz=[Z_0, Z_M.data])
         rho = rho_new
     else:
         warnings.warn("Objective did not converge.")
 
-    covariance_ = np.array([linalg.pinvh(x) for x in Z_0])
+    # inverse of the last K, from its eigendecomposition
+    covariance_ = np.matmul(
+        k_vec / k_eig[:, None, :], k_vec.transpose(0, 2, 1))
     return_list = [Z_0, covariance_]
     if return_history:
         return_list.append(checks)
@@ -363,7 +629,7 @@ class KernelTimeGraphicalLasso(TimeGraphicalLasso):
         If False, data are centered before computation.
 
     update_rho_options : dict, default None
-        Options for the update of rho. See `update_rho` function for details.
+        Options for the update of rho. See `rho_strategy` function for details.
 
     compute_objective : boolean, default True
         Choose if compute the objective function during iterations
@@ -373,34 +639,65 @@ class KernelTimeGraphicalLasso(TimeGraphicalLasso):
         How to initialise the inverse covariance matrix. Default is take
         the empirical covariance and inverting it.
 
+    dtype : {np.float64, np.float32}, default np.float64
+        Floating point precision of the solver. See `GraphicalLasso`.
+
+    n_jobs : int or None, default None
+        Number of jobs used to update the different times in parallel.
+
+    max_lag : int, default None
+        Bandwidth of the kernel. Only times at most `max_lag` apart are
+        coupled. If None, all pairs of times are considered.
+
+    kernel_tol : float, default 0
+        Lags where the kernel is not greater than `kernel_tol` are ignored.
+        See `kernel_lags` function for details.
+
+    stationary : {'auto', True, False}, default 'auto'
+        Whether the kernel is stationary on equally spaced times, so that
+        with psi='laplacian' it is applied by FFT. See
+        `kernel_time_graphical_lasso` function for details.
+
+    output : {'dense', 'sparse'}, default 'dense'
+        Storage of `precision_`. With 'sparse', it is a list with a
+        scipy.sparse CSR matrix for each time.
+
     Attributes
     ----------
     covariance_ : array-like, shape (n_times, n_features, n_features)
         Estimated covariance matrix
 
     precision_ : array-like, shape (n_times, n_features, n_features)
-        Estimated pseudo inverse matrix.
+        Estimated pseudo inverse matrix (list of CSR matrices if sparse
+        output).
 
     n_iter_ : int
         Number of iterations run.
 
     """
+    _warm_start_fit = False
+
     def __init__(
             self, alpha=0.01, beta=1, kernel=None, rho=1., tol=1e-4, rtol=1e-4,
             psi='laplacian', max_iter=100, verbose=False,
             assume_centered=False, return_history=False,
             update_rho_options=None, compute_objective=True, ker_param=1,
-            max_iter_ext=100, init='empirical'):
+            max_iter_ext=100, init='empirical', dtype=np.float64,
+            n_jobs=None, max_lag=None, kernel_tol=0., stationary='auto',
+            output='dense'):
         super(KernelTimeGraphicalLasso, self).__init__(
             alpha=alpha, beta=beta, rho=rho, tol=tol, rtol=rtol,
             max_iter=max_iter, verbose=verbose,
             assume_centered=assume_centered,
             update_rho_options=update_rho_options,
             compute_objective=compute_objective, return_history=return_history,
-            psi=psi, init=init)
+            psi=psi, init=init, dtype=dtype, n_jobs=n_jobs, output=output)
         self.kernel = kernel
         self.ker_param = ker_param
         self.max_iter_ext = max_iter_ext
+        self.max_lag = max_lag
+        self.kernel_tol = kernel_tol
+        self.stationary = stationary
 
     def _fit(self, emp_cov, n_samples):
         if self.ker_param == "auto":
@@ -443,7 +740,9 @@ class KernelTimeGraphicalLasso(TimeGraphicalLasso):
                     return_n_iter=True, return_history=self.return_history,
                     update_rho_options=self.update_rho_options,
                     compute_objective=self.compute_objective,
-                    init=self.precision_)
+                    init=self.precision_, n_jobs=self.n_jobs,
+                    max_lag=self.max_lag, kernel_tol=self.kernel_tol,
+                    stationary=self.stationary)
                 if self.return_history:
                     (
                         self.precision_, self.covariance_, self.history_,
@@ -478,7 +777,9 @@ class KernelTimeGraphicalLasso(TimeGraphicalLasso):
                 psi=self.psi, max_iter=self.max_iter, verbose=self.verbose,
                 return_n_iter=True, return_history=self.return_history,
                 update_rho_options=self.update_rho_options,
-                compute_objective=self.compute_objective, init=self.init)
+                compute_objective=self.compute_objective, init=self.init,
+                n_jobs=self.n_jobs, max_lag=self.max_lag,
+                kernel_tol=self.kernel_tol, stationary=self.stationary)
             if self.return_history:
                 (
                     self.precision_, self.covariance_, self.history_,
@@ -486,7 +787,7 @@ class KernelTimeGraphicalLasso(TimeGraphicalLasso):
             else:
                 self.precision_, self.covariance_, self.n_iter_ = out
 
-        return self
+        return self._format_output()
 
 
 class SimilarityTimeGraphicalLasso(KernelTimeGraphicalLasso):
@@ -530,7 +831,7 @@ class SimilarityTimeGraphicalLasso(KernelTimeGraphicalLasso):
         If False, data are centered before computation.
 
     update_rho_options : dict, default None
-        Options for the update of rho. See `update_rho` function for details.
+        Options for the update of rho. See `rho_strategy` function for details.
 
     compute_objective : boolean, default True
         Choose if compute the objective function during iterations
@@ -540,6 +841,9 @@ class SimilarityTimeGraphicalLasso(KernelTimeGraphicalLasso):
         How to initialise the inverse covariance matrix. Default is take
         the empirical covariance and inverting it.
 
+    dtype : {np.float64, np.float32}, default np.float64
+        Floating point precision of the solver. See `GraphicalLasso`.
+
     Attributes
     ----------
     covariance_ : array-like, shape (n_times, n_features, n_features)
@@ -557,14 +861,15 @@ class SimilarityTimeGraphicalLasso(KernelTimeGraphicalLasso):
             psi='laplacian', max_iter=100, verbose=False,
             assume_centered=False, return_history=False,
             update_rho_options=None, compute_objective=True, ker_param=1,
-            max_iter_ext=100, init='empirical', eps=1e-6, n_clusters=None):
+            max_iter_ext=100, init='empirical', eps=1e-6, n_clusters=None,
+            dtype=np.float64):
         super(SimilarityTimeGraphicalLasso, self).__init__(
             alpha=alpha, beta=beta, rho=rho, tol=tol, rtol=rtol,
             max_iter=max_iter, verbose=verbose,
             assume_centered=assume_centered,
             update_rho_options=update_rho_options,
             compute_objective=compute_objective, return_history=return_history,
-            psi=psi, init=init)
+            psi=psi, init=init, dtype=dtype)
         # in this class, `kernel` is either a matrix TxT or None
         # if None, automatically learn all the weights
         self.kernel = kernel
@@ -627,7 +932,7 @@ class SimilarityTimeGraphicalLasso(KernelTimeGraphicalLasso):
                     return_n_iter=True, return_history=self.return_history,
                     update_rho_options=self.update_rho_options,
                     compute_objective=self.compute_objective,
-                    init=self.precision_)
+                    init=self.precision_, n_jobs=self.n_jobs)
 
                 if self.return_history:
                     (
@@ -662,7 +967,8 @@ class SimilarityTimeGraphicalLasso(KernelTimeGraphicalLasso):
                 psi=self.psi, max_iter=self.max_iter, verbose=self.verbose,
                 return_n_iter=True, return_history=self.return_history,
                 update_rho_options=self.update_rho_options,
-                compute_objective=self.compute_objective, init=self.init)
+                compute_objective=self.compute_objective, init=self.init,
+                n_jobs=self.n_jobs)
             if self.return_history:
                 (
                     self.precision_, self.covariance_, self.history_,
@@ -39,8 +39,8 @@ from six.moves import range
 from regain.covariance.graphical_lasso_ import GraphicalLasso, init_precision
 from regain.covariance.graphical_lasso_ import objective as obj_gl
 from regain.prox import prox_logdet, prox_trace_indicator, soft_thresholding
-from regain.update_rules import update_rho
-from regain.utils import convergence
+from regain.update_rules import rho_strategy
+from regain.utils import convergence, to_dense
 
 
 def objective(emp_cov, R, K, L, alpha, tau):
@@ -84,7 +84,7 @@ def latent_graphical_lasso(
         Print info at each iteration.
     update_rho_options : dict, optional
         Arguments for the rho update.
-        See regain.update_rules.update_rho function for more information.
+        See regain.update_rules.rho_strategy function for more information.
     compute_objective : bool, default True
         Choose to compute the objective value.
     init : {'empirical', 'zeros', ndarray}, default 'empirical'
@@ -110,6 +110,7 @@ def latent_graphical_lasso(
     U = np.zeros_like(emp_cov)
     R_old = np.zeros_like(emp_cov)
 
+    rho_rule = rho_strategy(**(update_rho_options or {}))
     checks = []
     for iteration_ in range(max_iter):
         # update R
@@ -150,11 +151,8 @@ def latent_graphical_lasso(
             break
         if check.obj == np.inf:
             break
-        rho_new = update_rho(
-            rho, rnorm, snorm, iteration=iteration_,
-            **(update_rho_options or {}))
-        # scaled dual variables should be also rescaled
-        U *= rho / rho_new
+        rho_new = rho_rule(
+            rho, rnorm, snorm, iteration=iteration_, check=check, duals=[U])
         rho = rho_new
     else:
         warnings.warn("Objective did not converge.")
@@ -207,7 +205,7 @@ class LatentGraphicalLasso(GraphicalLasso):
         If False, data are centered before computation.
 
     update_rho_options : dict, default None
-        Options for the update of rho. See `update_rho` function for details.
+        Options for the update of rho. See `rho_strategy` function for details.
 
     compute_objective : boolean, default True
         Choose if compute the objective function during iterations
@@ -217,13 +215,20 @@ class LatentGraphicalLasso(GraphicalLasso):
         How to initialise the inverse covariance matrix. Default is take
         the empirical covariance and inverting it.
 
+    dtype : {np.float64, np.float32}, default np.float64
+        Floating point precision of the solver. See `GraphicalLasso`.
+
+    output : {'dense', 'sparse'}, default 'dense'
+        Storage of `precision_`. With 'sparse', it is a scipy.sparse CSR
+        matrix holding only the non-zero entries of the solution.
+
     Attributes
     ----------
     covariance_ : array-like, shape (n_features, n_features)
         Estimated covariance matrix
 
     precision_ : array-like, shape (n_features, n_features)
-        Estimated pseudo inverse matrix.
+        Estimated pseudo inverse matrix (CSR matrix if sparse output).
 
     latent_ : array-like, shape (n_features, n_features)
         Estimated latent variable matrix.
@@ -236,12 +241,14 @@ class LatentGraphicalLasso(GraphicalLasso):
     def __init__(
             self, alpha=0.01, tau=1., rho=1., tol=1e-4, rtol=1e-4,
             max_iter=100, verbose=False, assume_centered=False, mode='admm',
-            update_rho_options=None, compute_objective=True, init='empirical'):
+            update_rho_options=None, compute_objective=True, init='empirical',
+            dtype=np.float64, output='dense'):
         super(LatentGraphicalLasso, self).__init__(
             alpha=alpha, rho=rho, tol=tol, rtol=rtol, max_iter=max_iter,
             verbose=verbose, assume_centered=assume_centered, mode=mode,
             update_rho_options=update_rho_options,
-            compute_objective=compute_objective, init=init)
+            compute_objective=compute_objective, init=init, dtype=dtype,
+            output=output)
         self.tau = tau
 
     def get_precision(self):
@@ -254,7 +261,7 @@ class LatentGraphicalLasso(GraphicalLasso):
             Note that this is the observed precision matrix.
 
         """
-        return self.precision_ - self.latent_
+        return to_dense(self.precision_) - self.latent_
 
     def _fit(self, emp_cov):
         """Fit the LatentGraphicalLasso model to X.
@@ -273,4 +280,4 @@ class LatentGraphicalLasso(GraphicalLasso):
                 return_n_iter=True, return_history=False,
                 update_rho_options=self.update_rho_options,
                 compute_objective=self.compute_objective, init=self.init)
-        return self
+        return self._format_output()
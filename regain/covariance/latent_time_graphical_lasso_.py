@@ -42,8 +42,8 @@ from regain.covariance.time_graphical_lasso_ import (
     TimeGraphicalLasso, init_precision)
 from regain.covariance.time_graphical_lasso_ import objective as obj_tgl
 from regain.prox import prox_logdet, prox_trace_indicator, soft_thresholding
-from regain.update_rules import update_rho
-from regain.utils import convergence
+from regain.update_rules import accelerator, rho_strategy
+from regain.utils import convergence, to_dense
 from regain.validation import check_norm_prox
 
 
@@ -71,7 +71,8 @@ def latent_time_graphical_lasso(
         n_samples=None, verbose=False, psi='laplacian', phi='laplacian',
         mode='admm', tol=1e-4, rtol=1e-4, return_history=False,
         return_n_iter=True, update_rho_options=None, compute_objective=True,
-        init='empirical'):
+        init='empirical', acceleration='none', acceleration_options=None,
+        n_jobs=None):
     r"""Latent variable time-varying graphical lasso solver.
 
     Solves the following problem via ADMM:
@@ -107,12 +108,21 @@ def latent_time_graphical_lasso(
         Print info at each iteration.
     update_rho_options : dict, optional
         Arguments for the rho update.
-        See regain.update_rules.update_rho function for more information.
+        See regain.update_rules.rho_strategy function for more information.
     compute_objective : bool, default True
         Choose to compute the objective value.
     init : {'empirical', 'zeros', ndarray}, default 'empirical'
         How to initialise the inverse covariance matrix. Default is take
         the empirical covariance and inverting it.
+    acceleration : {'none', 'nesterov', 'anderson'}, default 'none'
+        Acceleration of the ADMM iterations. It is restarted when rho
+        changes or when the residuals increase.
+    acceleration_options : dict, optional
+        Arguments for the acceleration, such as `depth` for 'anderson'.
+        See regain.update_rules.accelerator function for more information.
+    n_jobs : int or None, optional
+        Number of jobs used to compute the proximal operators of the
+        different times in parallel.
 
     Returns
     -------
@@ -140,12 +150,18 @@ def latent_time_graphical_lasso(
     U_1 = np.zeros_like(W_1)
     U_2 = np.zeros_like(W_2)
 
+    R = np.empty_like(Z_0)
     R_old = np.zeros_like(Z_0)
     Z_1_old = np.zeros_like(Z_1)
     Z_2_old = np.zeros_like(Z_2)
     W_1_old = np.zeros_like(W_1)
     W_2_old = np.zeros_like(W_2)
 
+    # buffers, reused across iterations
+    A = np.empty_like(Z_0)
+    A_1 = np.empty_like(Z_1)
+    A_2 = np.empty_like(Z_2)
+
     # divisor for consensus variables, accounting for two less matrices
     divisor = np.full(emp_cov.shape[0], 3, dtype=float)
     divisor[0] -= 1
@@ -154,66 +170,85 @@ def latent_time_graphical_lasso(
     if n_samples is None:
         n_samples = np.ones(emp_cov.shape[0])
 
+    accelerate = accelerator(acceleration, **(acceleration_options or {}))
+    rho_rule = rho_strategy(**(update_rho_options or {}))
+    # inner states of the node penalty prox, to warm start it
+    node_state_psi = node_state_phi = None
     checks = []
     for iteration_ in range(max_iter):
         # update R
-        A = Z_0 - W_0 - X_0
+        np.subtract(Z_0, W_0, out=A)
+        A -= X_0
         A += A.transpose(0, 2, 1)
         A /= 2.
         A *= -rho / n_samples[:, None, None]
         A += emp_cov
         # A = emp_cov / rho - A
 
-        R = np.array(
-            [prox_logdet(a, lamda=ni / rho) for a, ni in zip(A, n_samples)])
+        R = prox_logdet(A, lamda=n_samples / rho, out=R, n_jobs=n_jobs)
 
         # update Z_0
-        A = R + W_0 + X_0
-        A[:-1] += Z_1 - X_1
-        A[1:] += Z_2 - X_2
+        np.add(R, W_0, out=A)
+        A += X_0
+        A[:-1] += Z_1
+        A[:-1] -= X_1
+        A[1:] += Z_2
+        A[1:] -= X_2
         A /= divisor[:, None, None]
         # soft_thresholding_ = partial(soft_thresholding, lamda=alpha / rho)
         # Z_0 = np.array(map(soft_thresholding_, A))
         Z_0 = soft_thresholding(
-            A, lamda=alpha / (rho * divisor[:, None, None]))
+            A, lamda=alpha / (rho * divisor[:, None, None]), out=Z_0)
 
         # update Z_1, Z_2
-        A_1 = Z_0[:-1] + X_1
-        A_2 = Z_0[1:] + X_2
+        np.add(Z_0[:-1], X_1, out=A_1)
+        np.add(Z_0[1:], X_2, out=A_2)
         if not psi_node_penalty:
             prox_e = prox_psi(A_2 - A_1, lamda=2. * beta / rho)
-            Z_1 = .5 * (A_1 + A_2 - prox_e)
-            Z_2 = .5 * (A_1 + A_2 + prox_e)
+            np.add(A_1, A_2, out=Z_1)
+            np.add(A_1, A_2, out=Z_2)
+            Z_1 -= prox_e
+            Z_2 += prox_e
+            Z_1 *= .5
+            Z_2 *= .5
         else:
-            Z_1, Z_2 = prox_psi(
+            Z_1, Z_2, node_state_psi = prox_psi(
                 np.concatenate((A_1, A_2), axis=1), lamda=.5 * beta / rho,
-                rho=rho, tol=tol, rtol=rtol, max_iter=max_iter)
+                rho=rho, tol=tol, rtol=rtol, max_iter=max_iter,
+                update_rho_options=update_rho_options,
+                warm_start=node_state_psi, return_state=True)
 
         # update W_0
-        A = Z_0 - R - X_0
-        A[:-1] += W_1 - U_1
-        A[1:] += W_2 - U_2
+        np.subtract(Z_0, R, out=A)
+        A -= X_0
+        A[:-1] += W_1
+        A[:-1] -= U_1
+        A[1:] += W_2
+        A[1:] -= U_2
         A /= divisor[:, None, None]
         A += A.transpose(0, 2, 1)
         A /= 2.
 
-        W_0 = np.array(
-            [
-                prox_trace_indicator(a, lamda=tau / (rho * div))
-                for a, div in zip(A, divisor)
-            ])
+        W_0 = prox_trace_indicator(
+            A, lamda=tau / (rho * divisor), out=W_0, n_jobs=n_jobs)
 
         # update W_1, W_2
-        A_1 = W_0[:-1] + U_1
-        A_2 = W_0[1:] + U_2
+        np.add(W_0[:-1], U_1, out=A_1)
+        np.add(W_0[1:], U_2, out=A_2)
         if not phi_node_penalty:
             prox_e = prox_phi(A_2 - A_1, lamda=2. * eta / rho)
-            W_1 = .5 * (A_1 + A_2 - prox_e)
-            W_2 = .5 * (A_1 + A_2 + prox_e)
+            np.add(A_1, A_2, out=W_1)
+            np.add(A_1, A_2, out=W_2)
+            W_1 -= prox_e
+            W_2 += prox_e
+            W_1 *= .5
+            W_2 *= .5
         else:
-            W_1, W_2 = prox_phi(
+            W_1, W_2, node_state_phi = prox_phi(
                 np.concatenate((A_1, A_2), axis=1), lamda=.5 * eta / rho,
-                rho=rho, tol=tol, rtol=rtol, max_iter=max_iter)
+                rho=rho, tol=tol, rtol=rtol, max_iter=max_iter,
+                update_rho_options=update_rho_options,
+                warm_start=node_state_phi, return_state=True)
 
         # update residuals
         X_0 += R - Z_0 + W_0
@@ -252,11 +287,11 @@ def latent_time_graphical_lasso(
                     squared_norm(X_0) + squared_norm(X_1) + squared_norm(X_2) +
                     squared_norm(U_1) + squared_norm(U_2))))
 
-        R_old = R.copy()
-        Z_1_old = Z_1.copy()
-        Z_2_old = Z_2.copy()
-        W_1_old = W_1.copy()
-        W_2_old = W_2.copy()
+        np.copyto(R_old, R)
+        np.copyto(Z_1_old, Z_1)
+        np.copyto(Z_2_old, Z_2)
+        np.copyto(W_1_old, W_1)
+        np.copyto(W_2_old, W_2)
 
         if verbose:
             print(
@@ -267,15 +302,12 @@ def latent_time_graphical_lasso(
         if check.rnorm <= check.e_pri and check.snorm <= check.e_dual:
             break
 
-        rho_new = update_rho(
-            rho, rnorm, snorm, iteration=iteration_,
-            **(update_rho_options or {}))
-        # scaled dual variables should be also rescaled
-        X_0 *= rho / rho_new
-        X_1 *= rho / rho_new
-        X_2 *= rho / rho_new
-        U_1 *= rho / rho_new
-        U_2 *= rho / rho_new
+        rho_new = rho_rule(
+            rho, rnorm, snorm, iteration=iteration_, check=check,
+            duals=[X_0, X_1, X_2, U_1, U_2])
+        accelerate(
+            [Z_0, Z_1, Z_2, W_0, W_1, W_2, X_0, X_1, X_2, U_1, U_2],
+            restart=rho_new != rho)
         rho = rho_new
     else:
         warnings.warn("Objective did not converge.")
@@ -348,7 +380,15 @@ class LatentTimeGraphicalLasso(TimeGraphicalLasso):
         Useful to use scikit-learn functions as train_test_split.
 
     update_rho_options : dict, default None
-        Options for the update of rho. See `update_rho` function for details.
+        Options for the update of rho. See `rho_strategy` function for details.
+
+    acceleration : {'none', 'nesterov', 'anderson'}, default 'none'
+        Acceleration of the ADMM iterations. It is restarted when rho
+        changes or when the residuals increase.
+
+    acceleration_options : dict, default None
+        Options for the acceleration, such as `depth` for 'anderson'.
+        See `accelerator` function for details.
 
     compute_objective : boolean, default True
         Choose if compute the objective function during iterations
@@ -358,30 +398,47 @@ class LatentTimeGraphicalLasso(TimeGraphicalLasso):
         How to initialise the inverse covariance matrix. Default is take
         the empirical covariance and inverting it.
 
+    dtype : {np.float64, np.float32}, default np.float64
+        Floating point precision of the solver. See `GraphicalLasso`.
+
+    n_jobs : int or None, default None
+        Number of jobs used to update the different times in parallel.
+
+    output : {'dense', 'sparse'}, default 'dense'
+        Storage of `precision_`. With 'sparse', it is a list with a
+        scipy.sparse CSR matrix for each time.
+
     Attributes
     ----------
     covariance_ : array-like, shape (n_times, n_features, n_features)
         Estimated covariance matrix
 
     precision_, latent_ : array-like, shape (n_times, n_features, n_features)
-        Estimated precision and latent variables matrix.
+        Estimated precision and latent variables matrix (list of CSR
+        matrices for the precision if sparse output).
 
     n_iter_ : int
         Number of iterations run.
 
     """
+    _warm_start_fit = False
 
     def __init__(
             self, alpha=0.01, tau=1., beta=1., eta=1., mode='admm', rho=1.,
             tol=1e-4, rtol=1e-4, psi='laplacian', phi='laplacian',
             max_iter=100, verbose=False, assume_centered=False,
-            update_rho_options=None, compute_objective=True, init='empirical'):
+            update_rho_options=None, compute_objective=True, init='empirical',
+            dtype=np.float64, acceleration='none', acceleration_options=None,
+            n_jobs=None, output='dense'):
         super(LatentTimeGraphicalLasso, self).__init__(
             alpha=alpha, beta=beta, mode=mode, rho=rho, tol=tol, rtol=rtol,
             psi=psi, max_iter=max_iter, verbose=verbose,
             assume_centered=assume_centered,
             update_rho_options=update_rho_options,
-            compute_objective=compute_objective, init=init)
+            compute_objective=compute_objective, init=init, dtype=dtype,
+            acceleration=acceleration,
+            acceleration_options=acceleration_options, n_jobs=n_jobs,
+            output=output)
         self.tau = tau
         self.eta = eta
         self.phi = phi
@@ -396,7 +453,7 @@ class LatentTimeGraphicalLasso(TimeGraphicalLasso):
             Note that this is the observed precision matrix.
 
         """
-        return self.precision_ - self.latent_
+        return to_dense(self.precision_) - self.latent_
 
     def _fit(self, emp_cov, n_samples):
         """Fit the LatentTimeGraphicalLasso model to X.
@@ -416,5 +473,8 @@ class LatentTimeGraphicalLasso(TimeGraphicalLasso):
                 max_iter=self.max_iter, verbose=self.verbose,
                 return_n_iter=True, return_history=False,
                 update_rho_options=self.update_rho_options,
-                compute_objective=self.compute_objective, init=self.init)
-        return self
+                compute_objective=self.compute_objective, init=self.init,
+                acceleration=self.acceleration,
+                acceleration_options=self.acceleration_options,
+                n_jobs=self.n_jobs)
+        return self._format_output()
@@ -34,14 +34,14 @@ import warnings
 from functools import partial
 
 import numpy as np
-from six.moves import map, range, zip
+from six.moves import map, range
 from sklearn.utils.extmath import squared_norm
 
 from regain.covariance.latent_time_graphical_lasso_ import \
     LatentTimeGraphicalLasso
 from regain.norm import l1_od_norm
 from regain.prox import prox_trace_indicator, soft_thresholding
-from regain.update_rules import update_rho
+from regain.update_rules import rho_strategy
 from regain.utils import convergence
 from regain.validation import check_input, check_norm_prox
 
@@ -126,6 +126,9 @@ def latent_time_matrix_decomposition(
     divisor[0] -= 1
     divisor[-1] -= 1
 
+    rho_rule = rho_strategy(**(update_rho_options or {}))
+    # inner states of the node penalty prox, to warm start it
+    node_state_psi = node_state_phi = None
     checks = []
     for iteration_ in range(max_iter):
         # update R
@@ -150,9 +153,11 @@ def latent_time_matrix_decomposition(
             Z_1 = .5 * (A_1 + A_2 - prox_e)
             Z_2 = .5 * (A_1 + A_2 + prox_e)
         else:
-            Z_1, Z_2 = prox_psi(
+            Z_1, Z_2, node_state_psi = prox_psi(
                 np.concatenate((A_1, A_2), axis=1), lamda=.5 * beta / rho,
-                rho=rho, tol=tol, rtol=rtol, max_iter=max_iter)
+                rho=rho, tol=tol, rtol=rtol, max_iter=max_iter,
+                update_rho_options=update_rho_options,
+                warm_start=node_state_psi, return_state=True)
 
         # update W_0
         A = Z_0 - R - X_0
@@ -162,11 +167,7 @@ def latent_time_matrix_decomposition(
         A += A.transpose(0, 2, 1)
         A /= 2.
 
-        W_0 = np.array(
-            [
-                prox_trace_indicator(a, lamda=tau / (rho * div))
-                for a, div in zip(A, divisor)
-            ])
+        W_0 = prox_trace_indicator(A, lamda=tau / (rho * divisor), out=W_0)
 
         # update W_1, W_2
         A_1 = W_0[:-1] + U_1
@@ -176,9 +177,11 @@ def latent_time_matrix_decomposition(
             W_1 = .5 * (A_1 + A_2 - prox_e)
             W_2 = .5 * (A_1 + A_2 + prox_e)
         else:
-            W_1, W_2 = prox_phi(
+            W_1, W_2, node_state_phi = prox_phi(
                 np.concatenate((A_1, A_2), axis=1), lamda=.5 * eta / rho,
-                rho=rho, tol=tol, rtol=rtol, max_iter=max_iter)
+                rho=rho, tol=tol, rtol=rtol, max_iter=max_iter,
+                update_rho_options=update_rho_options,
+                warm_start=node_state_phi, return_state=True)
 
         # update residuals
         X_0 += R - Z_0 + W_0
@@ -232,15 +235,9 @@ def latent_time_matrix_decomposition(
         if check.rnorm <= check.e_pri and check.snorm <= check.e_dual:
             break
 
-        rho_new = update_rho(
-            rho, rnorm, snorm, iteration=iteration_,
-            **(update_rho_options or {}))
-        # scaled dual variables should be also rescaled
-        X_0 *= rho / rho_new
-        X_1 *= rho / rho_new
-        X_2 *= rho / rho_new
-        U_1 *= rho / rho_new
-        U_2 *= rho / rho_new
+        rho_new = rho_rule(
+            rho, rnorm, snorm, iteration=iteration_, check=check,
+            duals=[X_0, X_1, X_2, U_1, U_2])
         rho = rho_new
     else:
         warnings.warn("Objective did not converge.")
@@ -312,7 +309,7 @@ class LatentTimeMatrixDecomposition(LatentTimeGraphicalLasso):
         Useful to use scikit-learn functions as train_test_split.
 
     update_rho_options : dict, default None
-        Options for the update of rho. See `update_rho` function for details.
+        Options for the update of rho. See `rho_strategy` function for details.
 
     compute_objective : boolean, default True
         Choose if compute the objective function during iterations
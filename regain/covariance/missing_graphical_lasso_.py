@@ -117,7 +117,7 @@ def missing_graphical_lasso(
         Print info at each iteration.
     update_rho_options : dict, optional
         Arguments for the rho update.
-        See regain.update_rules.update_rho function for more information.
+        See regain.update_rules.rho_strategy function for more information.
     compute_objective : bool, default True
         Choose to compute the objective value.
     init : {'empirical', 'zeros', ndarray}, default 'empirical'
@@ -215,7 +215,7 @@ class MissingGraphicalLasso(GraphicalLasso):
         If False, data are centered before computation.
 
     update_rho_options : dict, default None
-        Options for the update of rho. See `update_rho` function for details.
+        Options for the update of rho. See `rho_strategy` function for details.
 
     compute_objective : boolean, default True
         Choose if compute the objective function during iterations
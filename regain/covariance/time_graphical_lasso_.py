@@ -37,38 +37,52 @@ from __future__ import division
 import warnings
 
 import numpy as np
-from scipy import linalg
 from six.moves import map, range, zip
-from sklearn.covariance import empirical_covariance, log_likelihood
+from sklearn.utils._joblib import Parallel, delayed
+from sklearn.model_selection import check_cv
 from sklearn.utils.extmath import squared_norm
 from sklearn.utils.validation import check_X_y
 
+from regain.covariance.empirical_covariance_ import (
+    group_statistics, is_out_of_core, streaming_statistics)
 from regain.covariance.graphical_lasso_ import (
-    GraphicalLasso, init_precision, logl)
+    GraphicalLasso, alpha_grid, init_precision, log_likelihood, logl,
+    screen_components)
 from regain.norm import l1_od_norm
-from regain.prox import prox_logdet, soft_thresholding
-from regain.update_rules import update_rho
-from regain.utils import convergence, error_norm_time
+from regain.prox import (
+    laplacian_chain_factor, prox_laplacian_chain, prox_logdet,
+    soft_thresholding)
+from regain.update_rules import accelerator, rho_strategy
+from regain.utils import admm_state, convergence, error_norm_time
 from regain.validation import check_norm_prox
 
 
-def loss(S, K, n_samples=None):
-    """Loss function for time-varying graphical lasso."""
+def loss(S, K, n_samples=None, logdet=None):
+    """Loss function for time-varying graphical lasso.
+
+    The log-determinant of each K can be provided, if known.
+    """
     if n_samples is None:
         n_samples = np.ones(S.shape[0])
+    if logdet is None:
+        logdet = [None] * S.shape[0]
     return sum(
-        -ni * logl(emp_cov, precision)
-        for emp_cov, precision, ni in zip(S, K, n_samples))
+        -ni * logl(emp_cov, precision, logdet=ld)
+        for emp_cov, precision, ni, ld in zip(S, K, n_samples, logdet))
 
 
-def objective(n_samples, S, K, Z_0, Z_1, Z_2, alpha, beta, psi):
-    """Objective function for time-varying graphical lasso."""
-    obj = loss(S, K, n_samples=n_samples)
-
+def _l1_od_penalty(alpha, Z_0):
+    """Off-diagonal l1 penalty of the precision matrices."""
     if isinstance(alpha, np.ndarray):
-        obj += sum(l1_od_norm(a * z) for a, z in zip(alpha, Z_0))
-    else:
-        obj += alpha * sum(map(l1_od_norm, Z_0))
+        return sum(l1_od_norm(a * z) for a, z in zip(alpha, Z_0))
+    return alpha * sum(map(l1_od_norm, Z_0))
+
+
+def objective(
+        n_samples, S, K, Z_0, Z_1, Z_2, alpha, beta, psi, logdet=None):
+    """Objective function for time-varying graphical lasso."""
+    obj = loss(S, K, n_samples=n_samples, logdet=logdet)
+    obj += _l1_od_penalty(alpha, Z_0)
 
     if isinstance(beta, np.ndarray):
         obj += sum(b[0][0] * m for b, m in zip(beta, map(psi, Z_2 - Z_1)))
@@ -83,7 +97,9 @@ def time_graphical_lasso(
         verbose=False, psi='laplacian', tol=1e-4, rtol=1e-4,
         return_history=False, return_n_iter=True, mode='admm',
         compute_objective=True, stop_at=None, stop_when=1e-4,
-        update_rho_options=None, init='empirical'):
+        update_rho_options=None, init='empirical', screening=False,
+        n_jobs=None, warm_start=None, return_state=False,
+        acceleration='none', acceleration_options=None):
     """Time-varying graphical lasso solver.
 
     Solves the following problem via ADMM:
@@ -117,12 +133,37 @@ def time_graphical_lasso(
         Print info at each iteration.
     update_rho_options : dict, optional
         Arguments for the rho update.
-        See regain.update_rules.update_rho function for more information.
+        See regain.update_rules.rho_strategy function for more information.
     compute_objective : bool, default True
         Choose to compute the objective value.
     init : {'empirical', 'zero', ndarray}
         Choose how to initialize the precision matrix, with the inverse
         empirical covariance, zero matrix or precomputed.
+    screening : bool, default False
+        Split the features in the connected components of the union over
+        time of the graphs |n_i S_i| > alpha, and solve the problem
+        independently on each of them. Variables isolated in all the graphs
+        are solved together, as their precision is diagonal.
+        Not available for psi='node', where it is ignored.
+    n_jobs : int or None, optional
+        Number of jobs used to solve the components in parallel, if
+        screening, or else to compute the proximal operator of the
+        log-likelihood of the different times in parallel.
+    warm_start : admm_state, optional
+        Primal variables (Z_0, Z_1, Z_2), dual variables (U_0, U_1, U_2) and
+        rho of a previous run (see `return_state`), used to initialise the
+        iterations. If given, `init` and `rho` are ignored.
+        For psi='laplacian', they are (Z_0, Z_L) and (U_0, U_L), see below.
+    return_state : bool, default False
+        Return also the final primal and dual variables and rho, which can
+        be used to warm start another run. Z_0 is the returned precision,
+        not a copy.
+    acceleration : {'none', 'nesterov', 'anderson'}, default 'none'
+        Acceleration of the ADMM iterations. It is restarted when rho
+        changes or when the residuals increase.
+    acceleration_options : dict, optional
+        Arguments for the acceleration, such as `depth` for 'anderson'.
+        See regain.update_rules.accelerator function for more information.
 
     Returns
     -------
@@ -132,21 +173,83 @@ def time_graphical_lasso(
         If return_history, then also a structure that contains the
         objective value, the primal and dual residual norms, and tolerances
         for the primal and dual residual norms at each iteration.
+        If screening, a list with the history of each component.
+    state : admm_state
+        If return_state, the final Z, U and rho.
+
+    Notes
+    -----
+    With psi='laplacian' the temporal penalty is quadratic, so instead of
+    the consensus over pairs of consecutive times, a single consensus
+    variable Z_L is updated by solving a tridiagonal system along time
+    (see `prox_laplacian_chain`). Z_L and its dual replace the two
+    consensus variables over the pairs and their duals, so the solver keeps
+    9 stacks of (T, d, d) matrices instead of 13, with cheaper iterations.
 
     """
+    if screening and (warm_start is not None or return_state):
+        raise ValueError(
+            "Screening cannot be used together with warm starts.")
+    if screening and psi == 'node':
+        warnings.warn(
+            "Screening is not available for the node penalty; "
+            "solving the full problem.")
+    elif screening:
+        blocks = screen_components(
+            emp_cov * (1 if n_samples is None else
+                       np.asarray(n_samples)[:, None, None]),
+            alpha if np.ndim(alpha) != 1 else alpha[:, None, None])
+        if len(blocks) > 1:
+            return _time_graphical_lasso_blocks(
+                emp_cov, blocks, alpha=alpha, rho=rho, beta=beta,
+                max_iter=max_iter, n_samples=n_samples, verbose=verbose,
+                psi=psi, tol=tol, rtol=rtol, return_history=return_history,
+                return_n_iter=return_n_iter, mode=mode,
+                compute_objective=compute_objective, stop_at=stop_at,
+                stop_when=stop_when, update_rho_options=update_rho_options,
+                init=init, n_jobs=n_jobs, acceleration=acceleration,
+                acceleration_options=acceleration_options)
+
+    if psi == 'laplacian':
+        return _time_graphical_lasso_laplacian(
+            emp_cov, _ChainLaplacian(beta, emp_cov.shape[0]), alpha=alpha,
+            rho=rho, max_iter=max_iter,
+            n_samples=n_samples, verbose=verbose, tol=tol, rtol=rtol,
+            return_history=return_history, return_n_iter=return_n_iter,
+            compute_objective=compute_objective, stop_at=stop_at,
+            stop_when=stop_when, update_rho_options=update_rho_options,
+            init=init, n_jobs=n_jobs, warm_start=warm_start,
+            return_state=return_state, acceleration=acceleration,
+            acceleration_options=acceleration_options)
+
     psi, prox_psi, psi_node_penalty = check_norm_prox(psi)
 
-    Z_0 = init_precision(emp_cov, mode=init)
-    Z_1 = Z_0.copy()[:-1]  # np.zeros_like(emp_cov)[:-1]
-    Z_2 = Z_0.copy()[1:]  # np.zeros_like(emp_cov)[1:]
+    if warm_start is None:
+        Z_0 = init_precision(emp_cov, mode=init)
+        Z_1 = Z_0.copy()[:-1]  # np.zeros_like(emp_cov)[:-1]
+        Z_2 = Z_0.copy()[1:]  # np.zeros_like(emp_cov)[1:]
 
-    U_0 = np.zeros_like(Z_0)
-    U_1 = np.zeros_like(Z_1)
-    U_2 = np.zeros_like(Z_2)
+        U_0 = np.zeros_like(Z_0)
+        U_1 = np.zeros_like(Z_1)
+        U_2 = np.zeros_like(Z_2)
 
-    Z_0_old = np.zeros_like(Z_0)
-    Z_1_old = np.zeros_like(Z_1)
-    Z_2_old = np.zeros_like(Z_2)
+        Z_0_old = np.zeros_like(Z_0)
+        Z_1_old = np.zeros_like(Z_1)
+        Z_2_old = np.zeros_like(Z_2)
+    else:
+        Z_0, Z_1, Z_2 = (z.copy() for z in warm_start.Z)
+        U_0, U_1, U_2 = (u.copy() for u in warm_start.U)
+        rho = warm_start.rho
+
+        Z_0_old = Z_0.copy()
+        Z_1_old = Z_1.copy()
+        Z_2_old = Z_2.copy()
+
+    # buffers, reused across iterations
+    K = np.empty_like(Z_0)
+    A = np.empty_like(Z_0)
+    A_1 = np.empty_like(Z_1)
+    A_2 = np.empty_like(Z_2)
 
     # divisor for consensus variables, accounting for two less matrices
     divisor = np.full(emp_cov.shape[0], 3, dtype=float)
@@ -156,16 +259,23 @@ def time_graphical_lasso(
     if n_samples is None:
         n_samples = np.ones(emp_cov.shape[0])
 
+    accelerate = accelerator(acceleration, **(acceleration_options or {}))
+    rho_rule = rho_strategy(**(update_rho_options or {}))
+    # inner state of the node penalty prox, to warm start it
+    node_state = None
     checks = [
         convergence(
             obj=objective(
-                n_samples, emp_cov, Z_0, Z_0, Z_1, Z_2, alpha, beta, psi))
+                n_samples, emp_cov, Z_0, Z_0, Z_1, Z_2, alpha, beta, psi)
+            if compute_objective else np.nan)
     ]
     for iteration_ in range(max_iter):
         # update K
-        A = Z_0 - U_0
-        A[:-1] += Z_1 - U_1
-        A[1:] += Z_2 - U_2
+        np.subtract(Z_0, U_0, out=A)
+        A[:-1] += Z_1
+        A[:-1] -= U_1
+        A[1:] += Z_2
+        A[1:] -= U_2
         A /= divisor[:, None, None]
         # soft_thresholding_ = partial(soft_thresholding, lamda=alpha / rho)
         # K = np.array(map(soft_thresholding_, A))
@@ -175,46 +285,55 @@ def time_graphical_lasso(
         A *= -rho * divisor[:, None, None] / n_samples[:, None, None]
         A += emp_cov
 
-        K = np.array(
-            [
-                prox_logdet(a, lamda=ni / (rho * div))
-                for a, div, ni in zip(A, divisor, n_samples)
-            ])
+        K, k_eig, k_vec = prox_logdet(
+            A, lamda=n_samples / (rho * divisor), out=K, return_eig=True,
+            n_jobs=n_jobs)
 
         # update Z_0
-        A = K + U_0
+        np.add(K, U_0, out=A)
         A += A.transpose(0, 2, 1)
         A /= 2.
-        Z_0 = soft_thresholding(A, lamda=alpha / rho)
+        Z_0 = soft_thresholding(A, lamda=alpha / rho, out=Z_0)
 
         # other Zs
-        A_1 = K[:-1] + U_1
-        A_2 = K[1:] + U_2
+        np.add(K[:-1], U_1, out=A_1)
+        np.add(K[1:], U_2, out=A_2)
         if not psi_node_penalty:
             prox_e = prox_psi(A_2 - A_1, lamda=2. * beta / rho)
-            Z_1 = .5 * (A_1 + A_2 - prox_e)
-            Z_2 = .5 * (A_1 + A_2 + prox_e)
+            np.add(A_1, A_2, out=Z_1)
+            np.add(A_1, A_2, out=Z_2)
+            Z_1 -= prox_e
+            Z_2 += prox_e
+            Z_1 *= .5
+            Z_2 *= .5
         else:
-            Z_1, Z_2 = prox_psi(
+            Z_1, Z_2, node_state = prox_psi(
                 np.concatenate((A_1, A_2), axis=1), lamda=.5 * beta / rho,
-                rho=rho, tol=tol, rtol=rtol, max_iter=max_iter)
+                rho=rho, tol=tol, rtol=rtol, max_iter=max_iter,
+                update_rho_options=update_rho_options,
+                warm_start=node_state, return_state=True)
 
         # update residuals
-        U_0 += K - Z_0
-        U_1 += K[:-1] - Z_1
-        U_2 += K[1:] - Z_2
+        np.subtract(K, Z_0, out=A)
+        np.subtract(K[:-1], Z_1, out=A_1)
+        np.subtract(K[1:], Z_2, out=A_2)
+        U_0 += A
+        U_1 += A_1
+        U_2 += A_2
 
         # diagnostics, reporting, termination checks
         rnorm = np.sqrt(
-            squared_norm(K - Z_0) + squared_norm(K[:-1] - Z_1) +
-            squared_norm(K[1:] - Z_2))
+            squared_norm(A) + squared_norm(A_1) + squared_norm(A_2))
 
+        np.subtract(Z_0, Z_0_old, out=A)
+        np.subtract(Z_1, Z_1_old, out=A_1)
+        np.subtract(Z_2, Z_2_old, out=A_2)
         snorm = rho * np.sqrt(
-            squared_norm(Z_0 - Z_0_old) + squared_norm(Z_1 - Z_1_old) +
-            squared_norm(Z_2 - Z_2_old))
+            squared_norm(A) + squared_norm(A_1) + squared_norm(A_2))
 
         obj = objective(
-            n_samples, emp_cov, Z_0, K, Z_1, Z_2, alpha, beta, psi) \
+            n_samples, emp_cov, Z_0, K, Z_1, Z_2, alpha, beta, psi,
+            logdet=np.log(k_eig).sum(axis=1)) \
             if compute_objective else np.nan
 
         # if np.isinf(obj):
@@ -235,9 +354,9 @@ def time_graphical_lasso(
             np.sqrt(squared_norm(U_0) + squared_norm(U_1) + squared_norm(U_2)),
             # precision=Z_0.copy()
         )
-        Z_0_old = Z_0.copy()
-        Z_1_old = Z_1.copy()
-        Z_2_old = Z_2.copy()
+        np.copyto(Z_0_old, Z_0)
+        np.copyto(Z_1_old, Z_1)
+        np.copyto(Z_2_old, Z_2)
 
         if verbose:
             print(
@@ -252,25 +371,406 @@ def time_graphical_lasso(
         if check.rnorm <= check.e_pri and check.snorm <= check.e_dual:
             break
 
-        rho_new = update_rho(
-            rho, rnorm, snorm, iteration=iteration_,
-            **(update_rho_options or {}))
-        # scaled dual variables should be also rescaled
-        U_0 *= rho / rho_new
-        U_1 *= rho / rho_new
-        U_2 *= rho / rho_new
+        rho_new = rho_rule(
+            rho, rnorm, snorm, iteration=iteration_, check=check,
+            duals=[U_0, U_1, U_2], Ax=[K, K[:-1], K[1:]], Bz=[Z_0, Z_1, Z_2])
+        accelerate([Z_0, Z_1, Z_2, U_0, U_1, U_2], restart=rho_new != rho)
         rho = rho_new
 
         #assert is_pos_def(Z_0)
     else:
         warnings.warn("Objective did not converge.")
 
-    covariance_ = np.array([linalg.pinvh(x) for x in Z_0])
+    # inverse of the last K, from its eigendecomposition
+    covariance_ = np.matmul(
+        k_vec / k_eig[:, None, :], k_vec.transpose(0, 2, 1))
+    return_list = [Z_0, covariance_]
+    if return_history:
+        return_list.append(checks)
+    if return_n_iter:
+        return_list.append(iteration_ + 1)
+    if return_state:
+        return_list.append(
+            admm_state(Z=(Z_0, Z_1, Z_2), U=(U_0, U_1, U_2), rho=rho))
+    return return_list
+
+
+class _ChainLaplacian(object):
+    """Laplacian of the chain of times, weighted by beta.
+
+    Systems are tridiagonal, solved by the Thomas algorithm (see
+    `prox_laplacian_chain`) with the factorisation of the last lamda.
+    """
+
+    def __init__(self, beta, n_times):
+        self.beta = beta
+        self.n_times = n_times
+        self._lamda = self._factor = None
+
+    def dot(self, Z):
+        D = np.diff(Z, axis=0)
+        D *= self.beta
+        LZ = np.zeros_like(Z)
+        LZ[:-1] -= D
+        LZ[1:] += D
+        return LZ
+
+    def solve(self, B, lamda, out=None, x0=None):
+        """Solve (I + lamda L) X = B."""
+        if lamda != self._lamda:
+            self._lamda = lamda
+            self._factor = laplacian_chain_factor(
+                .5 * lamda * np.asarray(self.beta), self.n_times)
+        return prox_laplacian_chain(B, factor=self._factor, out=out)
+
+
+def _time_graphical_lasso_laplacian(
+        emp_cov, laplacian, alpha=0.01, rho=1, max_iter=100, n_samples=None,
+        verbose=False, tol=1e-4, rtol=1e-4, return_history=False,
+        return_n_iter=True, compute_objective=True, stop_at=None,
+        stop_when=1e-4, update_rho_options=None, init='empirical',
+        n_jobs=None, warm_start=None, return_state=False,
+        acceleration='none', acceleration_options=None):
+    """Time-varying graphical lasso solver for a quadratic temporal penalty.
+
+    The penalty is tr(Z_L^T L Z_L) along time, with L the Laplacian of a
+    graph of times, so it is handled by the single consensus variable Z_L
+    and the ADMM iterates on K, Z_0 and Z_L only. `laplacian` is an operator
+    on stacks of matrices with time on the first axis, with `dot(Z)` for the
+    product L Z and `solve(B, lamda, out, x0)` for the solution of
+    (I + lamda L) Z = B (see `_ChainLaplacian`).
+    """
+    n_times = emp_cov.shape[0]
+    # each time appears in two differences: the constraint K = Z_L has the
+    # weight of the two pairwise consensus variables of the general solver
+    weight = 2.
+
+    def penalty(Z):
+        return np.vdot(Z, laplacian.dot(Z))
+
+    if warm_start is None:
+        Z_0 = init_precision(emp_cov, mode=init)
+        Z_L = Z_0.copy()
+        U_0 = np.zeros_like(Z_0)
+        U_L = np.zeros_like(Z_0)
+    else:
+        Z_0, Z_L = (z.copy() for z in warm_start.Z)
+        U_0, U_L = (u.copy() for u in warm_start.U)
+        rho = warm_start.rho
+    Z_0_old = Z_0.copy()
+    Z_L_old = Z_L.copy()
+
+    # buffers, reused across iterations
+    K = np.empty_like(Z_0)
+    A = np.empty_like(Z_0)
+    A_L = np.empty_like(Z_0)
+
+    if n_samples is None:
+        n_samples = np.ones(n_times)
+
+    accelerate = accelerator(acceleration, **(acceleration_options or {}))
+    rho_rule = rho_strategy(**(update_rho_options or {}))
+    checks = [
+        convergence(
+            obj=loss(emp_cov, Z_0, n_samples=n_samples) +
+            _l1_od_penalty(alpha, Z_0) + penalty(Z_L))
+    ]
+    for iteration_ in range(max_iter):
+        # update K
+        np.subtract(Z_0, U_0, out=A)
+        np.subtract(Z_L, U_L, out=A_L)
+        A_L *= weight
+        A += A_L
+        A /= 1. + weight
+        A += A.transpose(0, 2, 1)
+        A /= 2.
+
+        A *= -(1. + weight) * rho / n_samples[:, None, None]
+        A += emp_cov
+
+        K, k_eig, k_vec = prox_logdet(
+            A, lamda=n_samples / ((1. + weight) * rho), out=K, return_eig=True,
+            n_jobs=n_jobs)
+
+        # update Z_0
+        np.add(K, U_0, out=A)
+        A += A.transpose(0, 2, 1)
+        A /= 2.
+        Z_0 = soft_thresholding(A, lamda=alpha / rho, out=Z_0)
+
+        # update Z_L, solving (I + 2 L / (weight rho)) Z_L = K + U_L
+        np.add(K, U_L, out=A_L)
+        Z_L = laplacian.solve(A_L, 2. / (weight * rho), out=Z_L, x0=Z_L)
+
+        # update residuals
+        np.subtract(K, Z_0, out=A)
+        np.subtract(K, Z_L, out=A_L)
+        U_0 += A
+        U_L += A_L
+
+        # diagnostics, reporting, termination checks
+        rnorm = np.sqrt(squared_norm(A) + weight * squared_norm(A_L))
+
+        np.subtract(Z_0, Z_0_old, out=A)
+        np.subtract(Z_L, Z_L_old, out=A_L)
+        snorm = rho * np.sqrt(
+            squared_norm(A) + weight ** 2 * squared_norm(A_L))
+
+        obj = loss(
+            emp_cov, K, n_samples=n_samples,
+            logdet=np.log(k_eig).sum(axis=1)) + _l1_od_penalty(
+                alpha, Z_0) + penalty(Z_L) \
+            if compute_objective else np.nan
+
+        check = convergence(
+            obj=obj,
+            rnorm=rnorm,
+            snorm=snorm,
+            e_pri=np.sqrt(2 * K.size) * tol + rtol * max(
+                np.sqrt(squared_norm(Z_0) + weight * squared_norm(Z_L)),
+                np.sqrt((1. + weight) * squared_norm(K))),
+            e_dual=np.sqrt(2 * K.size) * tol + rtol * rho *
+            np.sqrt(squared_norm(U_0) + weight ** 2 * squared_norm(U_L)),
+        )
+        np.copyto(Z_0_old, Z_0)
+        np.copyto(Z_L_old, Z_L)
+
+        if verbose:
+            print(
+                "obj: %.4f, rnorm: %.4f, snorm: %.4f,"
+                "eps_pri: %.4f, eps_dual: %.4f" % check[:5])
+
+        checks.append(check)
+        if stop_at is not None:
+            if abs(check.obj - stop_at) / abs(stop_at) < stop_when:
+                break
+
+        if check.rnorm <= check.e_pri and check.snorm <= check.e_dual:
+            break
+
+        rho_new = rho_rule(
+            rho, rnorm, snorm, iteration=iteration_, check=check,
+            duals=[U_0, U_L], Ax=[K, K], Bz=[Z_0, Z_L])
+        accelerate([Z_0, Z_L, U_0, U_L], restart=rho_new != rho)
+        rho = rho_new
+    else:
+        warnings.warn("Objective did not converge.")
+
+    # inverse of the last K, from its eigendecomposition
+    covariance_ = np.matmul(
+        k_vec / k_eig[:, None, :], k_vec.transpose(0, 2, 1))
     return_list = [Z_0, covariance_]
     if return_history:
         return_list.append(checks)
     if return_n_iter:
         return_list.append(iteration_ + 1)
+    if return_state:
+        return_list.append(
+            admm_state(Z=(Z_0, Z_L), U=(U_0, U_L), rho=rho))
+    return return_list
+
+
+def time_graphical_lasso_path(emp_cov, alphas, init='empirical', **params):
+    """Time-varying graphical lasso along a path of regularisation parameters.
+
+    Each problem is warm started with the primal and dual variables and
+    rho of the previous one. For the warm starts to be effective, alphas
+    should be decreasing.
+
+    Parameters
+    ----------
+    emp_cov : ndarray, shape (n_times, n_features, n_features)
+        Empirical covariance of data.
+    alphas : list of float
+        Regularisation parameters.
+    init : {'empirical', 'zeros', ndarray}, default 'empirical'
+        Initialisation of the precision for the first problem.
+    params : dict
+        Other parameters for `time_graphical_lasso`.
+
+    Returns
+    -------
+    precisions : ndarray, shape (n_alphas, n_times, n_features, n_features)
+        Solution for each alpha.
+    covariances : ndarray, shape (n_alphas, n_times, n_features, n_features)
+        Inverse of the solution for each alpha.
+    n_iters : list of int
+        Number of iterations for each alpha.
+
+    """
+    params.pop('return_history', None)
+    precisions, covariances, n_iters = [], [], []
+    state = None
+    for alpha in alphas:
+        precision, covariance, n_iter, state = time_graphical_lasso(
+            emp_cov, alpha=alpha, init=init, warm_start=state,
+            return_history=False, return_n_iter=True, return_state=True,
+            **params)
+        precisions.append(precision)
+        covariances.append(covariance)
+        n_iters.append(n_iter)
+    return np.array(precisions), np.array(covariances), n_iters
+
+
+def _slide_state(state, n_new, n_drop):
+    """Append `n_new` times to an ADMM state, dropping the oldest `n_drop`.
+
+    The precision matrices of the new times, and the consensus variables
+    involving them, are initialised to the last precision matrix, while the
+    new dual variables are zero.
+    """
+    last = np.repeat(state.Z[0][-1:], n_new, axis=0)
+    zeros = np.zeros_like(last)
+    return admm_state(
+        Z=tuple(np.concatenate((z, last))[n_drop:] for z in state.Z),
+        U=tuple(np.concatenate((u, zeros))[n_drop:] for u in state.U),
+        rho=state.rho)
+
+
+def _time_graphical_lasso_singletons(
+        emp_var, init, alpha=0.01, n_samples=None, rho=1, beta=1,
+        psi='laplacian', tol=1e-4, rtol=1e-4, max_iter=100,
+        update_rho_options=None, **params):
+    """Time-varying graphical lasso of isolated variables.
+
+    The precision of an isolated variable is a scalar at each time, so the
+    problems of all of them are solved together with vectorised ADMM
+    iterations, as the general solver does for (T, 1, 1) stacks.
+    As in the general solver, the l1 penalty also acts on the (positive)
+    precision, where it is linear.
+    The differences of each variable are stored as the columns of
+    (T - 1, 1, n_singletons) stacks, on which the proxes act separately.
+
+    Parameters
+    ----------
+    emp_var : ndarray, shape (n_times, n_singletons)
+        Empirical variance of each variable at each time.
+    init : ndarray, shape (n_times, n_singletons)
+        Initial precision of each variable at each time.
+    alpha : float or ndarray, broadcastable to (n_times, n_singletons)
+        Regularisation parameter of each variable at each time.
+
+    Returns
+    -------
+    precision : ndarray, shape (n_times, n_singletons)
+    history : list
+    n_iter : int
+
+    """
+    n_times = emp_var.shape[0]
+    if n_samples is None:
+        n_samples = np.ones(n_times)
+    n_samples = np.asarray(n_samples, dtype=float)[:, None]
+    if n_times == 1:
+        return 1. / (emp_var + alpha / n_samples), [], 0
+
+    prox_psi = check_norm_prox(psi)[1]
+
+    # number of pairs of consecutive times each time is in
+    divisor = np.full((n_times, 1), 2.)
+    divisor[0] = divisor[-1] = 1.
+
+    K = init.astype(emp_var.dtype)
+    Z_1, Z_2 = K[:-1, None].copy(), K[1:, None].copy()
+    U_1, U_2 = np.zeros_like(Z_1), np.zeros_like(Z_2)
+    A = np.empty_like(K)
+
+    rho_rule = rho_strategy(**(update_rho_options or {}))
+    checks = []
+    for iteration_ in range(max_iter):
+        # update K, with the closed form prox of s k - log k
+        A.fill(0.)
+        A[:-1] += Z_1[:, 0] - U_1[:, 0]
+        A[1:] += Z_2[:, 0] - U_2[:, 0]
+        A /= divisor
+        lamda = n_samples / (rho * divisor)
+        A -= lamda * emp_var + alpha / (rho * divisor)
+        K = .5 * (A + np.sqrt(np.square(A) + 4. * lamda))
+
+        # update Z_1, Z_2
+        Z_1_old, Z_2_old = Z_1, Z_2
+        A_1 = K[:-1, None] + U_1
+        A_2 = K[1:, None] + U_2
+        prox_e = prox_psi(A_2 - A_1, lamda=2. * beta / rho)
+        Z_1 = .5 * (A_1 + A_2 - prox_e)
+        Z_2 = .5 * (A_1 + A_2 + prox_e)
+
+        # update residuals
+        R_1 = K[:-1, None] - Z_1
+        R_2 = K[1:, None] - Z_2
+        U_1 += R_1
+        U_2 += R_2
+
+        # diagnostics, reporting, termination checks
+        rnorm = np.sqrt(squared_norm(R_1) + squared_norm(R_2))
+        snorm = rho * np.sqrt(
+            squared_norm(Z_1 - Z_1_old) + squared_norm(Z_2 - Z_2_old))
+        check = convergence(
+            obj=np.nan, rnorm=rnorm, snorm=snorm,
+            e_pri=np.sqrt(2 * Z_1.size) * tol + rtol * max(
+                np.sqrt(squared_norm(Z_1) + squared_norm(Z_2)),
+                np.sqrt(squared_norm(K[:-1]) + squared_norm(K[1:]))),
+            e_dual=np.sqrt(2 * Z_1.size) * tol + rtol * rho * np.sqrt(
+                squared_norm(U_1) + squared_norm(U_2)))
+        checks.append(check)
+        if check.rnorm <= check.e_pri and check.snorm <= check.e_dual:
+            break
+
+        rho = rho_rule(
+            rho, rnorm, snorm, iteration=iteration_, check=check,
+            duals=[U_1, U_2])
+    else:
+        warnings.warn("Objective did not converge.")
+    return K, checks, iteration_ + 1
+
+
+def _time_graphical_lasso_blocks(
+        emp_cov, blocks, alpha=0.01, init='empirical', n_jobs=None,
+        return_history=False, return_n_iter=True, **params):
+    """Solve the time-varying graphical lasso on each block of features."""
+    K = init_precision(emp_cov, mode=init)
+
+    # isolated variables have a scalar precision at each time: they are
+    # solved together, element-wise
+    singletons = np.array([b[0] for b in blocks if b.size == 1], dtype=int)
+    blocks = [b for b in blocks if b.size > 1]
+
+    def _sub(x, b):
+        return x[:, b][:, :, b] if np.ndim(x) == 3 else x
+
+    results = Parallel(n_jobs=n_jobs, prefer='threads')(
+        delayed(time_graphical_lasso)(
+            _sub(emp_cov, b), alpha=_sub(alpha, b), init=_sub(K, b),
+            return_history=True, return_n_iter=True, **params)
+        for b in blocks)
+
+    precision = np.zeros_like(emp_cov)
+    covariance = np.zeros_like(emp_cov)
+    for b, res in zip(blocks, results):
+        idx = np.ix_(np.arange(emp_cov.shape[0]), b, b)
+        precision[idx] = res[0]
+        covariance[idx] = res[1]
+
+    histories = [res[2] for res in results]
+    n_iters = [res[3] for res in results]
+    if singletons.size > 0:
+        if np.ndim(alpha) == 3:
+            alpha = alpha[:, singletons, singletons]
+        elif np.ndim(alpha) == 1:
+            alpha = alpha[:, None]
+        k, history, n_iter = _time_graphical_lasso_singletons(
+            emp_cov[:, singletons, singletons], K[:, singletons, singletons],
+            alpha=alpha, **params)
+        precision[:, singletons, singletons] = k
+        covariance[:, singletons, singletons] = 1. / k
+        histories.append(history)
+        n_iters.append(n_iter)
+
+    return_list = [precision, covariance]
+    if return_history:
+        return_list.append(histories)
+    if return_n_iter:
+        return_list.append(max(n_iters))
     return return_list
 
 
@@ -321,7 +821,15 @@ class TimeGraphicalLasso(GraphicalLasso):
         Useful to use scikit-learn functions as train_test_split.
 
     update_rho_options : dict, default None
-        Options for the update of rho. See `update_rho` function for details.
+        Options for the update of rho. See `rho_strategy` function for details.
+
+    acceleration : {'none', 'nesterov', 'anderson'}, default 'none'
+        Acceleration of the ADMM iterations. It is restarted when rho
+        changes or when the residuals increase.
+
+    acceleration_options : dict, default None
+        Options for the acceleration, such as `depth` for 'anderson'.
+        See `accelerator` function for details.
 
     compute_objective : boolean, default True
         Choose if compute the objective function during iterations
@@ -331,35 +839,70 @@ class TimeGraphicalLasso(GraphicalLasso):
         How to initialise the inverse covariance matrix. Default is take
         the empirical covariance and inverting it.
 
+    dtype : {np.float64, np.float32}, default np.float64
+        Floating point precision of the solver. With np.float32 the
+        empirical covariances and all the iteration variables are stored in
+        single precision, halving the memory and speeding up the linear
+        algebra. Consider a looser `tol` and `rtol` in this case.
+
+    screening : boolean, default False
+        If True, solve the problem independently on each connected
+        component of the union over time of the thresholded empirical
+        covariances. Ignored if psi='node'.
+
+    n_jobs : int or None, default None
+        Number of jobs used to solve the components in parallel, if
+        `screening=True`, or else the different times in the update of the
+        precision matrices.
+
+    output : {'dense', 'sparse'}, default 'dense'
+        Storage of `precision_`. With 'sparse', it is a list with a
+        scipy.sparse CSR matrix for each time.
+
+    window : int, default None
+        Maximum number of times kept by `partial_fit`. When new times are
+        added, the oldest ones are discarded. If None, all times are kept.
+        If set, `fit` also keeps the statistics and the solver state needed
+        by `partial_fit`, which otherwise are kept only by `partial_fit`.
+
     Attributes
     ----------
     covariance_ : array-like, shape (n_times, n_features, n_features)
         Estimated covariance matrix
 
     precision_ : array-like, shape (n_times, n_features, n_features)
-        Estimated precision matrix.
+        Estimated precision matrix (list of CSR matrices if sparse output).
 
     n_iter_ : int
         Number of iterations run.
 
     """
+    # whether `_fit` can warm start the solver, as required by partial_fit
+    _warm_start_fit = True
+
     def __init__(
             self, alpha=0.01, beta=1., mode='admm', rho=1., tol=1e-4,
             rtol=1e-4, psi='laplacian', max_iter=100, verbose=False,
             assume_centered=False, return_history=False,
             update_rho_options=None, compute_objective=True, stop_at=None,
-            stop_when=1e-4, suppress_warn_list=False, init='empirical'):
+            stop_when=1e-4, suppress_warn_list=False, init='empirical',
+            dtype=np.float64, screening=False, n_jobs=None, output='dense',
+            acceleration='none', acceleration_options=None, window=None):
         super(TimeGraphicalLasso, self).__init__(
             alpha=alpha, rho=rho, tol=tol, rtol=rtol, max_iter=max_iter,
             verbose=verbose, assume_centered=assume_centered, mode=mode,
             update_rho_options=update_rho_options,
-            compute_objective=compute_objective, init=init)
+            compute_objective=compute_objective, init=init, dtype=dtype,
+            screening=screening, n_jobs=n_jobs, output=output,
+            acceleration=acceleration,
+            acceleration_options=acceleration_options)
         self.beta = beta
         self.psi = psi
         self.return_history = return_history
         self.stop_at = stop_at
         self.stop_when = stop_when
         self.suppress_warn_list = suppress_warn_list
+        self.window = window
 
     def get_observed_precision(self):
         """Getter for the observed precision matrix.
@@ -372,16 +915,25 @@ class TimeGraphicalLasso(GraphicalLasso):
         """
         return self.get_precision()
 
-    def _fit(self, emp_cov, n_samples):
+    def _fit(self, emp_cov, n_samples, warm_start=None, keep_state=None):
         """Fit the TimeGraphicalLasso model to X.
 
         Parameters
         ----------
         emp_cov : ndarray, shape (n_time, n_features, n_features)
             Empirical covariance of data.
+        n_samples : ndarray, shape (n_time,)
+            Number of samples of each time.
+        warm_start : admm_state, optional
+            State of a previous run to initialise the solver.
+        keep_state : bool, optional
+            Keep what is needed to update the model with partial_fit.
+            If None, it is kept only if `window` is set.
 
         """
-
+        if keep_state is None:
+            keep_state = self.window is not None
+        keep_state = keep_state and not self.screening
         out = time_graphical_lasso(
             emp_cov, alpha=self.alpha, rho=self.rho, beta=self.beta,
             mode=self.mode, n_samples=n_samples, tol=self.tol, rtol=self.rtol,
@@ -389,49 +941,144 @@ class TimeGraphicalLasso(GraphicalLasso):
             return_n_iter=True, return_history=self.return_history,
             update_rho_options=self.update_rho_options,
             compute_objective=self.compute_objective, stop_at=self.stop_at,
-            stop_when=self.stop_when, init=self.init)
+            stop_when=self.stop_when, init=self.init,
+            screening=self.screening, n_jobs=self.n_jobs,
+            acceleration=self.acceleration,
+            acceleration_options=self.acceleration_options,
+            warm_start=warm_start, return_state=keep_state)
+        if keep_state:
+            self._emp_cov, self._n_samples = emp_cov, n_samples
+            self._state = out.pop()
+        else:
+            # discard the ones of a previous partial_fit
+            for attr in ('_emp_cov', '_n_samples', '_state'):
+                self.__dict__.pop(attr, None)
         if self.return_history:
             self.precision_, self.covariance_, self.history_, self.n_iter_ = out
         else:
             self.precision_, self.covariance_, self.n_iter_ = out
-        return self
+        return self._format_output()
 
-    def fit(self, X, y):
+    def fit(self, X, y=None):
         """Fit the TimeGraphicalLasso model to X.
 
         Parameters
         ----------
         X : ndarray, shape = (n_samples * n_times, n_dimensions)
-            Data matrix.
+            Data matrix. It can also be data not fitting in memory, that is
+            the path of a .npy file, a np.memmap or an iterator of chunks
+            (X_c, y_c) of rows and their times, see `streaming_statistics`.
         y : ndarray, shape = (n_times,)
-            Indicate the temporal belonging of each sample.
+            Indicate the temporal belonging of each sample. It can be the
+            path of a .npy file or a np.memmap, for out-of-core X.
 
         """
+        if is_out_of_core(X):
+            classes, n_samples, location, emp_cov = streaming_statistics(
+                X, y, assume_centered=self.assume_centered, dtype=self.dtype)
+            return self.fit_from_stats(
+                emp_cov, n_samples, location=location, classes=classes)
+
         # Covariance does not make sense for a single feature
         X, y = check_X_y(
-            X, y, accept_sparse=False, dtype=np.float64, order="C",
+            X, y, accept_sparse=['csr', 'csc'],
+            dtype=[np.float64, np.float32], order="C",
             ensure_min_features=2, estimator=self)
 
-        n_dimensions = X.shape[1]
-        self.classes_, n_samples = np.unique(y, return_counts=True)
-        n_times = self.classes_.size
+        classes, n_samples, location, emp_cov = group_statistics(
+            X, y, assume_centered=self.assume_centered, dtype=self.dtype)
+        return self.fit_from_stats(
+            emp_cov, n_samples, location=location, classes=classes)
 
-        # n_samples = np.array([x.shape[0] for x in X])
-        if self.assume_centered:
-            self.location_ = np.zeros((n_times, n_dimensions))
-        else:
-            self.location_ = np.array(
-                [X[y == cl].mean(0) for cl in self.classes_])
+    def fit_from_stats(self, emp_cov, n_samples, location=None, classes=None):
+        """Fit the model from the sufficient statistics of the data.
 
-        emp_cov = np.array(
-            [
-                empirical_covariance(
-                    X[y == cl], assume_centered=self.assume_centered)
-                for cl in self.classes_
-            ])
+        Parameters
+        ----------
+        emp_cov : ndarray, shape = (n_times, n_dimensions, n_dimensions)
+            Empirical covariance of the samples of each time.
+        n_samples : ndarray, shape = (n_times,)
+            Number of samples of each time.
+        location : ndarray, shape = (n_times, n_dimensions), optional
+            Mean of the samples of each time. If None, it is zero.
+        classes : ndarray, shape = (n_times,), optional
+            Label of each time. If None, times are labelled from 0.
 
+        """
+        emp_cov = np.asarray(emp_cov, dtype=self.dtype)
+        n_times, n_dimensions = emp_cov.shape[:2]
+        self.classes_ = np.arange(n_times) if classes is None else \
+            np.asarray(classes)
+        self.location_ = np.zeros((n_times, n_dimensions)) \
+            if location is None else np.asarray(location)
+        n_samples = np.broadcast_to(n_samples, (n_times, )).copy()
         return self._fit(emp_cov, n_samples)
 
+    def partial_fit(self, X, y=None):
+        """Update the TimeGraphicalLasso model with new times.
+
+        The new times are appended to the ones already seen, dropping the
+        oldest ones to keep at most `window` times. The problem is solved
+        warm started from the previous primal and dual variables and rho,
+        so that the times already seen converge in few iterations.
+
+        Parameters
+        ----------
+        X : ndarray, shape = (n_samples * n_new_times, n_dimensions)
+            Data matrix of the new times.
+        y : ndarray, shape = (n_samples * n_new_times,), optional
+            Indicate the temporal belonging of each sample. The times must
+            be after the ones already seen. If None, all the samples belong
+            to a single new time.
+
+        """
+        if not self._warm_start_fit:
+            raise NotImplementedError(
+                "{} does not support partial_fit, as its solver cannot be "
+                "warm started.".format(type(self).__name__))
+        if self.screening:
+            raise ValueError(
+                "partial_fit cannot warm start the solver with screening, "
+                "set screening=False.")
+        fitted = hasattr(self, '_emp_cov')
+        if not fitted and hasattr(self, 'classes_'):
+            raise ValueError(
+                "The model was fitted without keeping the statistics needed "
+                "by partial_fit. Set `window` before calling fit, or use "
+                "only partial_fit.")
+        if y is None:
+            y = np.full(len(X), self.classes_[-1] + 1 if fitted else 0)
+        X, y = check_X_y(
+            X, y, accept_sparse=['csr', 'csc'],
+            dtype=[np.float64, np.float32], order="C",
+            ensure_min_features=2, estimator=self)
+
+        classes, n_samples, location, emp_cov = group_statistics(
+            X, y, assume_centered=self.assume_centered, dtype=self.dtype)
+
+        state = None
+        if fitted:
+            if classes[0] <= self.classes_[-1]:
+                raise ValueError(
+                    "partial_fit expects times after the ones already seen, "
+                    "got {} after {}".format(classes[0], self.classes_[-1]))
+            classes = np.concatenate((self.classes_, classes))
+            n_samples = np.concatenate((self._n_samples, n_samples))
+            location = np.concatenate((self.location_, location))
+            emp_cov = np.concatenate((self._emp_cov, emp_cov))
+            state = getattr(self, '_state', None)
+
+        n_drop = 0 if self.window is None else max(
+            0, classes.size - self.window)
+        if state is not None:
+            state = _slide_state(
+                state, classes.size - self.classes_.size, n_drop)
+
+        self.classes_ = classes[n_drop:]
+        self.location_ = location[n_drop:]
+        return self._fit(
+            emp_cov[n_drop:], n_samples[n_drop:], state, keep_state=True)
+
     def score(self, X, y):
         """Computes the log-likelihood of a Gaussian data set with
         `self.covariance_` as an estimator of its covariance matrix.
@@ -456,20 +1103,17 @@ class TimeGraphicalLasso(GraphicalLasso):
         """
         # Covariance does not make sense for a single feature
         X, y = check_X_y(
-            X, y, accept_sparse=False, dtype=np.float64, order="C",
+            X, y, accept_sparse=['csr', 'csc'],
+            dtype=[np.float64, np.float32], order="C",
             ensure_min_features=2, estimator=self)
 
         # compute empirical covariance of the test set
-        test_cov = np.array(
-            [
-                empirical_covariance(
-                    X[y == cl] - self.location_[i], assume_centered=True)
-                for i, cl in enumerate(self.classes_)
-            ])
+        _, n_samples, _, test_cov = group_statistics(
+            X, y, classes=self.classes_, location=self.location_)
 
         res = sum(
-            X[y == cl].shape[0] * log_likelihood(S, K) for S, K, cl in zip(
-                test_cov, self.get_observed_precision(), self.classes_))
+            n * log_likelihood(S, K) for S, K, n in zip(
+                test_cov, self.get_observed_precision(), n_samples))
 
         return res
 
@@ -507,3 +1151,134 @@ class TimeGraphicalLasso(GraphicalLasso):
         return error_norm_time(
             self.covariance_, comp_cov, norm=norm, scaling=scaling,
             squared=squared)
+
+
+class TimeGraphicalLassoCV(TimeGraphicalLasso):
+    """Time-varying graphical lasso with cross-validated choice of alpha.
+
+    For each fold, the empirical covariances are computed once and the
+    problem is solved along the grid of alphas, warm starting each problem
+    with the solution of the previous one (see `time_graphical_lasso_path`).
+    Folds are stratified on the time points.
+
+    Parameters
+    ----------
+    alphas : integer, or list positive float, default 10
+        If an integer is given, it fixes the number of points on the grid of
+        alpha to be used (see `alpha_grid`). If a list is given, it gives
+        the grid to be used, sorted in decreasing order.
+
+    cv : int, cross-validation generator or an iterable, optional
+        Determines the cross-validation splitting strategy, as in
+        scikit-learn.
+
+    n_jobs : int or None, default None
+        Number of jobs to run the folds in parallel.
+
+    beta, mode, rho, tol, rtol, psi, max_iter, verbose, assume_centered,
+    update_rho_options, compute_objective, init, dtype, output :
+        See `TimeGraphicalLasso`.
+
+    Attributes
+    ----------
+    covariance_ : array-like, shape (n_times, n_features, n_features)
+        Estimated covariance matrix
+
+    precision_ : array-like, shape (n_times, n_features, n_features)
+        Estimated precision matrix.
+
+    alpha_ : float
+        Regularisation parameter selected.
+
+    cv_alphas_ : ndarray, shape (n_alphas,)
+        All the alphas explored.
+
+    grid_scores_ : ndarray, shape (n_alphas, n_folds)
+        Log-likelihood score on left-out data across folds.
+
+    n_iter_ : int
+        Number of iterations run for the last alpha on the whole data.
+
+    """
+    _warm_start_fit = False
+
+    def __init__(
+            self, alphas=10, cv=None, n_jobs=None, beta=1., mode='admm',
+            rho=1., tol=1e-4, rtol=1e-4, psi='laplacian', max_iter=100,
+            verbose=False, assume_centered=False, update_rho_options=None,
+            compute_objective=True, init='empirical', dtype=np.float64,
+            output='dense'):
+        super(TimeGraphicalLassoCV, self).__init__(
+            beta=beta, mode=mode, rho=rho, tol=tol, rtol=rtol, psi=psi,
+            max_iter=max_iter, verbose=verbose,
+            assume_centered=assume_centered,
+            update_rho_options=update_rho_options,
+            compute_objective=compute_objective, init=init, dtype=dtype,
+            output=output)
+        self.alphas = alphas
+        self.cv = cv
+        self.n_jobs = n_jobs
+
+    def _path(self, emp_cov, n_samples, alphas):
+        return time_graphical_lasso_path(
+            emp_cov, alphas, beta=self.beta, mode=self.mode, rho=self.rho,
+            n_samples=n_samples, tol=self.tol, rtol=self.rtol, psi=self.psi,
+            max_iter=self.max_iter, verbose=self.verbose,
+            update_rho_options=self.update_rho_options,
+            compute_objective=self.compute_objective, init=self.init)
+
+    def _fold_scores(self, X, y, train, test, alphas):
+        _, n_samples, location, emp_cov = group_statistics(
+            X[train], y[train], classes=self.classes_,
+            assume_centered=self.assume_centered, dtype=self.dtype)
+        _, n_test, _, test_cov = group_statistics(
+            X[test], y[test], classes=self.classes_, location=location,
+            dtype=self.dtype)
+
+        precisions = self._path(emp_cov, n_samples, alphas)[0]
+        return [
+            sum(n * log_likelihood(S, K)
+                for S, K, n in zip(test_cov, precision, n_test))
+            for precision in precisions]
+
+    def fit(self, X, y):
+        """Fit the TimeGraphicalLassoCV model to X.
+
+        Parameters
+        ----------
+        X : ndarray, shape = (n_samples * n_times, n_dimensions)
+            Data matrix.
+        y : ndarray, shape = (n_times,)
+            Indicate the temporal belonging of each sample.
+
+        """
+        X, y = check_X_y(
+            X, y, accept_sparse=['csr', 'csc'],
+            dtype=[np.float64, np.float32], order="C",
+            ensure_min_features=2, estimator=self)
+        self.classes_, n_samples, self.location_, emp_cov = group_statistics(
+            X, y, assume_centered=self.assume_centered, dtype=self.dtype)
+
+        if isinstance(self.alphas, int):
+            alphas = alpha_grid(
+                emp_cov * n_samples[:, None, None], n_alphas=self.alphas)
+        else:
+            alphas = np.sort(self.alphas)[::-1]
+
+        cv = check_cv(self.cv, y, classifier=True)
+        scores = Parallel(n_jobs=self.n_jobs, prefer='threads')(
+            delayed(self._fold_scores)(X, y, train, test, alphas)
+            for train, test in cv.split(X, y))
+
+        self.cv_alphas_ = alphas
+        self.grid_scores_ = np.array(scores).T
+        best = np.argmax(self.grid_scores_.mean(axis=1))
+        self.alpha_ = alphas[best]
+
+        # refit along the path up to the best alpha, to warm start it
+        precisions, covariances, n_iters = self._path(
+            emp_cov, n_samples, alphas[:best + 1])
+        self.precision_ = precisions[-1]
+        self.covariance_ = covariances[-1]
+        self.n_iter_ = n_iters[-1]
+        return self._format_output()
@@ -33,4 +33,5 @@ except ImportError:
     import warnings
     warnings.warn(
         "Forward-backward minimisation method relies on `prox_tv` "
-        "library. Please install it before using this class.")
+        "library for time_norm != 1. Please install it before using this "
+        "class with such norms.")
@@ -53,7 +53,7 @@ def upper_diag_3d(x):
 def choose_gamma(
         gamma, x, beta, alpha, lamda, grad, function_f=None, delta=1e-4,
         eps=0.5, max_iter=1000, p=1, x_inv=None, choose='gamma',
-        laplacian_penalty=False):
+        laplacian_penalty=False, n_jobs=None):
     """Choose gamma for backtracking.
 
     References
@@ -68,7 +68,7 @@ def choose_gamma(
         else:
             prox = prox_FL(
                 x - gamma * grad, beta * gamma, alpha * gamma, p=p,
-                symmetric=True)
+                symmetric=True, n_jobs=n_jobs)
         if positive_definite(prox) and choose != "gamma":
             break
 
@@ -135,10 +135,13 @@ def objective_laplacian(n_samples, emp_cov, precision, alpha, beta, vareps=0):
     return obj
 
 
-def _J(x, beta, alpha, gamma, lamda, S, n_samples, p=1, x_inv=None, grad=None):
+def _J(
+        x, beta, alpha, gamma, lamda, S, n_samples, p=1, x_inv=None,
+        grad=None, n_jobs=None):
     """Grad + prox + line search for the new point."""
     prox = prox_FL(
-        x - gamma * grad, beta * gamma, alpha * gamma, p=p, symmetric=True)
+        x - gamma * grad, beta * gamma, alpha * gamma, p=p, symmetric=True,
+        n_jobs=n_jobs)
     return x + lamda * (prox - x)
 
 
@@ -148,7 +151,7 @@ def tgl_forward_backward(
     return_history=False, return_n_iter=True, choose='gamma',
     lamda_criterion='b', time_norm=1, compute_objective=True,
     return_n_linesearch=False, vareps=1e-5, stop_at=None, stop_when=1e-4,
-        laplacian_penalty=False, init='empirical'):
+        laplacian_penalty=False, init='empirical', n_jobs=None):
     """Time-varying graphical lasso solver with forward-backward splitting.
 
     Solves the following problem via FBS:
@@ -199,6 +202,11 @@ def tgl_forward_backward(
     init : {'empirical', 'zero', ndarray}
         Choose how to initialize the precision matrix, with the inverse
         empirical covariance, zero matrix or precomputed.
+    n_jobs : int or None, optional
+        Number of threads of the total variation prox, if computed by
+        `prox_tv` (see `prox_FL`). None means 1 unless in a
+        joblib.parallel_backend context, -1 means all the processors.
+        It used to be fixed to 32 threads.
 
     Returns
     -------
@@ -254,7 +262,7 @@ def tgl_forward_backward(
                 function_f=function_f, beta=beta, alpha=alpha, lamda=lamda,
                 grad=grad, delta=delta, eps=eps, max_iter=200, p=time_norm,
                 x_inv=x_inv, choose=choose,
-                laplacian_penalty=laplacian_penalty)
+                laplacian_penalty=laplacian_penalty, n_jobs=n_jobs)
 
         x_hat = K - gamma * grad
         if choose not in ['gamma', 'both']:
@@ -263,7 +271,7 @@ def tgl_forward_backward(
             else:
                 y = prox_FL(
                     x_hat, beta * gamma, alpha * gamma, p=time_norm,
-                    symmetric=True)
+                    symmetric=True, n_jobs=n_jobs)
 
         if choose in ('lamda', 'both'):
             lamda, n_ls = choose_lamda(
@@ -401,7 +409,12 @@ class TimeGraphicalLassoForwardBackward(TimeGraphicalLasso):
     init : {'empirical', 'zero', ndarray}
         Choose how to initialize the precision matrix, with the inverse
         empirical covariance, zero matrix or precomputed.
-        
+
+    n_jobs : int or None, optional
+        Number of threads of the total variation prox, if computed by
+        `prox_tv`. None means 1 unless in a joblib.parallel_backend
+        context, -1 means all the processors.
+
     Attributes
     ----------
     covariance_ : array-like, shape (n_times, n_features, n_features)
@@ -414,17 +427,20 @@ class TimeGraphicalLassoForwardBackward(TimeGraphicalLasso):
         Number of iterations run.
 
     """
+    _warm_start_fit = False
+
     def __init__(
         self, alpha=0.01, beta=1., tol=1e-4, max_iter=100, verbose=False,
         assume_centered=False, compute_objective=True, eps=0.5, choose='gamma',
         lamda=1, delta=1e-4, gamma=1., lamda_criterion='b', time_norm=1,
         return_history=False, debug=False, return_n_linesearch=False,
         vareps=1e-5, stop_at=None, stop_when=1e-4, init='empirical',
-            laplacian_penalty=False):
+            laplacian_penalty=False, n_jobs=None):
         super(TimeGraphicalLassoForwardBackward, self).__init__(
             alpha=alpha, tol=tol, max_iter=max_iter, verbose=verbose,
             assume_centered=assume_centered,
-            compute_objective=compute_objective, beta=beta, init=init)
+            compute_objective=compute_objective, beta=beta, init=init,
+            n_jobs=n_jobs)
         self.delta = delta
         self.gamma = gamma
         self.lamda_criterion = lamda_criterion
@@ -462,7 +478,7 @@ class TimeGraphicalLassoForwardBackward(TimeGraphicalLasso):
             lamda=self.lamda, debug=self.debug,
             return_n_linesearch=self.return_n_linesearch, vareps=self.vareps,
             stop_at=self.stop_at, stop_when=self.stop_when, init=self.init,
-            laplacian_penalty=self.laplacian_penalty)
+            laplacian_penalty=self.laplacian_penalty, n_jobs=self.n_jobs)
 
         if self.return_history:
             if self.return_n_linesearch:
@@ -44,10 +44,11 @@ from sklearn.utils.validation import check_is_fitted
 
 from regain.generalized_linear_model.ising import _fit
 from regain.generalized_linear_model.ising import loss
+from regain.covariance.kernel_time_graphical_lasso_ import _update_lags
 from regain.covariance.time_graphical_lasso_ import init_precision
 from regain.norm import l1_od_norm
-from regain.utils import convergence
-from regain.update_rules import update_rho
+from regain.utils import LagStack, convergence
+from regain.update_rules import rho_strategy
 from regain.validation import check_norm_prox
 
 
@@ -130,24 +131,17 @@ def _fit_time_ising_model(X, alpha=0.01, rho=1, kernel=None,
 
     K = np.zeros((n_times, n_features, n_features))
 
-    Z_M = {}
-    U_M = {}
-    Z_M_old = {}
-
-    for m in range(1, n_times):
-        # all possible non markovians jumps
-        Z_L = K.copy()[:-m]
-        Z_R = K.copy()[m:]
-        Z_M[m] = (Z_L, Z_R)
-
-        U_L = np.zeros_like(Z_L)
-        U_R = np.zeros_like(Z_R)
-        U_M[m] = (U_L, U_R)
-
-        Z_L_old = np.zeros_like(Z_L)
-        Z_R_old = np.zeros_like(Z_R)
-        Z_M_old[m] = (Z_L_old, Z_R_old)
-
+    # consensus variables of all possible non markovians jumps, stored
+    # contiguously for all the lags
+    lags = range(1, n_times)
+    Z_M = LagStack(lags, K.shape)
+    U_M = LagStack(lags, K.shape)
+    # buffer of the lags, swapped with Z_M at its update
+    A_M = LagStack(lags, K.shape)
+
+    rho_rule = rho_strategy(**(update_rho_options or {}))
+    # inner states of the node penalty prox, to warm start it
+    node_states = {}
     checks = [
         convergence(
             obj=objective(X, K, Z_M, alpha, kernel, psi))
@@ -156,9 +150,8 @@ def _fit_time_ising_model(X, alpha=0.01, rho=1, kernel=None,
         # update K
 
         A = np.zeros_like(K)
-        for m in range(1, n_times):
-            A[:-m] += Z_M[m][0] - U_M[m][0]
-            A[m:] += Z_M[m][1] - U_M[m][1]
+        np.subtract(Z_M.data, U_M.data, out=A_M.data)
+        Z_M.scatter_add(A_M.data, out=A)
 
         A /= n_times
         A += A.transpose(0, 2, 1)
@@ -176,36 +169,27 @@ def _fit_time_ising_model(X, alpha=0.01, rho=1, kernel=None,
                               warm_start=None, rho=rho, T=n_times,
                               return_history=False, return_n_iter=False)[0]
 
-        # other Zs
-        for m in range(1, n_times):
-            U_L, U_R = U_M[m]
-            A_L = K[:-m] + U_L
-            A_R = K[m:] + U_R
-            if not psi_node_penalty:
-                prox_e = prox_psi(
-                    A_R - A_L,
-                    lamda=2. * np.diag(kernel, m)[:, None, None] / rho)
-                Z_L = .5 * (A_L + A_R - prox_e)
-                Z_R = .5 * (A_L + A_R + prox_e)
-            else:
-                Z_L, Z_R = prox_psi(
-                    np.concatenate((A_L, A_R), axis=1),
-                    lamda=.5 * np.diag(kernel, m)[:, None, None] / rho,
-                    rho=rho, tol=tol, rtol=rtol, max_iter=max_iter)
-            Z_M[m] = (Z_L, Z_R)
-
-            # update other residuals
-            U_L += K[:-m] - Z_L
-            U_R += K[m:] - Z_R
+        # other Zs, computed in A_M and swapped with the previous ones
+        Z_M.gather(K, out=A_M.data)
+        A_M.data += U_M.data
+        _update_lags(
+            A_M, prox_psi, psi_node_penalty, kernel, rho,
+            node_states=node_states, tol=tol, rtol=rtol, max_iter=max_iter,
+            update_rho_options=update_rho_options)
+        Z_M.data -= A_M.data
+        snorm_M = squared_norm(Z_M.data)
+        Z_M, A_M = A_M, Z_M
+
+        # update other residuals, with K_M in A_M
+        K_M = Z_M.gather(K, out=A_M.data)
+        norm_K_M = squared_norm(K_M)
+        K_M -= Z_M.data
+        U_M.data += K_M
 
         # diagnostics, reporting, termination checks
-        rnorm = np.sqrt(sum(squared_norm(K[:-m] - Z_M[m][0]) +
-                        squared_norm(K[m:] - Z_M[m][1])
-                        for m in range(1, n_times)))
+        rnorm = np.sqrt(squared_norm(K_M))
 
-        snorm = rho * np.sqrt(sum(squared_norm(Z_M[m][0] - Z_M_old[m][0]) +
-                                  squared_norm(Z_M[m][1] - Z_M_old[m][1])
-                                  for m in range(1, n_times)))
+        snorm = rho * np.sqrt(snorm_M)
 
         obj = objective(X, K, Z_M, alpha, kernel, psi) \
             if compute_objective else np.nan
@@ -213,19 +197,10 @@ def _fit_time_ising_model(X, alpha=0.01, rho=1, kernel=None,
         check = convergence(
             obj=obj, rnorm=rnorm, snorm=snorm,
             e_pri=n_features * n_times * tol + rtol * max(
-                np.sqrt(sum(
-                        squared_norm(Z_M[m][0]) + squared_norm(Z_M[m][1])
-                        for m in range(1, n_times))),
-                np.sqrt(
-                    squared_norm(K) + sum(
-                        squared_norm(K[:-m]) + squared_norm(K[m:])
-                        for m in range(1, n_times)))),
+                np.sqrt(squared_norm(Z_M.data)),
+                np.sqrt(squared_norm(K) + norm_K_M)),
             e_dual=n_features * n_times * tol + rtol * rho * np.sqrt(
-                sum(
-                    squared_norm(U_M[m][0]) + squared_norm(U_M[m][1])
-                    for m in range(1, n_times))))
-        for m in range(1, n_times):
-            Z_M_old[m] = (Z_M[m][0].copy(), Z_M[m][1].copy())
+                squared_norm(U_M.data)))
 
         if verbose:
             print(
@@ -240,15 +215,9 @@ def _fit_time_ising_model(X, alpha=0.01, rho=1, kernel=None,
         if check.rnorm <= check.e_pri and check.snorm <= check.e_dual:
             break
 
-        rho_new = update_rho(
-            rho, rnorm, snorm, iteration=iteration_,
-            **(update_rho_options or {}))
-        # scaled dual variables should be also rescaled
-        # U_0 *= rho / rho_new
-        for m in range(1, n_times):
-            U_L, U_R = U_M[m]
-            U_L *= rho / rho_new
-            U_R *= rho / rho_new
+        rho_new = rho_rule(
+            rho, rnorm, snorm, iteration=iteration_, check=check,
+            duals=[U_M.data])
         rho = rho_new
     else:
         warnings.warn("Objective did not converge.")
@@ -30,50 +30,78 @@
 
 """Proximal functions."""
 import warnings
+from contextlib import contextmanager
 from functools import partial
 
-import collections
-
 import numpy as np
+from scipy import linalg
 from six.moves import range, zip
+from sklearn.utils._joblib import (
+    Parallel, cpu_count, delayed, effective_n_jobs)
 from sklearn.utils.extmath import squared_norm
 
-from regain.update_rules import update_rho
-from regain.utils import convergence
+from regain.update_rules import rho_strategy
+from regain.utils import admm_state, convergence
 
 try:
     from prox_tv import tv1_1d, tvp_1d, tvgen, tvp_2d
-except:
-    # fused lasso prox cannot be used
-    pass
-
+except ImportError:
+    # fused lasso prox relies on `total_variation_1d` (only for p=1)
+    tvgen = None
 
-def soft_thresholding(a, lamda):
-    """Soft-thresholding."""
-    return np.sign(a) * np.maximum(np.abs(a) - lamda, 0)
+try:
+    from threadpoolctl import threadpool_limits
+except ImportError:
+    # BLAS threads cannot be limited
+    threadpool_limits = None
 
 
-def _soft_thresholding_od_2d(a, lamda):
-    # this assumes array is 2-dimensional
-    # no check is performed for optimisation
-    soft = soft_thresholding(a, lamda)
-    np.fill_diagonal(soft, np.diag(a))
-    return soft
+def _per_slice(lamda, a, n_axes=2):
+    """Reshape per-slice `lamda` to broadcast over the last axes of `a`."""
+    if a.ndim > n_axes and np.ndim(lamda) > 0:
+        lamda = np.asarray(lamda).ravel()
+        if lamda.shape[0] != a.shape[0]:
+            raise ValueError(
+                "lamda should have one value for each of the %d slices, "
+                "found %d" % (a.shape[0], lamda.shape[0]))
+        lamda = lamda.reshape((-1, ) + (1, ) * (a.ndim - 1))
+    return lamda
 
 
-def soft_thresholding_od(a, lamda):
-    """Off-diagonal soft-thresholding."""
-    if a.ndim > 2:
-        out = np.empty_like(a)
-        if not isinstance(lamda, collections.Iterable):
-            lamda = np.repeat(lamda, a.shape[0])
-        else:
-            assert lamda.shape[0] == a.shape[0]
+def soft_thresholding(a, lamda, out=None):
+    """Soft-thresholding.
 
-        for t in range(a.shape[0]):
-            out[t] = _soft_thresholding_od_2d(a[t], lamda[t])
+    If `out` is given, the result is stored in it. It can be `a` itself.
+    """
+    a = np.asarray(a)
+    scalar = out is None and a.ndim == 0
+    if out is None:
+        out = np.empty(
+            a.shape, dtype=a.dtype if a.dtype.kind == 'f' else np.float64)
+    # the sign is lost if `out` is `a`, keep only its bit
+    negative = np.signbit(a) if np.may_share_memory(a, out) else None
+    np.abs(a, out=out)
+    out -= lamda
+    np.maximum(out, 0, out=out)
+    if negative is None:
+        np.copysign(out, a, out=out)
     else:
-        out = _soft_thresholding_od_2d(a, lamda)
+        np.negative(out, out=out, where=negative)
+    return out[()] if scalar else out
+
+
+def soft_thresholding_od(a, lamda, out=None):
+    """Off-diagonal soft-thresholding.
+
+    `a` can be a stack of matrices, where each one is thresholded with the
+    corresponding value in `lamda`.
+    """
+    a = np.asarray(a)
+    lamda = _per_slice(lamda, a)
+    diag = np.diagonal(a, axis1=-2, axis2=-1).copy()
+    out = soft_thresholding(a, lamda, out=out)
+    diag_idx = np.arange(a.shape[-1])
+    out[..., diag_idx, diag_idx] = diag
     return out
 
 
@@ -84,114 +112,191 @@ def soft_thresholding_vector(a, lamda):
         return np.maximum(1 - lamda / np.linalg.norm(a), 0) * a
 
 
-def _blockwise_soft_thresholding_2d(a, lamda):
-    """Proximal operator for l2 norm, a is two-dimensional."""
-    return np.array([soft_thresholding_vector(aa, lamda) for aa in a.T]).T
+def _scale_columns(a, norms, lamda, out=None):
+    """Shrink the columns of (a stack of) matrices given their norms."""
+    lamda = _per_slice(lamda, norms, n_axes=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scale = np.where(norms > lamda, 1 - lamda / norms, 0)
+    if out is None:
+        out = np.empty(a.shape, dtype=np.result_type(a, np.float32))
+    return np.multiply(a, scale[..., None, :], out=out)
 
 
-def blockwise_soft_thresholding(a, lamda):
-    """Proximal operator for l2 norm."""
-    if a.ndim > 2:
-        out = np.empty_like(a, dtype=float)
-        if not isinstance(lamda, collections.Iterable):
-            lamda = np.repeat(lamda, a.shape[0])
-        else:
-            lamda = lamda.ravel()
-            assert lamda.shape[0] == a.shape[0]
+def blockwise_soft_thresholding(a, lamda, out=None):
+    """Proximal operator for l2 norm (columns of the last 2 axes)."""
+    return _scale_columns(a, np.linalg.norm(a, axis=-2), lamda, out=out)
 
-        for t in range(a.shape[0]):
-            out[t] = _blockwise_soft_thresholding_2d(a[t], lamda[t])
-    else:
-        out = _blockwise_soft_thresholding_2d(a, lamda)
-    return out
 
+def blockwise_soft_thresholding_symmetric(a, lamda, out=None):
+    """Proximal operator for l2 norm, for symmetric matrices (last 2 axes).
 
-def blockwise_soft_thresholding_symmetric(a, lamda):
-    """Proximal operator for l2 norm, for symmetric matrices (last 2 axes)."""
-    col_norms = np.linalg.norm(a, axis=1)
-    ones_vect = np.ones(a.shape[1])
+    Column norms are computed as row norms, which is faster on C-ordered
+    arrays.
+    """
+    return _scale_columns(a, np.linalg.norm(a, axis=-1), lamda, out=out)
 
-    if a.ndim > 2:
-        out = np.empty_like(a, dtype=float)
-        if not isinstance(lamda, collections.Iterable):
-            lamda = np.repeat(lamda, a.shape[0])
-        else:
-            lamda = lamda.ravel()
-            assert lamda.shape[0] == a.shape[0]
 
-        out = np.empty_like(a, dtype=float)
-        for t, (x, c_norm) in enumerate(zip(a, col_norms)):
-            out[t] = np.dot(
-                x,
-                np.diag((ones_vect - lamda[t] / c_norm) * (c_norm > lamda[t])))
+def project_l1_ball(a, radius=1., axis=-1):
+    """Euclidean projection onto the l1 ball, along `axis`.
 
-    else:
-        out = np.dot(
-            a, np.diag((ones_vect - lamda / col_norms) * (col_norms > lamda)))
+    All vectors are projected at once, sorting their absolute values
+    (Duchi et al., 2008). `radius` must broadcast to `a` with `axis`
+    reduced to size 1.
+    """
+    a = np.asarray(a)
+    abs_a = np.abs(a)
+    u = -np.sort(-abs_a, axis=axis)
+    shape = [1] * a.ndim
+    shape[axis] = a.shape[axis]
+    ind = np.arange(1, a.shape[axis] + 1).reshape(shape)
 
-    return out
+    # threshold, not positive if the vector is already inside the ball
+    theta = np.max(
+        (np.cumsum(u, axis=axis) - radius) / ind, axis=axis, keepdims=True)
+    proj = np.sign(a) * np.maximum(abs_a - np.maximum(theta, 0), 0)
+    return proj.astype(np.result_type(a, np.float32), copy=False)
 
 
-# %% Perform prox operator:   min_x (1/2t)||x-w||^2 subject to |x|<=radius
-# function [ z ] = project_1ball( z,radius )
-# %  By Moreau's identity, projection onto 1-norm ball can be computed
-# %  using the proximal of the conjugate problem, which is L-infinity
-# %  minimization.
-#   z = z -  prox_infinityNorm(z,radius);
-# end
-# %% Perform prox operator:   min ||x||_inf + (1/2t)||x-w||^2
-# function [ xk ] = prox_infinityNorm( w,t )
-#     N = length(w);
-#     wabs = abs(w);
-#     ws = (cumsum(sort(wabs,'descend'))- t)./(1:N)';
-#     alphaopt = max(ws);
-#     if alphaopt>0
-#       xk = min(wabs,alphaopt).*sign(w); % truncation step
-#     else
-#       xk = zeros(size(w)); % if t is big, then solution is zero
-#     end
-# end
 def prox_linf_1d(a, lamda):
     """Proximal operator for the l-inf norm.
 
-    Since there is no closed-form, we can minimize it with scipy.
+    By Moreau decomposition, it is the residual of the projection onto the
+    l1 ball of radius `lamda`.
     """
-    from scipy.optimize import minimize
+    return a - project_l1_ball(a, lamda)
 
-    def _f(x):
-        return lamda * np.linalg.norm(x, np.inf) + \
-            .5 * np.power(np.linalg.norm(a - x), 2)
 
-    return minimize(_f, a).x
+def prox_linf(a, lamda):
+    """Proximal operator for l-inf norm, on the columns of (stacked) matrices.
 
+    `lamda` can be a scalar or specified for each matrix in `a`.
+    """
+    return a - project_l1_ball(a, _per_slice(lamda, a), axis=-2)
 
-def prox_linf(a, lamda):
-    """Proximal operator for l-inf norm."""
-    x = np.zeros_like(a)
-    for t in range(a.shape[0]):
-        x[t] = np.array(
-            [prox_linf_1d(a[t, :, j], lamda) for j in range(a.shape[1])]).T
-    return x
 
+def _scale_eigenvectors(Q, xi, out=None):
+    """Compute Q * diag(xi) * Q^T, for (stacks of) eigendecompositions.
+
+    Scaling the columns of Q avoids building the diagonal matrix and the
+    additional matrix product.
+    """
+    return np.matmul(Q * xi[..., None, :], np.swapaxes(Q, -1, -2), out=out)
+
+
+def _lamda_per_slice(lamda, es):
+    """Reshape `lamda` to broadcast over eigenvalues `es` of a stack."""
+    lamda = np.asarray(lamda, dtype=es.dtype)
+    if lamda.ndim > 0:
+        lamda = lamda.reshape(-1, 1)
+        if lamda.shape[0] != es.shape[0]:
+            raise ValueError(
+                "lamda should have one value for each of the %d matrices, "
+                "found %d" % (es.shape[0], lamda.shape[0]))
+    return lamda
+
+
+@contextmanager
+def _limit_blas_threads(n_threads):
+    """Limit the threads used by BLAS, if threadpoolctl is available."""
+    if threadpool_limits is None:
+        yield
+    else:
+        with threadpool_limits(limits=n_threads, user_api='blas'):
+            yield
+
+
+def _map_slices(prox, a, lamda, n_jobs, out=None, **kwargs):
+    """Apply a batched prox on chunks of a stack of matrices, in threads.
+
+    LAPACK releases the GIL, so the chunks are processed concurrently.
+    BLAS threads are shared among the workers to avoid oversubscription.
+
+    Returns
+    -------
+    out : ndarray
+        Result of the prox on the whole stack.
+    results : list
+        Output of the prox for each chunk.
+    """
+    n_chunks = min(effective_n_jobs(n_jobs), a.shape[0])
+    if out is None:
+        out = np.empty(a.shape, dtype=np.result_type(a, np.float32))
+    lamda = np.broadcast_to(np.asarray(lamda), a.shape[:1])
+    chunks = [
+        slice(c[0], c[-1] + 1)
+        for c in np.array_split(np.arange(a.shape[0]), n_chunks)]
+    with _limit_blas_threads(max(1, cpu_count() // n_chunks)):
+        results = Parallel(n_jobs=n_chunks, prefer='threads')(
+            delayed(prox)(a[c], lamda[c], out=out[c], **kwargs)
+            for c in chunks)
+    return out, results
+
+
+def prox_logdet(a, lamda, out=None, return_eig=False, n_jobs=None):
+    """Time-varying latent variable graphical lasso prox.
+
+    Parameters
+    ----------
+    a : ndarray, shape (n_features, n_features) or (n_times, ...)
+        Symmetric matrix, or stack of symmetric matrices.
+    lamda : float or array-like, shape (n_times,)
+        Parameter of the prox, possibly different for each matrix in `a`.
+    out : ndarray, optional
+        Preallocated output, same shape as `a`.
+    return_eig : bool, default False
+        Return also the eigenvalues and eigenvectors of the result, which
+        can be used to compute its log-determinant or its inverse.
+    n_jobs : int or None, optional
+        Number of threads to process a stack of matrices in parallel.
+
+    Returns
+    -------
+    x : ndarray
+        Result of the prox.
+    xi, Q : ndarray
+        If return_eig, the eigenvalues (positive) and eigenvectors of `x`.
+
+    """
+    if a.ndim > 2 and effective_n_jobs(n_jobs) > 1:
+        out, results = _map_slices(
+            prox_logdet, a, lamda, n_jobs, out=out, return_eig=return_eig)
+        if return_eig:
+            return (
+                out, np.concatenate([r[1] for r in results]),
+                np.concatenate([r[2] for r in results]))
+        return out
 
-def prox_logdet(a, lamda):
-    """Time-varying latent variable graphical lasso prox."""
     es, Q = np.linalg.eigh(a)
-    xi = (-es + np.sqrt(np.square(es) + 4. / lamda)) * lamda / 2.
-    return np.linalg.multi_dot((Q, np.diag(xi), Q.T))
+    lamda = _lamda_per_slice(lamda, es)
+    sq = np.sqrt(np.square(es) + 4. / lamda)
+    # avoid cancellation for positive eigenvalues (relevant in single
+    # precision), where the two expressions are equivalent
+    with np.errstate(divide='ignore', invalid='ignore'):
+        xi = np.where(es > 0, 2. / (es + sq), (sq - es) * lamda / 2.)
+    x = _scale_eigenvectors(Q, xi, out=out)
+    if return_eig:
+        return x, xi, Q
+    return x
 
 
 def prox_logdet_ala_ma(a, lamda):
     es, Q = np.linalg.eigh(a)
     xi = (-es + np.sqrt(np.square(es) + 4. * lamda)) / 2.
-    return np.linalg.multi_dot((Q, np.diag(xi), Q.T))
+    return _scale_eigenvectors(Q, xi)
 
 
-def prox_trace_indicator(a, lamda):
-    """Time-varying latent variable graphical lasso prox."""
+def prox_trace_indicator(a, lamda, out=None, n_jobs=None):
+    """Time-varying latent variable graphical lasso prox.
+
+    As `prox_logdet`, `a` can be a stack of matrices with a different
+    `lamda` for each one of them, processed in parallel with `n_jobs`.
+    """
+    if a.ndim > 2 and effective_n_jobs(n_jobs) > 1:
+        return _map_slices(prox_trace_indicator, a, lamda, n_jobs, out=out)[0]
+
     es, Q = np.linalg.eigh(a)
-    xi = np.maximum(es - lamda, 0)
-    return np.linalg.multi_dot((Q, np.diag(xi), Q.T))
+    xi = np.maximum(es - _lamda_per_slice(lamda, es), 0)
+    return _scale_eigenvectors(Q, xi, out=out)
 
 
 def prox_laplacian(a, lamda):
@@ -199,42 +304,156 @@ def prox_laplacian(a, lamda):
     return a / (1 + 2. * lamda)
 
 
-def prox_node_penalty(A_12, lamda, rho=1, tol=1e-4, rtol=1e-2, max_iter=500):
-    """Lamda = beta / (2. * rho).
+def laplacian_chain_factor(lamda, n_times):
+    """Factorise I + 2 lamda L, with L the Laplacian of a chain of times.
+
+    The system is tridiagonal, so the factorisation is the forward sweep of
+    the Thomas algorithm, to be reused by `prox_laplacian_chain`. If the
+    weights are the same for all the entries of the matrices, the system is
+    also stored in banded form, to be solved at once by LAPACK.
+
+    Parameters
+    ----------
+    lamda : float or ndarray, shape (n_times - 1, ...)
+        Weight of each consecutive difference. If an array, the trailing
+        dimensions can be different for each entry of the matrices.
+    n_times : int
+        Number of times.
+
+    Returns
+    -------
+    factor : tuple
+        Edge weights, upper diagonal of the factorisation, inverse pivots
+        and banded system (None if the weights differ across entries).
 
-    A_12 = np.vstack((A_1, A_2))
     """
-    n_time, _, n_dim = A_12.shape
+    weights = 2. * np.asarray(lamda, dtype=float)
+    if weights.ndim == 0:
+        weights = np.full(n_times - 1, weights)
+    weights = weights.reshape(weights.shape + (1, ) * (3 - weights.ndim))
+    shape = (n_times, ) + weights.shape[1:]
+    upper = np.zeros(shape)
+    inv_pivot = np.empty(shape)
+    pivot = np.ones(shape[1:])
+    for t in range(n_times):
+        if t > 0:
+            pivot = 1 + weights[t - 1] + weights[t - 1] * upper[t - 1]
+        if t < n_times - 1:
+            pivot = pivot + weights[t]
+        inv_pivot[t] = 1. / pivot
+        if t < n_times - 1:
+            upper[t] = -weights[t] * inv_pivot[t]
+
+    banded = None
+    if n_times > 1 and weights.shape[1:] == (1, 1):
+        banded = np.zeros((2, n_times))
+        banded[0, 1:] = -weights.ravel()
+        banded[1] = 1
+        banded[1, 1:] += weights.ravel()
+        banded[1, :-1] += weights.ravel()
+    return weights, upper, inv_pivot, banded
+
+
+def prox_laplacian_chain(a, lamda=None, factor=None, out=None):
+    """Prox of lamda * sum_t ||a_{t+1} - a_t||^2 along the first axis of a.
+
+    The solution of (I + 2 lamda L) x = a, with L the Laplacian of the
+    chain of times, is computed for each entry of the matrices with the
+    Thomas algorithm, in O(T d^2).
+
+    Parameters
+    ----------
+    a : ndarray, shape (n_times, n_features, n_features)
+        Stack of matrices.
+    lamda : float or ndarray, optional
+        Weight of the differences, see `laplacian_chain_factor`.
+    factor : tuple, optional
+        Precomputed `laplacian_chain_factor(lamda, n_times)`. If given,
+        `lamda` is ignored.
+    out : ndarray, optional
+        Output array, which can be `a`.
 
-    U_1 = np.full((A_12.shape[0], n_dim, n_dim), 1. / n_dim, dtype=float)
-    U_2 = np.copy(U_1)
-    Y_1 = np.copy(U_1)
-    Y_2 = np.copy(U_1)
+    """
+    if factor is None:
+        factor = laplacian_chain_factor(lamda, a.shape[0])
+    weights, upper, inv_pivot, banded = factor
+    if out is None:
+        out = np.empty_like(a)
+    if banded is not None:
+        out[...] = linalg.solveh_banded(
+            banded, a.reshape(a.shape[0], -1),
+            check_finite=False).reshape(a.shape)
+        return out
+
+    # forward substitution, then backward
+    np.multiply(a[0], inv_pivot[0], out=out[0])
+    for t in range(1, a.shape[0]):
+        out[t] = (a[t] + weights[t - 1] * out[t - 1]) * inv_pivot[t]
+    for t in range(a.shape[0] - 2, -1, -1):
+        out[t] -= upper[t] * out[t + 1]
+    return out
+
+
+def prox_node_penalty(
+        A_12, lamda, rho=1, tol=1e-4, rtol=1e-2, max_iter=500,
+        warm_start=None, return_state=False, update_rho_options=None):
+    """Lamda = beta / (2. * rho).
+
+    A_12 = np.vstack((A_1, A_2))
 
-    C = np.hstack((np.eye(n_dim), -np.eye(n_dim), np.eye(n_dim)))
-    inverse = np.linalg.inv(C.T.dot(C) + 2 * np.eye(3 * n_dim))
+    The inner ADMM can be warm started with the state of a previous call,
+    e.g., at the previous iteration of the outer solver.
 
-    V = np.zeros_like(U_1)
-    W = np.zeros_like(U_1)
-    V_old = np.zeros_like(U_1)
-    W_old = np.zeros_like(U_1)
+    Parameters
+    ----------
+    warm_start : admm_state, optional
+        Primal variables (V, W, Y_1, Y_2), dual variables (U_1, U_2) and
+        rho of a previous call (see `return_state`).
+    return_state : bool, default False
+        Return also the final inner state.
+    update_rho_options : dict, optional
+        Arguments for the rho update of the inner ADMM, usually the same of
+        the outer solver. See regain.update_rules.rho_strategy function.
 
+    """
+    n_time, _, n_dim = A_12.shape
+    A_1, A_2 = A_12[:, :n_dim], A_12[:, n_dim:]
+
+    if warm_start is None:
+        U_1 = np.full(
+            (A_12.shape[0], n_dim, n_dim), 1. / n_dim, dtype=A_12.dtype)
+        U_2 = np.copy(U_1)
+        Y_1 = np.copy(U_1)
+        Y_2 = np.copy(U_1)
+        W = np.zeros_like(U_1)
+    else:
+        W, Y_1, Y_2 = (z.copy() for z in warm_start.Z[1:])
+        U_1, U_2 = (u.copy() for u in warm_start.U)
+        rho = warm_start.rho
+    # constraints are V = B_1 = Y_1 - Y_2 - W and V = W^T
+    B_1_old = Y_1 - Y_2 - W
+    W_old = W
+
+    rho_rule = rho_strategy(**(update_rho_options or {}))
     for iteration_ in range(max_iter):
-        A = (
-            Y_1 - Y_2 - W - U_1 +
-            (W.transpose(0, 2, 1) - U_2).transpose(0, 2, 1)) / 2.
-        V = blockwise_soft_thresholding_symmetric(A, lamda=lamda)
+        A = (Y_1 - Y_2 - W - U_1 + W.transpose(0, 2, 1) - U_2) / 2.
+        V = blockwise_soft_thresholding(A, lamda=lamda / (2. * rho))
 
-        A = np.concatenate(((V + U_2).transpose(0, 2, 1), A_12), axis=1)
+        # (W, Y_1, Y_2) = (M + rho C^T C)^-1 (M (A_W, A_1, A_2) - rho C^T D),
+        # with C = (I, -I, I) and M = diag(rho, 1, 1), so that the system is
+        # (M_3 + rho c c^T) x I, inverted in closed form by Sherman-Morrison
+        A_W = (V + U_2).transpose(0, 2, 1)
         D = V + U_1
-        # Z = np.linalg.solve(C.T*C + eta*np.identity(3*n), - C.T*D + eta* A)
-        Z = np.empty_like(A)
-        for i, (A_i, D_i) in enumerate(zip(A, D)):
-            Z[i] = inverse.dot(2 * A_i - C.T.dot(D_i))
-        W, Y_1, Y_2 = (Z[:, i * n_dim:(i + 1) * n_dim, :] for i in range(3))
+        shift = (A_W - A_1 + A_2 - (1. + 2. * rho) * D) / (2. + 2. * rho)
+        W = A_W - D - shift
+        D += shift
+        D *= rho
+        Y_1 = A_1 + D
+        Y_2 = A_2 - D
 
         # update residuals
-        delta_U_1 = V + W - (Y_1 - Y_2)
+        B_1 = Y_1 - Y_2 - W
+        delta_U_1 = V - B_1
         delta_U_2 = V - W.transpose(0, 2, 1)
         U_1 += delta_U_1
         U_2 += delta_U_2
@@ -242,44 +461,179 @@ def prox_node_penalty(A_12, lamda, rho=1, tol=1e-4, rtol=1e-2, max_iter=500):
         # diagnostics
         rnorm = np.sqrt(squared_norm(delta_U_1) + squared_norm(delta_U_2))
         snorm = rho * np.sqrt(
-            squared_norm(W - W_old) + squared_norm(V + W - V_old - W_old))
+            squared_norm(B_1 - B_1_old) + squared_norm(W - W_old))
         check = convergence(
             obj=np.nan, rnorm=rnorm, snorm=snorm,
             e_pri=np.sqrt(2 * V.size) * tol + rtol * max(
-                np.sqrt(squared_norm(W) + squared_norm(V + W)),
-                np.sqrt(squared_norm(V) + squared_norm(Y_1 - Y_2))),
+                np.sqrt(2 * squared_norm(V)),
+                np.sqrt(squared_norm(B_1) + squared_norm(W))),
             e_dual=np.sqrt(2 * V.size) * tol +
             rtol * rho * np.sqrt(squared_norm(U_1) + squared_norm(U_2)))
-        W_old = W.copy()
-        V_old = V.copy()
+        B_1_old = B_1
+        W_old = W
 
         # if np.linalg.norm(delta_U_1, 'fro') < tol and \
         #         np.linalg.norm(delta_U_2, 'fro') < tol:
         if check.rnorm <= check.e_pri and check.snorm <= check.e_dual:
             break
-        rho_new = update_rho(rho, rnorm, snorm, iteration=iteration_)
-        # scaled dual variables should be also rescaled
-        U_1 *= rho / rho_new
-        U_2 *= rho / rho_new
-        rho = rho_new
+        rho = rho_rule(
+            rho, rnorm, snorm, iteration=iteration_, check=check,
+            duals=[U_1, U_2], Ax=[V, V], Bz=[B_1, W.transpose(0, 2, 1)])
     else:
         warnings.warn("Node norm did not converge.")
+
+    if return_state:
+        return Y_1, Y_2, admm_state(
+            Z=(V, W, Y_1, Y_2), U=(U_1, U_2), rho=rho)
     return Y_1, Y_2
 
 
+def total_variation_1d(a, lamda):
+    """Prox of lamda * sum_t |x_{t+1} - x_t| along the first axis of a.
+
+    Each column of `a` is solved exactly with the direct algorithm of
+    Condat (2013), with all the columns processed together: each step of
+    the algorithm is vectorised across the columns that did not end yet.
+
+    Parameters
+    ----------
+    a : ndarray, shape (n_times, ...)
+        Signals to denoise, one for each entry of the trailing dimensions.
+    lamda : float or ndarray
+        Regularisation parameter, possibly different for each signal.
+
+    Returns
+    -------
+    x : ndarray, shape (n_times, ...)
+        Denoised signals.
+
+    References
+    ----------
+    Condat, L. (2013). A direct algorithm for 1-D total variation
+    denoising. IEEE Signal Processing Letters, 20(11), 1054-1057.
+
+    """
+    n_times = a.shape[0]
+    y = np.asarray(a, dtype=float).reshape(n_times, -1)
+    n_signals = y.shape[1]
+    signals = np.arange(n_signals)
+    lamda = np.broadcast_to(np.asarray(lamda, dtype=float), a.shape[1:])
+    lamda = lamda.ravel()
+
+    # start of each segment of the solution, with its value
+    is_start = np.zeros((n_times, n_signals), dtype=bool)
+    value = np.zeros((n_times, n_signals))
+
+    def end_segment(mask, v, last):
+        # the segment from k0 to `last` has value v
+        is_start[k0[mask], signals[mask]] = True
+        value[k0[mask], signals[mask]] = v[mask]
+        k0[mask] = last[mask] + 1
+
+    k = np.zeros(n_signals, dtype=int)
+    k0, k_minus, k_plus = k.copy(), k.copy(), k.copy()
+    v_min, v_max = y[0] - lamda, y[0] + lamda
+    u_min, u_max = lamda.copy(), -lamda
+    active = np.ones(n_signals, dtype=bool)
+    while active.any():
+        last = active & (k == n_times - 1)
+        step = active & ~last
+
+        # end of the signal: close the segments, or restart before
+        jump_min = last & (u_min < 0)
+        end_segment(jump_min, v_min, k_minus)
+        k[jump_min] = k_minus[jump_min] = k0[jump_min]
+        v_min[jump_min] = y[k0[jump_min], signals[jump_min]]
+        u_min[jump_min] = lamda[jump_min]
+        u_max[jump_min] = (
+            v_min[jump_min] + lamda[jump_min] - v_max[jump_min])
+
+        jump_max = last & ~jump_min & (u_max > 0)
+        end_segment(jump_max, v_max, k_plus)
+        k[jump_max] = k_plus[jump_max] = k0[jump_max]
+        v_max[jump_max] = y[k0[jump_max], signals[jump_max]]
+        u_max[jump_max] = -lamda[jump_max]
+        u_min[jump_max] = (
+            v_max[jump_max] - lamda[jump_max] - v_min[jump_max])
+
+        done = last & ~jump_min & ~jump_max
+        v_min[done] += u_min[done] / (k[done] - k0[done] + 1)
+        end_segment(done, v_min, k)
+        active &= ~done
+
+        # one step forward, unless the bounds are violated
+        y_next = y[np.minimum(k + 1, n_times - 1), signals]
+        u_min_next = u_min + y_next - v_min
+        u_max_next = u_max + y_next - v_max
+        down = step & (u_min_next < -lamda)
+        up = step & ~down & (u_max_next > lamda)
+        end_segment(down, v_min, k_minus)
+        end_segment(up, v_max, k_plus)
+        restart = down | up
+        k[restart] = k_minus[restart] = k_plus[restart] = k0[restart]
+        y_restart = y[k0[restart], signals[restart]]
+        v_min[restart] = np.where(
+            down[restart], y_restart, y_restart - 2 * lamda[restart])
+        v_max[restart] = v_min[restart] + 2 * lamda[restart]
+        u_min[restart] = lamda[restart]
+        u_max[restart] = -lamda[restart]
+
+        forward = step & ~restart
+        k[forward] += 1
+        u_min[forward] = u_min_next[forward]
+        u_max[forward] = u_max_next[forward]
+        length = k - k0 + 1
+        update_min = forward & (u_min >= lamda)
+        k_minus[update_min] = k[update_min]
+        v_min[update_min] += (
+            u_min[update_min] - lamda[update_min]) / length[update_min]
+        u_min[update_min] = lamda[update_min]
+        update_max = forward & (u_max <= -lamda)
+        k_plus[update_max] = k[update_max]
+        v_max[update_max] += (
+            u_max[update_max] + lamda[update_max]) / length[update_max]
+        u_max[update_max] = -lamda[update_max]
+
+    # propagate the value of each segment from its start
+    start = np.where(is_start, np.arange(n_times)[:, None], 0)
+    np.maximum.accumulate(start, axis=0, out=start)
+    return value[start, signals].reshape(a.shape)
+
+
 def prox_FL(
-        a, beta, lamda, p=1, symmetric=False, use_matlab=False, optimize=True):
+        a, beta, lamda, p=1, symmetric=False, use_matlab=False, optimize=True,
+        n_jobs=None):
     """Fused Lasso prox.
 
     It is calculated as the Total variation prox + soft thresholding
     on the solution, as in
     http://ieeexplore.ieee.org/abstract/document/6579659/
+
+    The total variation prox is computed by `prox_tv`, with `n_jobs`
+    threads, if installed. Otherwise, for p=1 it is computed by
+    `total_variation_1d`, on the upper triangular entries only if
+    `symmetric`.
     """
     # if any([any(np.diag(x) < 0) for x in a]):
     #     for a_i in a:
     #         np.fill_diagonal(a_i, np.sum(np.abs(a_i), axis=1))
-    if optimize:
-        Y = tvgen(a, [beta], [1], [p], n_threads=32, max_iters=30)
+    if tvgen is None:
+        if p != 1:
+            raise ImportError(
+                "The fused lasso prox with p != 1 relies on `prox_tv` "
+                "library. Please install it before using it.")
+        if symmetric:
+            x, y = np.triu_indices(a.shape[1])
+            Y = np.empty_like(a)
+            Y[:, x, y] = total_variation_1d(a[:, x, y], beta)
+            Y[:, y, x] = Y[:, x, y]
+        else:
+            Y = total_variation_1d(a, beta)
+
+    elif optimize:
+        Y = tvgen(
+            a, [beta], [1], [p], n_threads=effective_n_jobs(n_jobs),
+            max_iters=30)
 
     else:
         Y = np.empty_like(a)
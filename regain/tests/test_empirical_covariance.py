@@ -0,0 +1,111 @@
+# BSD 3-Clause License
+
+# Copyright (c) 2019, regain authors
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+
+# * Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+
+# * Neither the name of the copyright holder nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""Test empirical covariances of groups and out-of-core data."""
+import os
+import tempfile
+
+import numpy as np
+from numpy.testing import assert_array_almost_equal, assert_array_equal
+
+from regain.covariance import GraphicalLasso, TimeGraphicalLasso
+from scipy import sparse
+
+from regain.covariance.empirical_covariance_ import (
+    covariance_statistics, group_statistics, streaming_statistics)
+
+
+def test_streaming_statistics():
+    """Check statistics of data in chunks against the in-memory ones."""
+    rs = np.random.RandomState(0)
+    X = rs.randn(1000, 4) * 10 + 1e4
+    y = rs.randint(5, size=1000)
+    expected = group_statistics(X, y)
+
+    chunks = ((X[i:i + 64], y[i:i + 64]) for i in range(0, 1000, 64))
+    for stats in (streaming_statistics(chunks),
+                  streaming_statistics(X, y, chunk_size=100)):
+        for a, b in zip(stats, expected):
+            assert_array_almost_equal(a, b)
+
+    _, n_samples, location, emp_cov = streaming_statistics(
+        iter(np.array_split(X, 7)), assume_centered=True)
+    assert_array_equal(n_samples, [1000])
+    assert_array_almost_equal(location[0], np.zeros(4))
+    assert_array_almost_equal(emp_cov[0], X.T.dot(X) / 1000)
+
+
+def test_sparse_statistics():
+    """Check statistics and fits of sparse data against dense ones."""
+    X_sparse = sparse.random(200, 5, density=.3, format='csr', random_state=0)
+    X = X_sparse.toarray()
+    y = np.repeat(np.arange(4), 50)
+    for a, b in zip(group_statistics(X_sparse, y), group_statistics(X, y)):
+        assert_array_almost_equal(a, b)
+    for a, b in zip(covariance_statistics(X_sparse.tocsc()),
+                    covariance_statistics(X)):
+        assert_array_almost_equal(a, b)
+
+    mdl = GraphicalLasso(alpha=.01).fit(X)
+    mdl_sparse = GraphicalLasso(alpha=.01).fit(X_sparse)
+    assert_array_almost_equal(mdl.precision_, mdl_sparse.precision_)
+    assert_array_almost_equal(mdl.score(X), mdl_sparse.score(X_sparse))
+
+    mdl = TimeGraphicalLasso(alpha=.01).fit(X, y)
+    mdl_sparse = TimeGraphicalLasso(alpha=.01).fit(X_sparse.tocsc(), y)
+    assert_array_almost_equal(mdl.precision_, mdl_sparse.precision_)
+    assert_array_almost_equal(
+        mdl.score(X, y), mdl_sparse.score(X_sparse, y))
+
+
+def test_out_of_core_fit():
+    """Check estimators fitted on memory-mapped data."""
+    rs = np.random.RandomState(0)
+    X = rs.randn(200, 4)
+    y = np.repeat(np.arange(4), 50)
+
+    tmpdir = tempfile.mkdtemp()
+    path_X = os.path.join(tmpdir, 'X.npy')
+    path_y = os.path.join(tmpdir, 'y.npy')
+    np.save(path_X, X)
+    np.save(path_y, y)
+    try:
+        mdl = TimeGraphicalLasso().fit(X, y)
+        mdl_ooc = TimeGraphicalLasso().fit(path_X, path_y)
+        assert_array_almost_equal(mdl.precision_, mdl_ooc.precision_)
+        assert_array_almost_equal(mdl.location_, mdl_ooc.location_)
+
+        mdl = GraphicalLasso().fit(X)
+        mdl_ooc = GraphicalLasso().fit(np.load(path_X, mmap_mode='r'))
+        assert_array_almost_equal(mdl.precision_, mdl_ooc.precision_)
+        del mdl_ooc
+    finally:
+        os.remove(path_X)
+        os.remove(path_y)
+        os.rmdir(tmpdir)
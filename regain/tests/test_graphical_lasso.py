@@ -30,6 +30,7 @@
 """Test LatentTimeGraphicalLasso."""
 import numpy as np
 from numpy.testing import assert_array_almost_equal
+from scipy import linalg, sparse
 
 try:
     # sklean >= 0.20
@@ -38,7 +39,10 @@ except ImportError:
     # sklean < 0.20
     from sklearn.covariance import GraphLasso as GL
 
-from regain.covariance.graphical_lasso_ import GraphicalLasso
+from regain.covariance.graphical_lasso_ import (
+    GraphicalLasso, GraphicalLassoCV, GraphicalLassoWorkspace, alpha_grid,
+    graphical_lasso, graphical_lasso_path, screen_components)
+from regain.utils import error_norm
 
 
 def test_gl():
@@ -49,3 +53,89 @@ def test_gl():
     p2 = GraphicalLasso().fit(X).precision_
 
     assert_array_almost_equal(p1, p2, 1)
+
+
+def test_gl_workspace():
+    """Check graphical_lasso with a workspace reused across calls."""
+    np.random.seed(2)
+    X = np.random.multivariate_normal(np.zeros(3), np.eye(3), size=100)
+    emp_cov = np.cov(X.T, bias=1)
+    workspace = GraphicalLassoWorkspace(3)
+
+    for alpha in (.1, .01):
+        p1 = graphical_lasso(emp_cov, alpha=alpha)[0]
+        p2 = graphical_lasso(emp_cov, alpha=alpha, workspace=workspace)[0]
+        assert_array_almost_equal(p1, p2)
+
+    p1 = graphical_lasso(emp_cov, over_relax=1.5)[0]
+    p2 = graphical_lasso(emp_cov, over_relax=1.5, workspace=workspace)[0]
+    assert_array_almost_equal(p1, p2)
+
+
+def test_gl_screening():
+    """Check that screening gives the same solution of the full problem."""
+    np.random.seed(0)
+    cov = linalg.block_diag(
+        [[1, .6, .3], [.6, 1, .5], [.3, .5, 1]], [[1, .7], [.7, 1]], 1, 1)
+    X = np.random.multivariate_normal(np.zeros(7), cov, size=200)
+    emp_cov = np.cov(X.T, bias=1)
+    alpha = .2
+    assert len(screen_components(emp_cov, alpha)) > 2
+
+    p1 = graphical_lasso(emp_cov, alpha=alpha, tol=1e-8, rtol=1e-8,
+                         max_iter=2000)[0]
+    for n_jobs in (1, 2):
+        mdl = GraphicalLasso(
+            alpha=alpha, tol=1e-8, rtol=1e-8, max_iter=2000, screening=True,
+            n_jobs=n_jobs, assume_centered=False).fit(X)
+        assert_array_almost_equal(mdl.precision_, p1, 4)
+
+
+def test_gl_path():
+    """Check the warm-started path against independent solutions."""
+    np.random.seed(0)
+    X = np.random.randn(100, 5)
+    emp_cov = np.cov(X.T, bias=1)
+    alphas = alpha_grid(emp_cov, n_alphas=5)
+    params = dict(tol=1e-8, rtol=1e-8, max_iter=2000)
+
+    precisions, covariances, _ = graphical_lasso_path(
+        emp_cov, alphas, **params)
+    for alpha, precision, covariance in zip(alphas, precisions, covariances):
+        assert_array_almost_equal(
+            precision, graphical_lasso(emp_cov, alpha=alpha, **params)[0], 4)
+        assert_array_almost_equal(covariance, linalg.inv(precision), 4)
+
+    mdl = GraphicalLassoCV(alphas=alphas, cv=3).fit(X)
+    assert mdl.alpha_ in alphas
+    assert mdl.grid_scores_.shape == (5, 3)
+    assert_array_almost_equal(mdl.covariance_, linalg.inv(mdl.precision_), 4)
+
+
+def test_gl_sparse_output():
+    """Check GraphicalLasso with a sparse precision matrix."""
+    np.random.seed(0)
+    X = np.random.randn(100, 6)
+    mdl = GraphicalLasso(alpha=.1).fit(X)
+    mdl_sparse = GraphicalLasso(alpha=.1, output='sparse').fit(X)
+
+    assert sparse.isspmatrix_csr(mdl_sparse.precision_)
+    assert mdl_sparse.precision_.nnz == np.count_nonzero(mdl.precision_)
+    assert_array_almost_equal(
+        mdl_sparse.get_precision().toarray(), mdl.precision_)
+    assert_array_almost_equal(mdl_sparse.score(X), mdl.score(X))
+    assert_array_almost_equal(
+        error_norm(mdl_sparse.precision_, np.eye(6)),
+        error_norm(mdl.precision_, np.eye(6)))
+
+
+def test_gl_quic():
+    """Check that the QUIC mode finds the same solution of ADMM."""
+    np.random.seed(0)
+    X = np.random.randn(60, 10)
+    params = dict(alpha=.1, max_iter=2000, tol=1e-8)
+    mdl = GraphicalLasso(rtol=1e-8, **params).fit(X)
+    mdl_quic = GraphicalLasso(mode='quic', **params).fit(X)
+    assert_array_almost_equal(mdl_quic.precision_, mdl.precision_, 5)
+    assert_array_almost_equal(
+        mdl_quic.covariance_, linalg.inv(mdl_quic.precision_))
@@ -0,0 +1,165 @@
+# BSD 3-Clause License
+
+# Copyright (c) 2019, regain authors
+# All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+
+# * Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+
+# * Neither the name of the copyright holder nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""Test KernelTimeGraphicalLasso."""
+import numpy as np
+from numpy.testing import assert_array_almost_equal, assert_raises
+from scipy import sparse
+from sklearn.base import clone
+
+from regain.covariance.kernel_time_graphical_lasso_ import (
+    KernelTimeGraphicalLasso, _DenseLaplacian, _ToeplitzLaplacian,
+    kernel_lags, kernel_laplacian, kernel_time_graphical_lasso,
+    stationary_weights)
+from regain.covariance.time_graphical_lasso_ import (
+    _ChainLaplacian, _time_graphical_lasso_laplacian)
+
+
+def test_ktgl_banded_kernel():
+    """Check that discarding negligible lags does not change the solution."""
+    rs = np.random.RandomState(0)
+    n_times = 8
+    emp_cov = np.array([np.cov(rs.randn(30, 4).T) for _ in range(n_times)])
+    times = np.arange(n_times)
+    kernel = np.exp(-np.square(times[:, None] - times[None, :]) / 2.)
+    kernel[np.abs(times[:, None] - times[None, :]) > 2] = 0
+
+    assert kernel_lags(kernel) == [1, 2]
+    assert kernel_lags(kernel, max_lag=1) == [1]
+    assert kernel_lags(kernel, kernel_tol=.5) == [1]
+
+    params = dict(alpha=.1, kernel=kernel, tol=1e-8, rtol=1e-8, max_iter=3000)
+    for psi in ('laplacian', 'l1'):
+        p_all = kernel_time_graphical_lasso(
+            emp_cov, psi=psi, kernel_tol=-1, **params)[0]
+        p_band = kernel_time_graphical_lasso(emp_cov, psi=psi, **params)[0]
+        assert_array_almost_equal(p_band, p_all, 4)
+
+    X = rs.randn(80, 4)
+    y = np.repeat(np.arange(4), 20)
+    kernel = np.eye(4) + np.diag(np.ones(3), 1) + np.diag(np.ones(3), -1)
+    p1 = KernelTimeGraphicalLasso(kernel=kernel, max_iter=500).fit(X, y)
+    p2 = KernelTimeGraphicalLasso(
+        kernel=kernel, max_iter=500, max_lag=1).fit(X, y)
+    assert_array_almost_equal(p1.precision_, p2.precision_, 3)
+
+
+def test_kernel_laplacian():
+    """Check the Laplacian penalty against the sum over pairs of times."""
+    rs = np.random.RandomState(0)
+    n_times = 6
+    times = np.arange(n_times)
+    kernel = np.exp(-np.square(times[:, None] - times[None, :]) / 4.)
+    K = rs.randn(n_times, 3, 3)
+
+    for max_lag in (None, 2):
+        laplacian = kernel_laplacian(kernel, max_lag=max_lag)
+        Z = K.reshape(n_times, -1)
+        penalty = sum(
+            kernel[s, t] * np.sum(np.square(K[s] - K[t]))
+            for s in times for t in times[:s] if s - t <= (max_lag or s))
+        assert_array_almost_equal(np.sum(Z * laplacian.dot(Z)), penalty)
+
+
+def test_ktgl_stationary():
+    """Check the FFT operator of a stationary kernel against the dense one."""
+    rs = np.random.RandomState(0)
+    n_times = 9
+    times = np.arange(n_times)
+    kernel = np.exp(-np.square(times[:, None] - times[None, :]) / 4.)
+    weights = stationary_weights(kernel, max_lag=3)
+    assert_array_almost_equal(weights[:5], np.r_[0, kernel[0, 1:4], 0])
+    assert stationary_weights(np.exp(-np.square(
+        np.sqrt(times)[:, None] - np.sqrt(times)[None, :]))) is None
+
+    laplacian = kernel_laplacian(kernel, max_lag=3)
+    operator = _ToeplitzLaplacian(weights)
+    B = rs.randn(n_times, 4)
+    assert_array_almost_equal(operator.dot(B), laplacian.dot(B))
+    assert_array_almost_equal(
+        operator.solve(B, 1.5),
+        np.linalg.solve(np.eye(n_times) + 1.5 * laplacian, B))
+
+    emp_cov = np.array([np.cov(rs.randn(30, 4).T) for _ in range(n_times)])
+    params = dict(alpha=.1, kernel=kernel, tol=1e-8, rtol=1e-8, max_iter=3000)
+    assert_array_almost_equal(
+        kernel_time_graphical_lasso(emp_cov, stationary=True, **params)[0],
+        kernel_time_graphical_lasso(emp_cov, stationary=False, **params)[0])
+    assert_raises(
+        ValueError, kernel_time_graphical_lasso, emp_cov, stationary=True,
+        kernel=np.eye(n_times) + rs.rand(n_times, n_times) / 10)
+
+
+def test_laplacian_operators():
+    """Check the Laplacian operators on a chain kernel in the ADMM loop."""
+    rs = np.random.RandomState(0)
+    n_times = 7
+    beta = 1.5
+    kernel = beta * (
+        np.diag(np.ones(n_times - 1), 1) + np.diag(np.ones(n_times - 1), -1))
+    operators = [
+        _ChainLaplacian(beta, n_times),
+        _DenseLaplacian(kernel_laplacian(kernel)),
+        _ToeplitzLaplacian(stationary_weights(kernel))]
+
+    B = rs.randn(n_times, 3, 3)
+    for operator in operators[1:]:
+        assert_array_almost_equal(operator.dot(B), operators[0].dot(B))
+        assert_array_almost_equal(
+            operator.solve(B, .7), operators[0].solve(B, .7))
+
+    emp_cov = np.array([np.cov(rs.randn(30, 4).T) for _ in range(n_times)])
+    params = dict(alpha=.1, tol=1e-8, rtol=1e-8, max_iter=3000)
+    precision, _, n_iter, state = _time_graphical_lasso_laplacian(
+        emp_cov, operators[0], return_state=True, **params)
+    for operator in operators[1:]:
+        assert_array_almost_equal(
+            _time_graphical_lasso_laplacian(
+                emp_cov, operator, acceleration='anderson', **params)[0],
+            precision)
+        # warm started from the solution, it converges immediately
+        warm = _time_graphical_lasso_laplacian(
+            emp_cov, operator, warm_start=state, **params)
+        assert_array_almost_equal(warm[0], precision)
+        assert warm[2] < n_iter
+
+
+def test_ktgl_sparse_output():
+    """Check KernelTimeGraphicalLasso with sparse precision matrices."""
+    rs = np.random.RandomState(0)
+    X = rs.randn(120, 5)
+    y = np.repeat(np.arange(4), 30)
+    mdl = KernelTimeGraphicalLasso(alpha=.3, kernel=np.eye(4)).fit(X, y)
+    mdl_sparse = clone(KernelTimeGraphicalLasso(
+        alpha=.3, kernel=np.eye(4), output='sparse')).fit(X, y)
+
+    assert all(sparse.isspmatrix_csr(p) for p in mdl_sparse.precision_)
+    assert_array_almost_equal(
+        [p.toarray() for p in mdl_sparse.precision_], mdl.precision_)
+    assert_array_almost_equal(mdl_sparse.score(X, y), mdl.score(X, y))
@@ -31,7 +31,9 @@
 import numpy as np
 import warnings
 
-from numpy.testing import assert_array_equal
+from numpy.testing import assert_array_almost_equal, assert_array_equal
+from scipy import sparse
+from sklearn.base import clone
 
 from regain.covariance.latent_graphical_lasso_ import LatentGraphicalLasso
 
@@ -50,3 +52,14 @@ def test_lgl_zero():
     assert_array_equal(mdl.latent_, a)
     assert_array_equal(mdl.get_precision(),
                        mdl.precision_ - mdl.latent_)
+
+
+def test_lgl_sparse_output():
+    """Check LatentGraphicalLasso with a sparse precision matrix."""
+    np.random.seed(0)
+    X = np.random.randn(100, 6)
+    mdl = LatentGraphicalLasso(alpha=.1).fit(X)
+    mdl_sparse = clone(LatentGraphicalLasso(alpha=.1, output='sparse')).fit(X)
+
+    assert sparse.isspmatrix_csr(mdl_sparse.precision_)
+    assert_array_almost_equal(mdl_sparse.get_precision(), mdl.get_precision())
@@ -31,7 +31,9 @@
 import numpy as np
 import warnings
 
-from numpy.testing import assert_array_equal
+from numpy.testing import assert_array_almost_equal, assert_array_equal
+from scipy import sparse
+from sklearn.base import clone
 
 from regain.covariance.latent_time_graphical_lasso_ import LatentTimeGraphicalLasso
 
@@ -74,3 +76,21 @@ def test_ltgl_prox_l1():
     assert_array_equal(mdl.latent_, np.zeros((3, 3, 3)))
     assert_array_equal(
         mdl.get_observed_precision(), mdl.precision_ - mdl.latent_)
+
+
+def test_ltgl_sparse_output():
+    """Check LatentTimeGraphicalLasso with sparse precision matrices."""
+    rs = np.random.RandomState(0)
+    X = rs.randn(90, 5)
+    y = np.repeat(np.arange(3), 30)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        mdl = LatentTimeGraphicalLasso(alpha=.5, tau=.5).fit(X, y)
+        mdl_sparse = clone(
+            LatentTimeGraphicalLasso(alpha=.5, tau=.5, output='sparse')).fit(
+                X, y)
+
+    assert all(sparse.isspmatrix_csr(p) for p in mdl_sparse.precision_)
+    assert_array_almost_equal(
+        mdl_sparse.get_observed_precision(), mdl.get_observed_precision())
+    assert_array_almost_equal(mdl_sparse.score(X, y), mdl.score(X, y))
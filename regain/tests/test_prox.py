@@ -29,13 +29,18 @@
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 """Test utils module."""
 import numpy as np
-from numpy.testing import assert_array_almost_equal, assert_array_equal
+from numpy.testing import (
+    assert_array_almost_equal, assert_array_equal, assert_raises)
 
 from regain import prox
 
 
 def test_soft_thresholding():
     """Test soft_thresholding function."""
+    # scalar
+    assert prox.soft_thresholding(3., 1.) == 2.
+    assert prox.soft_thresholding(-.5, 1.) == 0.
+
     # array
     array = np.arange(3)
     output = np.array([0, 0.5, 1.5])
@@ -62,6 +67,13 @@ def test_soft_thresholding():
         prox.soft_thresholding(array,
                                np.arange(1, 4)[:, None, None]), output)
 
+    # in-place, on negative values
+    array = np.arange(-4., 5.).reshape(3, 3)
+    output = prox.soft_thresholding(array, 1)
+    assert prox.soft_thresholding(array, 1, out=array) is array
+    assert_array_equal(array, output)
+    assert_array_equal(output.ravel(), [-3, -2, -1, 0, 0, 0, 1, 2, 3])
+
 
 def test_soft_thresholding_od():
     """Test soft_thresholding_od function."""
@@ -127,3 +139,177 @@ def test_soft_thresholding_vector():
 
     assert_array_almost_equal(
         prox.blockwise_soft_thresholding_symmetric(arr3, 1), out)
+
+
+def test_prox_logdet():
+    """Test prox_logdet function on a stack of matrices."""
+    rs = np.random.RandomState(0)
+    a = rs.randn(4, 5, 5)
+    a += a.transpose(0, 2, 1)
+    lamda = np.arange(1, 5) / 2.
+
+    output = np.array([prox.prox_logdet(x, l) for x, l in zip(a, lamda)])
+    assert_array_almost_equal(prox.prox_logdet(a, lamda), output)
+
+    out = np.empty_like(a)
+    prox.prox_logdet(a, lamda, out=out)
+    assert_array_almost_equal(out, output)
+
+    es, Q = np.linalg.eigh(a[0])
+    xi = (-es + np.sqrt(np.square(es) + 4. / lamda[0])) * lamda[0] / 2.
+    assert_array_almost_equal(
+        prox.prox_logdet(a[0], lamda[0]),
+        np.linalg.multi_dot((Q, np.diag(xi), Q.T)))
+
+    x, xi, Q = prox.prox_logdet(a, lamda, return_eig=True)
+    assert_array_almost_equal(x, output)
+    assert_array_almost_equal(
+        np.log(xi).sum(axis=1), np.linalg.slogdet(output)[1])
+    assert_array_almost_equal(
+        np.matmul(Q / xi[:, None, :], Q.transpose(0, 2, 1)),
+        np.linalg.inv(output))
+
+    # one lamda for each matrix is required
+    assert_raises(ValueError, prox.prox_logdet, a, lamda[:3])
+    assert_raises(ValueError, prox.soft_thresholding_od, a, lamda[:3])
+
+
+def test_soft_thresholding_out():
+    """Test in-place soft_thresholding functions with per-slice lamda."""
+    rs = np.random.RandomState(0)
+    a = rs.randn(3, 4, 4)
+    lamda = np.array([.1, .5, 1.])
+
+    output = np.array(
+        [prox.soft_thresholding_od(x, l) for x, l in zip(a, lamda)])
+    out = np.empty_like(a)
+    prox.soft_thresholding_od(a, lamda, out=out)
+    assert_array_equal(out, output)
+    prox.soft_thresholding_od(a, lamda, out=a)
+    assert_array_equal(a, output)
+
+    a = rs.randn(3, 4, 4)
+    a += a.transpose(0, 2, 1)
+    output = np.array(
+        [prox.blockwise_soft_thresholding(x, l) for x, l in zip(a, lamda)])
+    assert_array_almost_equal(
+        prox.blockwise_soft_thresholding(a, lamda), output)
+    assert_array_almost_equal(
+        prox.blockwise_soft_thresholding_symmetric(
+            a, lamda[:, None, None], out=a), output)
+
+
+def test_prox_linf():
+    """Test prox_linf function."""
+    array = np.array([3., 1., -2.])
+    assert_array_almost_equal(prox.prox_linf_1d(array, 1), [2, 1, -2])
+    assert_array_almost_equal(prox.prox_linf_1d(array, 10), np.zeros(3))
+    assert_array_almost_equal(prox.prox_linf_1d(array, 0), array)
+
+    # columns of a tensor, lamda is a list
+    rs = np.random.RandomState(0)
+    array = rs.randn(3, 4, 4)
+    lamda = np.array([.1, 1., 3.])
+    output = np.array(
+        [
+            [prox.prox_linf_1d(x[:, j], l) for j in range(4)]
+            for x, l in zip(array, lamda)
+        ]).transpose(0, 2, 1)
+    assert_array_almost_equal(prox.prox_linf(array, lamda), output)
+
+
+def test_prox_n_jobs():
+    """Test the prox of a stack of matrices computed in parallel."""
+    rs = np.random.RandomState(0)
+    a = rs.randn(5, 4, 4)
+    a += a.transpose(0, 2, 1)
+    lamda = np.arange(1, 6) / 2.
+
+    x, xi, Q = prox.prox_logdet(a, lamda, return_eig=True)
+    x_par, xi_par, Q_par = prox.prox_logdet(
+        a, lamda, return_eig=True, n_jobs=2)
+    assert_array_almost_equal(x_par, x)
+    assert_array_almost_equal(xi_par, xi)
+    assert_array_almost_equal(
+        np.matmul(Q_par / xi_par[:, None, :], Q_par.transpose(0, 2, 1)),
+        np.matmul(Q / xi[:, None, :], Q.transpose(0, 2, 1)))
+
+    out = np.empty_like(a)
+    prox.prox_trace_indicator(a, lamda, out=out, n_jobs=2)
+    assert_array_almost_equal(out, prox.prox_trace_indicator(a, lamda))
+
+
+def test_prox_laplacian_chain():
+    """Test the tridiagonal solve against the dense Laplacian system."""
+    rs = np.random.RandomState(0)
+    a = rs.randn(6, 3, 3)
+    laplacian = 2 * np.eye(6) - np.eye(6, k=1) - np.eye(6, k=-1)
+    laplacian[0, 0] = laplacian[-1, -1] = 1
+
+    for lamda in (.7, np.full((5, 3, 3), .7)):
+        x = prox.prox_laplacian_chain(a, lamda)
+        x_dense = np.linalg.solve(
+            np.eye(6) + 1.4 * laplacian, a.reshape(6, -1))
+        assert_array_almost_equal(x, x_dense.reshape(a.shape))
+
+    # different weights for each time
+    lamda = rs.rand(5)
+    factor = prox.laplacian_chain_factor(lamda, 6)
+    x = prox.prox_laplacian_chain(a, factor=factor)
+    x_entries = prox.prox_laplacian_chain(
+        a, np.repeat(lamda, 9).reshape(5, 3, 3))
+    assert_array_almost_equal(x, x_entries)
+
+
+def test_total_variation_1d():
+    """Test the optimality conditions of the total variation prox."""
+    rs = np.random.RandomState(0)
+    a = np.repeat(rs.randn(4, 6, 5), 5, axis=0) + rs.randn(20, 6, 5) / 2.
+    for lamda in (0, .5, 2., rs.rand(6, 5)):
+        x = prox.total_variation_1d(a, lamda)
+        assert x.shape == a.shape
+
+        # a - x = D^T u, with |u| <= lamda and u = lamda sign(D x)
+        u = -np.cumsum(a - x, axis=0)
+        assert_array_almost_equal(u[-1], 0)
+        assert np.all(np.abs(u) <= lamda + 1e-10)
+        diff = np.diff(x, axis=0)
+        lamda_t = np.broadcast_to(lamda, u[:-1].shape)
+        assert_array_almost_equal(u[:-1][diff > 1e-10], lamda_t[diff > 1e-10])
+        assert_array_almost_equal(
+            u[:-1][diff < -1e-10], -lamda_t[diff < -1e-10])
+
+    a = rs.randn(10, 4, 4)
+    a += a.transpose(0, 2, 1)
+    y = prox.prox_FL(a, .5, .1, symmetric=True)
+    assert_array_almost_equal(y, y.transpose(0, 2, 1))
+
+
+def test_prox_node_penalty():
+    """Test the node penalty prox and its warm start."""
+    rs = np.random.RandomState(0)
+    a = rs.randn(4, 6, 3)
+    a[:, :3] += a[:, :3].transpose(0, 2, 1)
+    a[:, 3:] += a[:, 3:].transpose(0, 2, 1)
+    params = dict(tol=1e-10, rtol=1e-10, max_iter=5000)
+
+    Y_1, Y_2 = prox.prox_node_penalty(a, 0, **params)
+    assert_array_almost_equal(Y_1, a[:, :3])
+    assert_array_almost_equal(Y_2, a[:, 3:])
+
+    Y_1, Y_2, state = prox.prox_node_penalty(
+        a, .3, return_state=True, **params)
+    V, W = state.Z[:2]
+    assert_array_almost_equal(V, W.transpose(0, 2, 1))
+    assert_array_almost_equal(V + W, Y_1 - Y_2)
+
+    Y_1_warm, Y_2_warm, state_warm = prox.prox_node_penalty(
+        a, .3, warm_start=state, return_state=True, **params)
+    assert_array_almost_equal(Y_1_warm, Y_1)
+    assert_array_almost_equal(Y_2_warm, Y_2)
+
+    for strategy in ('normalized', 'spectral'):
+        Y_1_rho, Y_2_rho = prox.prox_node_penalty(
+            a, .3, update_rho_options=dict(strategy=strategy), **params)
+        assert_array_almost_equal(Y_1_rho, Y_1)
+        assert_array_almost_equal(Y_2_rho, Y_2)
@@ -30,9 +30,19 @@
 """Test LatentTimeGraphicalLasso."""
 import numpy as np
 import warnings
-from numpy.testing import assert_array_equal
+from numpy.testing import (
+    assert_array_almost_equal, assert_array_equal, assert_raises)
+from scipy import linalg
+from sklearn.covariance import empirical_covariance
 
-from regain.covariance.time_graphical_lasso_ import TimeGraphicalLasso
+from regain.covariance.kernel_time_graphical_lasso_ import (
+    KernelTimeGraphicalLasso, kernel_time_graphical_lasso)
+from regain.covariance.latent_time_graphical_lasso_ import (
+    LatentTimeGraphicalLasso)
+from regain.covariance.graphical_lasso_ import alpha_grid
+from regain.covariance.time_graphical_lasso_ import (
+    TimeGraphicalLasso, TimeGraphicalLassoCV, group_statistics,
+    time_graphical_lasso, time_graphical_lasso_path)
 
 
 def test_ltgl_zero():
@@ -51,3 +61,198 @@ def test_ltgl_zero():
     assert_array_equal(mdl.precision_, np.zeros((3, 3, 3)))
     assert_array_equal(mdl.get_observed_precision(),
                        mdl.precision_)
+
+
+def test_tgl_float32():
+    """Check that TimeGraphicalLasso can run in single precision."""
+    np.random.seed(0)
+    x = np.random.randn(60, 4)
+    y = np.repeat(np.arange(3), 20)
+    params = dict(alpha=.1, tol=1e-3, rtol=1e-3)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        p64 = TimeGraphicalLasso(**params).fit(x, y).precision_
+        mdl = TimeGraphicalLasso(
+            dtype=np.float32, window=3, **params).fit(x, y)
+
+    assert mdl.precision_.dtype == np.float32
+    assert mdl.covariance_.dtype == np.float32
+    for z in mdl._state.Z + mdl._state.U:
+        assert z.dtype == np.float32
+    assert_array_almost_equal(mdl.precision_, p64, 5)
+
+
+def test_tgl_path():
+    """Check the warm-started path against independent solutions."""
+    rs = np.random.RandomState(0)
+    X = rs.randn(120, 4)
+    y = np.repeat(np.arange(3), 40)
+    emp_cov = group_statistics(X, y)[3]
+    alphas = alpha_grid(emp_cov, n_alphas=4)
+    params = dict(beta=.5, tol=1e-8, rtol=1e-8, max_iter=3000)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        precisions, covariances, _ = time_graphical_lasso_path(
+            emp_cov, alphas, **params)
+        for alpha, precision, covariance in zip(
+                alphas, precisions, covariances):
+            assert_array_almost_equal(
+                precision,
+                time_graphical_lasso(emp_cov, alpha=alpha, **params)[0], 4)
+            assert_array_almost_equal(
+                covariance, np.linalg.inv(precision), 4)
+
+        mdl = TimeGraphicalLassoCV(alphas=alphas, cv=3, beta=.5).fit(X, y)
+    assert mdl.alpha_ in alphas
+    assert mdl.grid_scores_.shape == (4, 3)
+    assert_array_almost_equal(
+        mdl.covariance_, np.linalg.inv(mdl.precision_), 4)
+
+
+def test_tgl_screening():
+    """Check that screening gives the same solution of the full problem."""
+    rs = np.random.RandomState(0)
+    cov = linalg.block_diag([[1, .6], [.6, 1]], [[1, .7], [.7, 1]], 1, 1)
+    X = np.vstack([
+        rs.multivariate_normal(np.zeros(6), cov, size=50) for _ in range(3)])
+    y = np.repeat(np.arange(3), 50)
+    params = dict(alpha=10, beta=.5, tol=1e-8, rtol=1e-8, max_iter=3000)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for psi in ('laplacian', 'l1'):
+            mdl = TimeGraphicalLasso(psi=psi, **params).fit(X, y)
+            mdl_screen = TimeGraphicalLasso(
+                psi=psi, screening=True, **params).fit(X, y)
+            assert_array_almost_equal(
+                mdl_screen.precision_, mdl.precision_, 5)
+
+
+def test_tgl_screening_singletons():
+    """Check screening solves isolated variables without a dense block."""
+    from regain.covariance import time_graphical_lasso_ as tgl
+    rs = np.random.RandomState(0)
+    cov = linalg.block_diag([[1, .8], [.8, 1]], np.eye(10))
+    emp_cov = np.array([
+        empirical_covariance(rs.multivariate_normal(
+            np.zeros(12), cov, size=100)) for _ in range(4)])
+    params = dict(alpha=.3, beta=.5, tol=1e-8, rtol=1e-8, max_iter=3000)
+
+    sizes = []
+
+    def recorder(emp_cov, *args, **kwargs):
+        sizes.append(emp_cov.shape[1])
+        return time_graphical_lasso(emp_cov, *args, **kwargs)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for psi in ('laplacian', 'l1'):
+            del sizes[:]
+            tgl.time_graphical_lasso = recorder
+            try:
+                precision = time_graphical_lasso(
+                    emp_cov, psi=psi, screening=True, **params)[0]
+            finally:
+                tgl.time_graphical_lasso = time_graphical_lasso
+            assert_array_equal(sizes, [2])
+            assert_array_almost_equal(
+                precision, time_graphical_lasso(
+                    emp_cov, psi=psi, **params)[0], 5)
+
+
+def test_tgl_acceleration():
+    """Check that accelerated iterations reach the same solution."""
+    rs = np.random.RandomState(0)
+    emp_cov = np.array([np.cov(rs.randn(40, 5).T, bias=1) for _ in range(4)])
+    params = dict(alpha=.1, beta=.5, tol=1e-8, rtol=1e-8, max_iter=5000)
+    precision, _, n_iter = time_graphical_lasso(emp_cov, **params)
+    assert_array_almost_equal(
+        time_graphical_lasso(
+            emp_cov, acceleration='nesterov', **params)[0], precision, 5)
+
+    for depth in (2, 5):
+        precision_acc, _, n_iter_acc = time_graphical_lasso(
+            emp_cov, acceleration='anderson',
+            acceleration_options=dict(depth=depth), **params)
+        assert_array_almost_equal(precision_acc, precision, 5)
+        assert n_iter_acc < n_iter
+
+
+def test_tgl_laplacian():
+    """Check the tridiagonal solver against the kernel Laplacian one."""
+    rs = np.random.RandomState(0)
+    emp_cov = np.array([np.cov(rs.randn(40, 5).T, bias=1) for _ in range(6)])
+    params = dict(alpha=.1, tol=1e-8, rtol=1e-8, max_iter=5000)
+    kernel = np.eye(6, k=1) * .5
+    kernel += kernel.T
+
+    precision = time_graphical_lasso(
+        emp_cov, beta=.5, psi='laplacian', **params)[0]
+    assert_array_almost_equal(
+        precision, kernel_time_graphical_lasso(
+            emp_cov, kernel=kernel, psi='laplacian', **params)[0], 5)
+
+
+def test_tgl_partial_fit():
+    """Check partial_fit with a sliding window against a fit from scratch."""
+    rs = np.random.RandomState(0)
+    X = rs.randn(300, 4)
+    y = np.repeat(np.arange(6), 50)
+    params = dict(alpha=.5, tol=1e-6, rtol=1e-6, max_iter=2000)
+
+    mdl = TimeGraphicalLasso(window=4, **params).fit(X[y < 4], y[y < 4])
+    for t in (4, 5):
+        mdl.partial_fit(X[y == t])
+    mask = y >= 2
+    ref = TimeGraphicalLasso(**params).fit(X[mask], y[mask])
+
+    assert_array_equal(mdl.classes_, [2, 3, 4, 5])
+    assert_array_almost_equal(mdl.location_, ref.location_)
+    assert_array_almost_equal(mdl.precision_, ref.precision_, 4)
+    assert mdl.n_iter_ < ref.n_iter_
+
+    # without window, fit does not keep the state for partial_fit
+    assert not hasattr(ref, '_state')
+    assert_raises(ValueError, ref.partial_fit, X[y == 5])
+    mdl = TimeGraphicalLasso(**params)
+    for t in range(3):
+        mdl.partial_fit(X[y == t])
+    assert_array_equal(mdl.classes_, [0, 1, 2])
+    assert hasattr(mdl, '_state')
+
+
+def test_tgl_partial_fit_unsupported():
+    """Check partial_fit raises when the solver cannot be warm started."""
+    rs = np.random.RandomState(0)
+    X = rs.randn(200, 4)
+    y = np.repeat(np.arange(4), 50)
+
+    for mdl in (KernelTimeGraphicalLasso(kernel=np.eye(3)),
+                LatentTimeGraphicalLasso()):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            mdl.fit(X[y < 3], y[y < 3])
+        assert_raises(NotImplementedError, mdl.partial_fit, X[y == 3])
+
+    mdl = TimeGraphicalLasso(screening=True)
+    assert_raises(ValueError, mdl.partial_fit, X, y)
+
+
+def test_group_statistics():
+    """Check the statistics of each time and fit_from_stats."""
+    rs = np.random.RandomState(0)
+    X = rs.randn(100, 3)
+    y = rs.randint(4, size=100)
+    classes, n_samples, location, emp_cov = group_statistics(X, y)
+
+    assert_array_equal(classes, np.arange(4))
+    assert_array_equal(n_samples, np.bincount(y))
+    for i in range(4):
+        assert_array_almost_equal(location[i], X[y == i].mean(0))
+        assert_array_almost_equal(emp_cov[i], empirical_covariance(X[y == i]))
+
+    mdl = TimeGraphicalLasso().fit(X, y)
+    mdl_stats = TimeGraphicalLasso().fit_from_stats(
+        emp_cov, n_samples, location=location)
+    assert_array_almost_equal(mdl.precision_, mdl_stats.precision_)
+    assert_array_almost_equal(mdl.score(X, y), mdl_stats.score(X, y))
@@ -28,7 +28,12 @@
 # OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 """Test update_rules module."""
+import numpy as np
+from numpy.testing import assert_array_almost_equal
+
 from regain import update_rules
+from regain.covariance.graphical_lasso_ import graphical_lasso
+from regain.utils import convergence
 
 
 def test_update_rho():
@@ -39,6 +44,29 @@ def test_update_rho():
     assert rho == 0.5
 
 
+def test_rho_strategy():
+    """Test rho strategies and the rescaling of the dual variables."""
+    U = np.ones(3)
+    rho = update_rules.rho_strategy()(1, 100, 0, duals=[U])
+    assert rho == 2
+    assert_array_almost_equal(U, np.full(3, .5))
+
+    check = convergence(e_pri=100, e_dual=1)
+    rule = update_rules.rho_strategy('normalized', mu=10, tau_max=10)
+    assert rule(1, 100, 1, check=check) == 1
+    assert rule(1, 2500, 1, check=check) == 5
+
+    np.random.seed(0)
+    emp_cov = np.cov(np.random.randn(50, 5).T, bias=1)
+    params = dict(alpha=.1, tol=1e-8, rtol=1e-8, max_iter=2000)
+    precision = graphical_lasso(emp_cov, **params)[0]
+    for strategy in ('normalized', 'spectral'):
+        assert_array_almost_equal(
+            graphical_lasso(
+                emp_cov, update_rho_options=dict(strategy=strategy),
+                **params)[0], precision, 5)
+
+
 def test_update_gamma():
     """Test update_gamma function."""
     gamma = update_rules.update_gamma(gamma=1, iteration=20, eps=1e-4)
@@ -135,3 +135,23 @@ def test_structure_error():
 
     assert_equal(utils.structure_error(a, b, thresholding=True, eps=1e-2),
                  result)
+
+
+def test_lag_stack():
+    """Test LagStack class."""
+    x = np.arange(4 * 2 * 2.).reshape(4, 2, 2)
+    stack = utils.LagStack([1, 2], x.shape)
+    assert_equal(stack.data.shape, (10, 2, 2))
+
+    stack.gather(x, out=stack.data)
+    for m in (1, 2):
+        assert_array_equal(stack[m][0], x[:-m])
+        assert_array_equal(stack[m][1], x[m:])
+    assert_array_equal(stack.counts(), [2, 3, 3, 2])
+
+    out = np.zeros_like(x)
+    stack.scatter_add(stack.data, out=out)
+    assert_array_equal(out, x * stack.counts()[:, None, None])
+
+    kernel = np.arange(16.).reshape(4, 4)
+    assert_array_equal(stack.lag_weights(kernel).ravel(), [1, 6, 11, 2, 7])
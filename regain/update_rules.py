@@ -31,6 +31,8 @@
 """Update rules."""
 from __future__ import division
 
+import numpy as np
+
 
 def update_rho(rho, rnorm, snorm, iteration=None, mu=10, tau_inc=2, tau_dec=2):
     """See Boyd pag 20-21 for details.
@@ -51,3 +53,388 @@ def update_gamma(gamma, iteration, eps=1e-4):
     if iteration % 20 == 0:
         gamma /= 2.
     return max(gamma, eps)
+
+
+def _flatten(variables, out=None):
+    if out is None:
+        return np.concatenate([np.ravel(v) for v in variables])
+    start = 0
+    for v in variables:
+        np.copyto(out[start:start + v.size].reshape(v.shape), v)
+        start += v.size
+    return out
+
+
+def _unflatten(x, variables):
+    start = 0
+    for v in variables:
+        np.copyto(v, x[start:start + v.size].reshape(v.shape))
+        start += v.size
+
+
+def _flat_buffer(variables):
+    return np.empty(
+        sum(v.size for v in variables),
+        dtype=np.result_type(*variables))
+
+
+class NoAcceleration(object):
+    """Plain ADMM iterations."""
+
+    def __call__(self, variables, restart=False):
+        """Leave the variables unchanged."""
+
+
+class NesterovAcceleration(object):
+    """Fast ADMM with restart. See Goldstein et al., 2014 for details.
+
+    The iterates are extrapolated with a Nesterov momentum, as long as the
+    combined residual (the change of the variables with respect to the
+    extrapolated point) decreases by a factor `eta`. Otherwise, the momentum
+    is reset. The momentum is only guaranteed to help on strongly convex
+    problems: on the others, such as the latent variable ones, it may
+    require more iterations than plain ADMM.
+
+    Parameters
+    ----------
+    eta : float, default 0.999
+        Restart criterion for the combined residual.
+    """
+
+    def __init__(self, eta=0.999):
+        self.eta = eta
+        self._x_prev = None
+
+    def __call__(self, variables, restart=False):
+        """Extrapolate the variables in-place.
+
+        Parameters
+        ----------
+        variables : list of ndarray
+            Primal and (scaled) dual variables read by the next iteration.
+        restart : bool, default False
+            Force a restart, for example after a change in rho.
+        """
+        if self._x_prev is None:
+            self._x_prev = _flat_buffer(variables)
+            self._x_hat = np.empty_like(self._x_prev)
+            self._x = np.empty_like(self._x_prev)
+            restart = True
+
+        x = _flatten(variables, out=self._x)
+        if restart:
+            self._alpha = 1.
+            self._c = np.inf
+            np.copyto(self._x_prev, x)
+            np.copyto(self._x_hat, x)
+            return
+
+        # x_hat is not needed anymore: use it to compute the residual
+        x_hat = np.subtract(x, self._x_hat, out=self._x_hat)
+        c = np.dot(x_hat, x_hat)
+        if c < self.eta * self._c:
+            alpha = (1. + np.sqrt(1. + 4. * self._alpha ** 2)) / 2.
+            np.subtract(x, self._x_prev, out=x_hat)
+            x_hat *= (self._alpha - 1.) / alpha
+            x_hat += x
+            _unflatten(x_hat, variables)
+            self._alpha = alpha
+        else:
+            # safeguard: drop the momentum
+            np.copyto(x_hat, x)
+            self._alpha = 1.
+        self._c = c
+        # x becomes the previous point, its buffer is reused
+        self._x_prev, self._x = x, self._x_prev
+
+
+class AndersonAcceleration(object):
+    """Type-II Anderson acceleration of the ADMM fixed-point iteration.
+
+    The next point is the combination of the last `depth` iterates which
+    minimises the fixed-point residual. The history is cleared when the
+    residual increases, or on restart.
+
+    The differences of the iterates and of the residuals are kept in
+    preallocated ring buffers, together with the Gram matrix of the latter,
+    which is updated with one row at each iteration. The coefficients of
+    the combination are the solution of a depth x depth system, so that the
+    extrapolation costs a few products of the size of the variables.
+
+    Parameters
+    ----------
+    depth : int, default 5
+        Number of past iterates used in the extrapolation.
+    """
+
+    def __init__(self, depth=5):
+        if depth < 1:
+            raise ValueError("depth must be positive, got %r" % depth)
+        self.depth = depth
+        self._x = None
+
+    def _allocate(self, variables):
+        self._x = _flat_buffer(variables)
+        self._g = np.empty_like(self._x)
+        self._f = np.empty_like(self._x)
+        self._g_new = np.empty_like(self._x)
+        self._dg = np.empty((self.depth, self._x.size), dtype=self._x.dtype)
+        self._df = np.empty_like(self._dg)
+        self._gram = np.empty((self.depth, self.depth))
+
+    def __call__(self, variables, restart=False):
+        """Extrapolate the variables in-place.
+
+        Parameters
+        ----------
+        variables : list of ndarray
+            Primal and (scaled) dual variables read by the next iteration.
+        restart : bool, default False
+            Force a restart, for example after a change in rho.
+        """
+        if self._x is None:
+            self._allocate(variables)
+            restart = True
+
+        g = _flatten(variables, out=self._g_new)
+        if restart:
+            np.copyto(self._x, g)
+            self._f_norm = None
+            self._n_hist = self._pos = 0
+            return
+
+        # the residual overwrites the point on which the map was evaluated
+        f = np.subtract(g, self._x, out=self._x)
+        f_norm = np.linalg.norm(f)
+        if self._f_norm is not None:
+            if f_norm > self._f_norm:
+                # safeguard: the residual increased
+                self._n_hist = self._pos = 0
+            else:
+                k = self._pos
+                np.subtract(g, self._g, out=self._dg[k])
+                np.subtract(f, self._f, out=self._df[k])
+                self._n_hist = min(self._n_hist + 1, self.depth)
+                self._pos = (k + 1) % self.depth
+                row = np.dot(self._df[:self._n_hist], self._df[k])
+                self._gram[k, :self._n_hist] = row
+                self._gram[:self._n_hist, k] = row
+        self._f_norm = f_norm
+
+        # keep g and f as the previous ones, reusing their buffers
+        self._g_new, self._g = self._g, g
+        self._x, self._f = self._f, f
+
+        n = self._n_hist
+        if n:
+            gamma = np.linalg.lstsq(
+                self._gram[:n, :n], np.dot(self._df[:n], f), rcond=None)[0]
+            x = np.dot(
+                gamma.astype(self._dg.dtype), self._dg[:n], out=self._x)
+            np.subtract(g, x, out=x)
+            _unflatten(x, variables)
+        else:
+            np.copyto(self._x, g)
+
+
+def accelerator(acceleration='none', **options):
+    """Return the acceleration scheme for ADMM iterations.
+
+    Parameters
+    ----------
+    acceleration : {'none', 'nesterov', 'anderson'}, default 'none'
+        Type of acceleration.
+    options : dict
+        Options of the acceleration, for example `depth` for 'anderson'.
+    """
+    if acceleration == 'none':
+        return NoAcceleration()
+    if acceleration == 'nesterov':
+        return NesterovAcceleration(**options)
+    if acceleration == 'anderson':
+        return AndersonAcceleration(**options)
+    raise ValueError("Value of %s not understood." % acceleration)
+
+
+class RhoStrategy(object):
+    """Base class for the update of the penalty parameter rho.
+
+    Subclasses implement `_update`, returning the new value of rho.
+    When rho changes, the scaled dual variables are rescaled in-place.
+    """
+
+    def __call__(
+            self, rho, rnorm, snorm, iteration=None, check=None, duals=(),
+            Ax=None, Bz=None):
+        """Update rho and rescale the dual variables.
+
+        Parameters
+        ----------
+        rho : float
+            Current penalty parameter.
+        rnorm, snorm : float
+            Norms of the primal and dual residuals.
+        iteration : int, optional
+            Current iteration.
+        check : convergence, optional
+            Diagnostics of the current iteration, with the tolerances
+            for the residuals.
+        duals : list of ndarray
+            Scaled dual variables, rescaled in-place if rho changes.
+        Ax, Bz : list of ndarray, optional
+            Terms of the constraints Ax - Bz = 0, with the same structure
+            of `duals`. Only needed by some strategies.
+
+        Returns
+        -------
+        rho : float
+            Updated penalty parameter.
+        """
+        rho_new = self._update(
+            rho, rnorm, snorm, iteration=iteration, check=check, duals=duals,
+            Ax=Ax, Bz=Bz)
+        if rho_new != rho:
+            for u in duals:
+                u *= rho / rho_new
+        return rho_new
+
+
+class ResidualBalancing(RhoStrategy):
+    """Residual balancing. See Boyd pag 20-21 for details."""
+
+    def __init__(self, mu=10, tau_inc=2, tau_dec=2):
+        self.mu = mu
+        self.tau_inc = tau_inc
+        self.tau_dec = tau_dec
+
+    def _update(self, rho, rnorm, snorm, iteration=None, **kwargs):
+        return update_rho(
+            rho, rnorm, snorm, iteration=iteration, mu=self.mu,
+            tau_inc=self.tau_inc, tau_dec=self.tau_dec)
+
+
+class NormalizedResidualBalancing(RhoStrategy):
+    """Residual balancing on normalised residuals. See Wohlberg, 2017.
+
+    The residuals are divided by their tolerances, which makes the rule
+    invariant to the scaling of the problem. The factor for the update of
+    rho is adapted to the ratio of the residuals.
+
+    Parameters
+    ----------
+    mu : float, default 10
+        Maximum ratio between the normalised residuals.
+    tau_max : float, default 10
+        Maximum factor for the update of rho.
+    """
+
+    def __init__(self, mu=10, tau_max=10):
+        self.mu = mu
+        self.tau_max = tau_max
+
+    def _update(self, rho, rnorm, snorm, check=None, **kwargs):
+        if check is None:
+            raise ValueError(
+                "Normalized residual balancing needs the tolerances.")
+        rnorm = rnorm / check.e_pri
+        snorm = snorm / check.e_dual
+        if rnorm > self.mu * snorm:
+            return rho * min(np.sqrt(rnorm / snorm), self.tau_max)
+        elif snorm > self.mu * rnorm:
+            return rho / min(np.sqrt(snorm / rnorm), self.tau_max)
+        return rho
+
+
+class SpectralStrategy(RhoStrategy):
+    """Spectral (Barzilai-Borwein) adaptive ADMM. See Xu et al., 2017.
+
+    Every `freq` iterations, rho is set from the curvatures of the two
+    objective terms, estimated with spectral step sizes from the changes
+    of the variables and of the (unscaled) dual variables.
+    The solver must provide the terms of the constraints Ax - Bz = 0.
+
+    Parameters
+    ----------
+    freq : int, default 2
+        Number of iterations between updates.
+    eps_cor : float, default 0.2
+        Minimum correlation to trust a curvature estimate.
+    c_cg : float, default 1e10
+        Safeguard on the change of rho, which vanishes with the iterations.
+    """
+
+    def __init__(self, freq=2, eps_cor=0.2, c_cg=1e10):
+        self.freq = freq
+        self.eps_cor = eps_cor
+        self.c_cg = c_cg
+        self._n_calls = 0
+
+    @staticmethod
+    def _curvature(d_x, d_lamda):
+        """Hybrid spectral step size and its correlation."""
+        inner = np.dot(d_x, d_lamda)
+        norms = np.linalg.norm(d_x) * np.linalg.norm(d_lamda)
+        if inner <= 0 or norms == 0:
+            return None, 0.
+        steepest = np.dot(d_lamda, d_lamda) / inner
+        minimum = inner / np.dot(d_x, d_x)
+        if 2 * minimum > steepest:
+            return minimum, inner / norms
+        return steepest - minimum / 2., inner / norms
+
+    def _update(self, rho, rnorm, snorm, duals=(), Ax=None, Bz=None, **kwargs):
+        if Ax is None or Bz is None:
+            raise ValueError(
+                "The spectral strategy needs the terms of the constraints, "
+                "which are not available for this solver.")
+        ax, bz = _flatten(Ax), _flatten(Bz)
+        lamda = -rho * _flatten(duals)
+        self._n_calls += 1
+        if self._n_calls == 1:
+            self._lamda, self._bz = lamda, bz
+            return rho
+
+        # dual variable after the first block of the iteration
+        lamda_hat = self._lamda - rho * (ax - self._bz)
+        self._lamda, self._bz = lamda, bz
+        if self._n_calls == 2:
+            self._last = ax, bz, lamda, lamda_hat
+            return rho
+        if self._n_calls % self.freq:
+            return rho
+
+        ax_0, bz_0, lamda_0, lamda_hat_0 = self._last
+        self._last = ax, bz, lamda, lamda_hat
+        alpha, alpha_cor = self._curvature(ax - ax_0, lamda_hat - lamda_hat_0)
+        beta, beta_cor = self._curvature(bz_0 - bz, lamda - lamda_0)
+
+        if alpha_cor > self.eps_cor and beta_cor > self.eps_cor:
+            rho_new = np.sqrt(alpha * beta)
+        elif alpha_cor > self.eps_cor:
+            rho_new = alpha
+        elif beta_cor > self.eps_cor:
+            rho_new = beta
+        else:
+            return rho
+
+        bound = 1. + self.c_cg / self._n_calls ** 2
+        return min(max(rho_new, rho / bound), rho * bound)
+
+
+def rho_strategy(strategy='residual_balancing', **options):
+    """Return the strategy for the update of rho.
+
+    Parameters
+    ----------
+    strategy : {'residual_balancing', 'normalized', 'spectral'}
+        Type of update. Default is the residual balancing of Boyd et al.
+    options : dict
+        Options of the strategy, for example `mu` for residual balancing.
+    """
+    if strategy == 'residual_balancing':
+        return ResidualBalancing(**options)
+    if strategy == 'normalized':
+        return NormalizedResidualBalancing(**options)
+    if strategy == 'spectral':
+        return SpectralStrategy(**options)
+    raise ValueError("Value of %s not understood." % strategy)
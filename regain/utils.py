@@ -42,7 +42,7 @@ from contextlib import contextmanager
 import numpy as np
 import six
 from numpy.linalg.linalg import LinAlgError
-from scipy import stats
+from scipy import sparse, stats
 from scipy.spatial.distance import squareform
 from six.moves import cPickle as pkl
 from sklearn.metrics import average_precision_score, matthews_corrcoef
@@ -103,9 +103,107 @@ def namedtuple_with_defaults(typename, field_names, default_values=()):
     return T
 
 
+def to_csr(precision):
+    """Store a precision matrix in CSR format, dropping its zeros.
+
+    For a 3-dimensional input, return a list with a matrix for each time.
+    """
+    if precision.ndim == 2:
+        return sparse.csr_matrix(precision)
+    return [sparse.csr_matrix(p) for p in precision]
+
+
+def to_dense(precision):
+    """Dense array of a precision matrix stored as in `to_csr`."""
+    if sparse.issparse(precision):
+        return precision.toarray()
+    if isinstance(precision, list):
+        return np.array([p.toarray() for p in precision])
+    return precision
+
+
 convergence = namedtuple_with_defaults(
     'convergence', 'obj rnorm snorm e_pri e_dual precision')
 
+# variables of an ADMM solver, used to warm start a subsequent run
+admm_state = namedtuple_with_defaults('admm_state', 'Z U rho')
+
+
+class LagStack(object):
+    """Contiguous storage of the consensus variables of a set of lags.
+
+    For each lag m, it holds a pair of variables (X_L, X_R) in consensus with
+    (X[:-m], X[m:]), where X has shape (n_times, ...).
+    The left variables of all the lags are stored in `L`, followed by the
+    right ones in `R`, both views of a single array `data`.
+
+    Parameters
+    ----------
+    lags : list
+        Lags of the consensus variables.
+    shape : tuple
+        Shape of X.
+    dtype : data-type, default np.float64
+        Data type of the variables.
+
+    """
+
+    def __init__(self, lags, shape, dtype=np.float64):
+        n_times = shape[0]
+        self.lags = list(lags)
+        empty = [np.empty(0, dtype=int)]
+        self.left = np.concatenate(
+            [np.arange(n_times - m) for m in self.lags] + empty)
+        self.right = np.concatenate(
+            [np.arange(m, n_times) for m in self.lags] + empty)
+        self.index = np.concatenate((self.left, self.right))
+
+        n = self.left.size
+        self.data = np.zeros((2 * n, ) + tuple(shape[1:]), dtype=dtype)
+        self.L, self.R = self.data[:n], self.data[n:]
+        self._views = {}
+        start = 0
+        for m in self.lags:
+            stop = start + n_times - m
+            self._views[m] = (self.L[start:stop], self.R[start:stop])
+            start = stop
+
+        # sums the variables in consensus with the same time
+        self._scatter = sparse.csr_matrix(
+            (np.ones(2 * n), (self.index, np.arange(2 * n))),
+            shape=(n_times, 2 * n))
+
+    def __getitem__(self, m):
+        return self._views[m]
+
+    def __iter__(self):
+        return iter(self.lags)
+
+    def items(self):
+        """Pairs (X_L, X_R) of each lag."""
+        return [(m, self._views[m]) for m in self.lags]
+
+    def counts(self):
+        """Number of consensus variables of each time."""
+        return np.asarray(self._scatter.sum(axis=1)).ravel()
+
+    def lag_weights(self, kernel):
+        """Kernel value of each pair, shape (n_pairs, 1, 1)."""
+        return np.concatenate(
+            [np.diag(kernel, m) for m in self.lags] +
+            [np.empty(0)])[:, None, None]
+
+    def gather(self, x, out=None):
+        """Stack (x[:-m], x[m:]) for all lags with the layout of `data`."""
+        # with mode='raise' numpy buffers `out` in a temporary of its size
+        return np.take(x, self.index, axis=0, out=out, mode='clip')
+
+    def scatter_add(self, values, out):
+        """Add to each time of `out` the `values` in consensus with it."""
+        out += self._scatter.dot(values.reshape(values.shape[0], -1)).reshape(
+            out.shape)
+        return out
+
 
 @contextmanager
 def suppress_stdout():
@@ -327,6 +425,10 @@ def error_norm(
     `self` and `comp_cov` covariance estimators.
 
     """
+    if sparse.issparse(cov):
+        cov = cov.toarray()
+    if sparse.issparse(comp_cov):
+        comp_cov = comp_cov.toarray()
     if n:
         comp_cov = comp_cov.copy()
         # / comp_cov.max()